@@ -1 +1,17 @@
 from .algorithm import *
+from .graph import *
+from .views import *
+from .degrees import *
+from .compact import *
+from .interning import *
+from .vectorized import *
+from .parallel import *
+from .edgefile import *
+from .stream import *
+from .instrumentation import *
+from .generators import *
+from .persistence import *
+from .feed import *
+from .validation import *
+from .concurrency import *
+from .sharded import *
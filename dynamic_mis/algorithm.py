@@ -1,20 +1,31 @@
 from abc import abstractmethod
 from collections import defaultdict
+import hashlib
+import heapq
 import networkx as nx
+from .graph import GraphBackend
+from .updates import *
+from .views import MISView, QueryView
+from .degrees import DegreeIndex, CompactDegreeIndex
+from .compact import CounterArray, MembershipSet, node_capacity
 
 
-def filtered_edge_insert(g: nx.Graph, edges):
+def filtered_edge_insert(g: GraphBackend, edges):
     # check that node is already in graph: else networkx will create that node and we don't want that
     def both_nodes_exist(e):
         return g.has_node(e[0]) and g.has_node(e[1])
 
-    edges = filter(both_nodes_exist, edges)
-    g.add_edges_from(edges)
-    return len(list(edges))
+    # Returns the number of edges that were added, edges already in the graph don't count
+    count = g.number_of_edges()
+    g.add_edges_from(filter(both_nodes_exist, edges))
+    return g.number_of_edges() - count
 
 
 class Algorithm:
-    def __init__(self, graph: nx.Graph):
+    # Names of the set attributes that together hold the mis, see feed.py
+    mis_attributes = ()
+
+    def __init__(self, graph: GraphBackend):
         self._graph = graph
 
     def graph(self):
@@ -44,6 +55,34 @@ class Algorithm:
     def get_mis(self):
         pass
 
+    def apply_updates(self, updates):
+        # Applies a stream of update tuples (see updates.py).
+        # Runs of edge updates are merged and handed to _apply_edge_batch as a whole.
+        for item in coalesce(updates):
+            if isinstance(item, EdgeBatch):
+                self._apply_edge_batch(item.inserted(), item.removed())
+            else:
+                getattr(self, item[0])(*item[1:])
+
+    def _apply_edge_batch(self, inserted, removed):
+        # Fallback without batching, removing a missing edge is a no-op
+        for u, v in removed:
+            if self._graph.has_edge(u, v):
+                self.remove_edge(u, v)
+        for u, v in inserted:
+            self.insert_edge(u, v)
+
+    def is_valid_at(self, nodes):
+        # Checks the mis only at nodes: a node in the mis has no neighbor in the mis, a node outside has one.
+        # Nodes that are not in the graph are skipped. Costs O(sum of the degrees) instead of O(n + m).
+        for v in nodes:
+            if v not in self._graph:
+                continue
+            # Like is_valid_mis a self loop counts, so a node with a self loop can't be in the mis
+            if self.is_in_mis(v) == any(map(self.is_in_mis, self._graph[v])):
+                return False
+        return True
+
     def is_valid_mis(self):
         for u, v in self._graph.edges:
             if self.is_in_mis(u) and self.is_in_mis(v):
@@ -59,22 +98,30 @@ class Algorithm:
 
 
 class TrivialMIS(Algorithm):
+    mis_attributes = ('_mis',)
 
-    def __init__(self, graph, candidate_filter=None):
+    # initializer replaces TrivialMIS.compute, e.g. with vectorized.luby_mis.
+    # It is called as initializer(graph, candidate_filter=None, nodes=None) and returns a set.
+    def __init__(self, graph, candidate_filter=None, initializer=None):
         super(TrivialMIS, self).__init__(graph)
         self._candidate_filter = candidate_filter
-        self._mis = TrivialMIS.compute(graph, candidate_filter)
+        self._compute = TrivialMIS.compute if initializer is None else initializer
+        self._mis = set()
+        self._recompute()
 
     @staticmethod
     def compute_networkx(graph):
         return nx.maximal_independent_set(graph)
 
     @staticmethod
-    def compute(graph, candidate_filter=None):
+    def compute(graph, candidate_filter=None, nodes=None):
+        # nodes restricts the scan to a subset of the graph, e.g. the heavy nodes
         mis = set()
+        if nodes is None:
+            nodes = graph.nodes
 
         if candidate_filter is None:
-            for v in graph.nodes:
+            for v in nodes:
                 can_be_added = True
                 for w in graph[v]:
                     if w in mis:
@@ -82,7 +129,7 @@ class TrivialMIS(Algorithm):
                 if can_be_added:
                     mis.add(v)
         else:
-            for v in graph.nodes:
+            for v in nodes:
                 if candidate_filter(v):
                     can_be_added = True
                     for w in graph[v]:
@@ -93,39 +140,58 @@ class TrivialMIS(Algorithm):
 
         return mis
 
+    def _recompute(self):
+        # The set is updated in place, so wrappers that track it (see feed.py) stay attached
+        mis = self._compute(self._graph, self._candidate_filter)
+        self._mis.intersection_update(mis)
+        self._mis.update(mis)
+
     def insert_edge(self, u, v):
         if self._graph.has_edge(u, v):
             return
 
         self._graph.add_edge(u, v)
-        self._mis = TrivialMIS.compute(self._graph, self._candidate_filter)
+        self._recompute()
 
     def remove_edge(self, u, v):
         self._graph.remove_edge(u, v)
-        self._mis = TrivialMIS.compute(self._graph, self._candidate_filter)
+        self._recompute()
 
     def insert_node(self, v, edges=[]):
         self._graph.add_node(v)
         filtered_edge_insert(self._graph, edges)
-        self._mis = TrivialMIS.compute(self._graph, self._candidate_filter)
+        self._recompute()
 
     def remove_node(self, v):
         self._graph.remove_node(v)
-        self._mis = TrivialMIS.compute(self._graph, self._candidate_filter)
+        self._recompute()
+
+    def _apply_edge_batch(self, inserted, removed):
+        for u, v in removed:
+            if self._graph.has_edge(u, v):
+                self._graph.remove_edge(u, v)
+        self._graph.add_edges_from(inserted)
+        self._recompute()
 
     def is_in_mis(self, node):
         return node in self._mis
 
     def get_mis(self):
-        return self._mis
+        return MISView(self._mis)
 
 
 class SimpleMIS(Algorithm):
+    mis_attributes = ('_mis',)
 
-    def __init__(self, graph):
+    # compact keeps the counts in a CounterArray and the mis in a MembershipSet (see compact.py),
+    # node ids must be dense non-negative integers then
+    def __init__(self, graph, initializer=None, compact=False):
         super(SimpleMIS, self).__init__(graph)
-        self._count = defaultdict(lambda: 0)
-        self._mis = TrivialMIS.compute(self._graph)
+        self._compact = compact
+        self._count = CounterArray(node_capacity(graph)) if compact else defaultdict(lambda: 0)
+        self._mis = (TrivialMIS.compute if initializer is None else initializer)(self._graph)
+        if compact:
+            self._mis = MembershipSet(self._mis, len(self._count))
 
         for v in self._mis:
             for u in self._graph[v]:
@@ -135,10 +201,22 @@ class SimpleMIS(Algorithm):
         # assert self.is_valid_mis()
         # assert self._valid_count()
 
+    @classmethod
+    def from_state(cls, graph, mis, count):
+        # Seeds the algorithm with an mis and its neighbor counts that were computed elsewhere
+        algo = cls.__new__(cls)
+        Algorithm.__init__(algo, graph)
+        algo._compact = False
+        algo._mis = set(mis)
+        algo._count = defaultdict(lambda: 0, count)
+        return algo
+
     def insert_node(self, v, edges=[]):
         self._graph.add_node(v)
         filtered_edge_insert(self._graph, edges)
 
+        if self._compact:
+            self._count.grow(v)
         self._count[v] = 0
         for n in self._graph[v]:
             if n in self._mis:
@@ -191,6 +269,56 @@ class SimpleMIS(Algorithm):
             non_mis_node = u if self.is_in_mis(v) else v
             self._decrease_count(non_mis_node)
 
+    def _apply_edge_batch(self, inserted, removed):
+        # During the batch the count also includes neighbors that conflict in the mis.
+        # Conflicts are resolved at the end and freed nodes are added once.
+        touched = []
+        for u, v in removed:
+            if not self._graph.has_edge(u, v):
+                continue
+            self._graph.remove_edge(u, v)
+            if u in self._mis:
+                self._count[v] -= 1
+            if v in self._mis:
+                self._count[u] -= 1
+            touched.append(u)
+            touched.append(v)
+
+        conflicts = []
+        for u, v in inserted:
+            assert u in self._graph and v in self._graph
+            if self._graph.has_edge(u, v):
+                continue
+            self._graph.add_edge(u, v)
+            if u in self._mis:
+                self._count[v] += 1
+            if v in self._mis:
+                self._count[u] += 1
+                if u in self._mis:
+                    conflicts.append((u, v))
+
+        for u, v in conflicts:
+            if u in self._mis and v in self._mis:
+                removed_node = self._conflict_loser(u, v)
+                self._mis.remove(removed_node)
+                for w in self._graph[removed_node]:
+                    self._count[w] -= 1
+                    touched.append(w)
+
+        self._join_free(touched)
+
+    def _conflict_loser(self, u, v):
+        # Same choice as insert_edge
+        return u
+
+    def _join_free(self, nodes):
+        # Nodes without mis neighbors join the mis in the given order
+        for v in nodes:
+            if self._count[v] == 0 and v not in self._mis:
+                self._mis.add(v)
+                for w in self._graph[v]:
+                    self._count[w] += 1
+
     def _decrease_count(self, v):
         # assert(self._count[v] > 0)
         self._count[v] -= 1
@@ -223,7 +351,7 @@ class SimpleMIS(Algorithm):
         return node in self._mis
 
     def get_mis(self):
-        return self._mis
+        return MISView(self._mis)
 
 
 class ImprovedIncrementalMIS(SimpleMIS):
@@ -261,6 +389,14 @@ class ImprovedIncrementalMIS(SimpleMIS):
 
         # assert self._valid_count()
 
+    def _apply_edge_batch(self, inserted, removed):
+        if len(removed) > 0:
+            raise NotImplementedError
+        SimpleMIS._apply_edge_batch(self, inserted, removed)
+
+    def _conflict_loser(self, u, v):
+        return u if self._graph.degree[u] < self._graph.degree[v] else v
+
     def insert_node(self, v, edges=[], count=None):
         raise NotImplementedError
 
@@ -271,32 +407,105 @@ class ImprovedIncrementalMIS(SimpleMIS):
         raise NotImplementedError
 
 
+class DegreeAwareMIS(ImprovedIncrementalMIS):
+    # Fully dynamic version of ImprovedIncrementalMIS. Conflicting insertions still evict the endpoint with the
+    # lower degree. Whenever a node leaves the mis, the neighbors it frees join in ascending degree order, so a
+    # low degree node can block its high degree neighbors from joining instead of the other way around.
+
+    def insert_edge(self, u, v):
+        assert u in self._graph and v in self._graph
+        if self._graph.has_edge(u, v):
+            return
+        self._graph.add_edge(u, v)
+
+        if u in self._mis and v in self._mis:
+            lower_deg, higher_deg = (u, v) if self._graph.degree[u] < self._graph.degree[v] else (v, u)
+            self._count[lower_deg] = 1
+            self._mis.remove(lower_deg)
+            self._release(lower_deg, skip=higher_deg)
+
+        elif (u in self._mis) != (v in self._mis):
+            non_mis_node = v if u in self._mis else u
+            self._count[non_mis_node] += 1
+
+    def remove_edge(self, u, v):
+        SimpleMIS.remove_edge(self, u, v)
+
+    def insert_node(self, v, edges=[]):
+        SimpleMIS.insert_node(self, v, edges)
+
+    def remove_node(self, v):
+        if v in self._mis:
+            self._mis.remove(v)
+            self._release(v)
+        self._count.pop(v, None)
+        self._graph.remove_node(v)
+
+    def _apply_edge_batch(self, inserted, removed):
+        SimpleMIS._apply_edge_batch(self, inserted, removed)
+
+    def _release(self, v, skip=None):
+        # v left the mis, its neighbors without another mis neighbor join
+        freed = []
+        for w in self._graph[v]:
+            if w != skip and w != v:
+                self._count[w] -= 1
+                if self._count[w] == 0:
+                    freed.append(w)
+        self._join_free(freed)
+
+    def _join_free(self, nodes):
+        if len(nodes) > 1:
+            degree = self._graph.degree
+            # Duplicates are dropped, the first occurrence keeps its place among nodes of the same degree
+            nodes = sorted(dict.fromkeys(nodes), key=lambda w: degree[w])
+        SimpleMIS._join_free(self, nodes)
+
+
 class ImprovedDynamicMIS(Algorithm):
+    mis_attributes = ('_light_mis', '_heavy_mis')
 
-    def __init__(self, graph):
+    def __init__(self, graph, initializer=None, compact=False):
+        # compact works like in SimpleMIS for the counts and the node sets, degrees are kept in a CompactDegreeIndex
         Algorithm.__init__(self, graph)
-        self._light_count = defaultdict(lambda: 0)
-        self._heavy_mis = set()
-        self._heavy_nodes = set()
-        self._light_mis = set()
-        self._delta_c = 0
+        self._initializer = initializer
+        self._compact = compact
+        self._light_count = self._counter()
+        self._heavy_count = self._counter()
+        self._heavy_mis = MembershipSet() if compact else set()
+        # Cached degrees, bucketed so that a phase change only reclassifies the nodes between the two thresholds
+        self._degrees = (CompactDegreeIndex if compact else DegreeIndex)(self._graph.degree)
+        self._heavy_nodes = MembershipSet() if compact else set()
+        # Nodes whose light count, heavy count or heavy status changed since the last heavy mis repair
+        self._dirty = []
+        self._light_mis = MembershipSet() if compact else set()
+        # No node is heavy before the first phase
+        self._delta_c = float('inf')
         self._m_c = 0
         self._edge_count = self._graph.number_of_edges()
         self.new_phase()
 
     def new_phase(self):
         if self._edge_count <= self._m_c / 2 or self._edge_count >= self._m_c * 2:
+            old_delta_c = self._delta_c
             self._m_c = self._edge_count
             self._delta_c = self._edge_count ** (2 / 3)
 
-            self._heavy_nodes.clear()
+            # _heavy_nodes is exact for the old threshold, only nodes between the thresholds change sides
+            for v in self._degrees.between(min(old_delta_c, self._delta_c), max(old_delta_c, self._delta_c)):
+                self._classify(v)
+
             self._light_mis.clear()
-            self._light_count = defaultdict(lambda: 0)
-            for v in self._graph:
-                if self._graph.degree[v] >= self._delta_c:
-                    self._heavy_nodes.add(v)
-                elif self._light_count[v] == 0:
-                    self._light_mis.add(v)
+            self._light_count = self._counter()
+            if self._initializer is None:
+                for v in self._graph:
+                    if v not in self._heavy_nodes and self._light_count[v] == 0:
+                        self._light_mis.add(v)
+                        for w in self._graph[v]:
+                            self._light_count[w] += 1
+            else:
+                self._light_mis.update(self._initializer(self._graph, candidate_filter=self._is_light))
+                for v in self._light_mis:
                     for w in self._graph[v]:
                         self._light_count[w] += 1
 
@@ -312,9 +521,15 @@ class ImprovedDynamicMIS(Algorithm):
         self._graph.add_node(v)
         c = filtered_edge_insert(self._graph, edges)
         self._edge_count += c
+        if self._compact:
+            self._light_count.grow(v)
+            self._heavy_count.grow(v)
+        self._degrees.update_node(v, self._graph.degree[v])
+        for u in self._graph[v]:
+            if u != v:
+                self._degrees.add(u)
 
-        if self._is_heavy(v):
-            self._heavy_nodes.add(v)
+        self._classify(v)
         for u in self._graph[v]:
             if self._is_heavy(u) and u not in self._heavy_nodes:
                 self._heavy_nodes.add(u)
@@ -339,12 +554,27 @@ class ImprovedDynamicMIS(Algorithm):
         if self._is_light(v) and self._light_count[v] == 0:
             self._insert_into_light_mis(v)
 
-        self._compute_heavy_mis()
+        for w in self._graph[v]:
+            if w in self._heavy_mis:
+                self._heavy_count[v] += 1
+        self._dirty.append(v)
+        self._dirty.extend(self._graph[v])
+        self._update_heavy_mis()
 
     def remove_node(self, v):
         neighbors = set(self._graph[v])
+        if v in self._heavy_mis:
+            self._heavy_mis.remove(v)
+            for w in neighbors:
+                self._heavy_count[w] -= 1
+        self._heavy_count.pop(v, None)
+
         self._graph.remove_node(v)
         del self._light_count[v]
+        self._degrees.remove(v)
+        for u in neighbors:
+            if u != v:
+                self._degrees.add(u, -1)
 
         self._edge_count -= len(neighbors)
 
@@ -362,14 +592,20 @@ class ImprovedDynamicMIS(Algorithm):
             self._decrease_light_count(neighbors)
 
         for w in neighbors:
-            if self._light_count[w] == 0 and w not in self._light_mis:
+            if self._light_count[w] == 0 and w not in self._light_mis and self._is_light(w):
                 self._insert_into_light_mis(w)
 
-        self._compute_heavy_mis()
+        self._dirty.extend(neighbors)
+        self._update_heavy_mis()
 
     def remove_edge(self, u, v):
         self._graph.remove_edge(u, v)
         self._edge_count -= 1
+        self._degrees.update_edge(self._graph, u, v, -1)
+        self._update_heavy_count(u, v, -1)
+        for node in [u, v]:
+            if node in self._heavy_nodes and self._is_light(node):
+                self._heavy_nodes.remove(node)
 
         if self.new_phase():
             return
@@ -379,36 +615,36 @@ class ImprovedDynamicMIS(Algorithm):
             self._decrease_light_count([non_mis_node])
 
         for node in [u, v]:
-            if self._light_count[node] == 0 and node not in self._light_mis:
+            if self._light_count[node] == 0 and node not in self._light_mis and self._is_light(node):
                 self._insert_into_light_mis(node)
 
-            if node in self._heavy_nodes and self._is_light(node):
-                self._heavy_nodes.remove(node)
-
-        self._compute_heavy_mis()
+        self._dirty.append(u)
+        self._dirty.append(v)
+        self._update_heavy_mis()
 
     def insert_edge(self, u, v):
-        assert u in self._graph and v in self._graph
+        if u not in self._graph or v not in self._graph:
+            raise KeyError('Edge {} has an endpoint that is not in the graph'.format((u, v)))
 
         if self._graph.has_edge(u, v):
             return
 
         self._graph.add_edge(u, v)
         self._edge_count += 1
+        self._degrees.update_edge(self._graph, u, v, 1)
+        self._update_heavy_count(u, v, 1)
+        for node in [u, v]:
+            if self._is_heavy(node) and node not in self._heavy_nodes:
+                self._heavy_nodes.add(node)
 
         if self.new_phase():
             return
 
         for node, other in [(u, v), (v, u)]:
-            if self._is_heavy(node) and node not in self._heavy_nodes:
-                self._heavy_nodes.add(node)
-
             # Adding the edge could make a vertex heavy
             if node in self._light_mis and self._is_heavy(node):
                 self._remove_from_light_mis(node)
-                if other in self._light_mis:
-                    self._light_count[node] += 1
-                    assert self._light_count[node] == 1
+                # The count for other is added below, once the light mis is settled
 
                 # neighbor already sees new edge
                 # old_neighbors = set(self._graph[node])
@@ -419,22 +655,92 @@ class ImprovedDynamicMIS(Algorithm):
         if u in self._light_mis and v in self._light_mis:
             self._remove_from_light_mis(u)
             self._light_count[u] += 1
-            assert self._light_count[u] == 1
+            # assert self._light_count[u] == 1
             # No need to decrease light count of v
             self._decrease_light_count(self._graph[u], skip=v)
         elif u in self._light_mis or v in self._light_mis:
             non_mis_node = u if v in self._light_mis else v
             self._light_count[non_mis_node] += 1
 
-        self._compute_heavy_mis()
+        self._dirty.append(u)
+        self._dirty.append(v)
+        self._update_heavy_mis()
+
+    def _apply_edge_batch(self, inserted, removed):
+        touched = []
+        for u, v in removed:
+            if not self._graph.has_edge(u, v):
+                continue
+            self._graph.remove_edge(u, v)
+            self._edge_count -= 1
+            self._degrees.update_edge(self._graph, u, v, -1)
+            self._update_heavy_count(u, v, -1)
+            if u in self._light_mis:
+                self._light_count[v] -= 1
+            if v in self._light_mis:
+                self._light_count[u] -= 1
+            touched.append(u)
+            touched.append(v)
+
+        for u, v in inserted:
+            if u not in self._graph or v not in self._graph:
+                raise KeyError('Edge {} has an endpoint that is not in the graph'.format((u, v)))
+            if self._graph.has_edge(u, v):
+                continue
+            self._graph.add_edge(u, v)
+            self._edge_count += 1
+            self._degrees.update_edge(self._graph, u, v, 1)
+            self._update_heavy_count(u, v, 1)
+            if u in self._light_mis:
+                self._light_count[v] += 1
+            if v in self._light_mis:
+                self._light_count[u] += 1
+            touched.append(u)
+            touched.append(v)
+
+        for v in touched:
+            self._classify(v)
+
+        if self.new_phase():
+            return
+
+        # Light mis nodes that became heavy or got a light mis neighbor leave the light mis
+        freed = []
+        for v in touched:
+            if v in self._light_mis and (self._is_heavy(v) or self._light_count[v] > 0):
+                self._remove_from_light_mis(v)
+                for w in self._graph[v]:
+                    self._light_count[w] -= 1
+                    freed.append(w)
+
+        for nodes in (touched, freed):
+            for v in nodes:
+                if self._light_count[v] == 0 and v not in self._light_mis and self._is_light(v):
+                    self._insert_into_light_mis(v)
+
+        self._dirty.extend(touched)
+        self._dirty.extend(freed)
+        self._update_heavy_mis()
+
+    def _counter(self):
+        if self._compact:
+            return CounterArray(node_capacity(self._graph))
+        return defaultdict(lambda: 0)
+
+    def _classify(self, v):
+        if self._is_heavy(v):
+            self._heavy_nodes.add(v)
+        else:
+            self._heavy_nodes.discard(v)
 
     def _became_heavy(self, v):
         # Node should be heavy but light with one neighbor less
-        deg = self._graph.degree[v]
+        deg = self._degrees[v]
         return deg >= self._delta_c > deg - 1
 
     def _remove_from_light_mis(self, v):
-        assert v in self._light_mis
+        # The hot path assertions are commented out, ValidatedMIS checks the touched nodes with is_valid_at
+        # assert v in self._light_mis
         self._light_mis.remove(v)
 
     def _decrease_light_count(self, nodes, skip=None):
@@ -442,47 +748,114 @@ class ImprovedDynamicMIS(Algorithm):
             if v == skip:
                 continue
 
-            assert self._light_count[v] > 0
+            # assert self._light_count[v] > 0
             self._light_count[v] -= 1
+            self._dirty.append(v)
             if self._light_count[v] == 0 and self._is_light(v):
                 self._insert_into_light_mis(v)
 
     def _insert_into_light_mis(self, v):
-        assert self._is_light(v)
-        assert v not in self._light_mis
+        # assert self._is_light(v)
+        # assert v not in self._light_mis
 
         self._light_mis.add(v)
         for w in self._graph[v]:
-            assert w not in self._light_mis
+            # assert w not in self._light_mis
             self._light_count[w] += 1
+        # Heavy neighbors with a light mis neighbor can't stay in the heavy mis
+        self._dirty.extend(self._graph[v])
 
     def _is_heavy(self, v):
-        return self._graph.degree[v] >= self._delta_c
+        return self._degrees[v] >= self._delta_c
 
     def _is_light(self, v):
-        return self._graph.degree[v] < self._delta_c
+        return self._degrees[v] < self._delta_c
         # return not self._is_heavy(v)
 
     def get_mis(self):
-        return set.union(self._light_mis, self._heavy_mis)
+        return MISView(self._light_mis, self._heavy_mis)
 
     def is_in_mis(self, node):
         return node in self._heavy_mis or node in self._light_mis
 
     def _candidate_for_heavy_mis(self, v):
         # return self._is_heavy(v) and self._light_count[v] == 0
-        # In line is heavy to save a func call
-        return self._graph.degree[v] >= self._delta_c and self._light_count[v] == 0
+        # Heavy nodes set is checked first, most nodes are light
+        return v in self._heavy_nodes and self._light_count[v] == 0
 
     def _compute_heavy_mis(self):
-        self._heavy_mis = TrivialMIS.compute(self._graph.subgraph(self._heavy_nodes),
-                                             candidate_filter=lambda n: self._light_count[n] == 0)
+        # Only heavy nodes can be in the heavy mis, so checking all neighbors is the same as
+        # checking the neighbors in the heavy subgraph. This avoids a subgraph view per update.
+        heavy_mis = TrivialMIS.compute(self._graph, nodes=self._heavy_nodes,
+                                       candidate_filter=lambda n: self._light_count[n] == 0)
+        self._heavy_mis.intersection_update(heavy_mis)
+        self._heavy_mis.update(heavy_mis)
+        self._heavy_count = self._counter()
+        for v in self._heavy_mis:
+            for w in self._graph[v]:
+                self._heavy_count[w] += 1
+        self._dirty = []
+
+    def _update_heavy_count(self, u, v, delta):
+        if u in self._heavy_mis:
+            self._heavy_count[v] += delta
+        if v in self._heavy_mis:
+            self._heavy_count[u] += delta
+
+    def _update_heavy_mis(self):
+        # Local repair of the heavy mis around the dirty nodes.
+        # Nodes leave if they are no candidate anymore or conflict with another heavy mis node,
+        # afterwards freed candidates without heavy mis neighbors join.
+        dirty = self._dirty
+        self._dirty = []
+
+        freed = []
+        for v in dirty:
+            if v in self._heavy_mis and (not self._candidate_for_heavy_mis(v) or self._heavy_count[v] > 0):
+                self._heavy_mis.remove(v)
+                for w in self._graph[v]:
+                    self._heavy_count[w] -= 1
+                    freed.append(w)
+
+        for nodes in (dirty, freed):
+            for v in nodes:
+                if self._candidate_for_heavy_mis(v) and v not in self._heavy_mis and self._heavy_count[v] == 0:
+                    self._heavy_mis.add(v)
+                    for w in self._graph[v]:
+                        self._heavy_count[w] += 1
 
     def is_valid_mis(self):
         assert self.is_valid_light_count()
         assert self.is_valid_light_mis()
+        assert self.is_valid_heavy_mis()
         return Algorithm.is_valid_mis(self)
 
+    def is_valid_at(self, nodes):
+        # The local checks of Algorithm plus the light and heavy counts of the nodes
+        for v in nodes:
+            if v not in self._graph:
+                continue
+            neighbors = self._graph[v]
+            if self._light_count[v] != sum(map(self._light_mis.__contains__, neighbors)):
+                return False
+            if self._heavy_count[v] != sum(map(self._heavy_mis.__contains__, neighbors)):
+                return False
+            if self._is_light(v) and self._light_count[v] == 0 and v not in self._light_mis:
+                return False
+            if v in self._light_mis and (self._is_heavy(v) or v in self._heavy_mis):
+                return False
+        return Algorithm.is_valid_at(self, nodes)
+
+    def is_valid_heavy_mis(self):
+        for v in self._graph.nodes:
+            if self._heavy_count[v] != sum(1 for w in self._graph[v] if w in self._heavy_mis):
+                return False
+            if v in self._heavy_mis and not self._candidate_for_heavy_mis(v):
+                return False
+            if self._candidate_for_heavy_mis(v) and (v in self._heavy_mis) == (self._heavy_count[v] > 0):
+                return False
+        return True
+
     def is_valid_light_mis(self):
         assert self.is_valid_light_count()
         for v in self._graph.nodes:
@@ -504,15 +877,20 @@ class ImprovedDynamicMIS(Algorithm):
 
 
 class ImplicitMIS(Algorithm):
+    mis_attributes = ('_independent_set',)
 
-    def __init__(self, graph):
+    def __init__(self, graph, compact=False):
+        # compact keeps the independent set in a MembershipSet and the degrees in a CompactDegreeIndex.
+        # The counts stay in a dict, only heavy nodes have one.
         super(ImplicitMIS, self).__init__(graph)
         self._m_c = self._graph.number_of_edges()
         self._heavy_threshold = self._m_c ** 0.5
         self._edge_count = self._m_c
         self._almost_heavy_count = dict()
         self._almost_heavy_nodes = None
-        self._independent_set = set()
+        self._independent_set = MembershipSet(size=node_capacity(graph)) if compact else set()
+        # Degree buckets, phase changes and almost_heavy_nodes only look at the nodes in the affected degree range
+        self._degrees = (CompactDegreeIndex if compact else DegreeIndex)(self._graph.degree)
 
         self._count = defaultdict(lambda: 0)
         # In the beginning this will always return 0
@@ -532,18 +910,14 @@ class ImplicitMIS(Algorithm):
 
         if self._edge_count <= self._m_c/2.0:
             # Lowering the boundary
-            # Have we calculated all counts?
-            for v in self.almost_heavy_nodes():
-                if v not in self._almost_heavy_count:
-                    self._almost_heavy_count[v] = self._calculate_count(v)
-            # for v in self._almost_heavy_nodes():
-            #     if v not in self._almost_heavy_count:
-            #         self._almost_heavy_count[v] = self._calculate_count(v)
-            assert all(v in self._almost_heavy_count for v in self.almost_heavy_nodes())
-            self._count = {**self._count, **self._almost_heavy_count}
-            # for v in self._graph:
-            #     if self.is_heavy(v):
-            #         assert v in self._count
+            # Nodes that become heavy take their count from the almost heavy precomputation if possible.
+            # Nodes above the old threshold are heavy already.
+            for v in self._degrees.between(new_threshold, self._heavy_threshold):
+                if v not in self._count and self._degrees[v] > new_threshold:
+                    if v in self._almost_heavy_count:
+                        self._count[v] = self._almost_heavy_count[v]
+                    else:
+                        self._count[v] = self._calculate_count(v)
         elif self._edge_count >= 2*self._m_c:
             # Raising the boundary
             # Remove count from the now light nodes
@@ -552,9 +926,10 @@ class ImplicitMIS(Algorithm):
             #     if self._graph.degree[v] < new_threshold:
             #         del self._count[v]
 
-            # Removing them costs 0.1 s in Topology
-            for v in self._graph.nodes:
-                if v in self._count and self._graph.degree[v] < new_threshold:
+            # Removing them costs 0.1 s in Topology with a scan over all nodes, only nodes that were heavy before
+            # can have a count
+            for v in self._degrees.between(self._heavy_threshold, new_threshold):
+                if v in self._count and self._degrees[v] <= new_threshold:
                     del self._count[v]
         else:
             raise ValueError
@@ -567,57 +942,104 @@ class ImplicitMIS(Algorithm):
         return True
 
     def insert_node(self, v, edges=[]):
-        raise NotImplementedError
+        # The new node is decided lazily like every other node, its edges are inserted one by one
+        self._graph.add_node(v)
+        self._degrees.update_node(v, self._graph.degree[v])
+        for a, b in edges:
+            if self._graph.has_node(a) and self._graph.has_node(b) and not self._graph.has_edge(a, b):
+                self._add_edge(a, b)
+                self.update_almost_heavy()
+        self.new_phase()
 
     def remove_node(self, v):
-        raise NotImplementedError
+        neighbors = [w for w in self._graph[v] if w != v]
+        if v in self._independent_set:
+            self._independent_set.remove(v)
+            for w in neighbors:
+                self._update_count(w, -1)
+
+        # A self loop is one more edge
+        self._edge_count -= len(neighbors) + (self._graph.degree[v] - len(neighbors) > 0)
+        self._graph.remove_node(v)
+        self._degrees.remove(v)
+        self._count.pop(v, None)
+        self._almost_heavy_count.pop(v, None)
+        if self._almost_heavy_nodes is not None:
+            self._almost_heavy_nodes.discard(v)
+
+        # Neighbors that lost their only independent set neighbor are found by the next query
+        for w in neighbors:
+            self._degrees.add(w, -1)
+            if w in self._count and self.is_light(w):
+                del self._count[w]
+
+        self.new_phase()
+        self.update_almost_heavy()
 
     def insert_edge(self, u, v):
         if self._graph.has_edge(u, v):
             return
 
-        self._graph.add_edge(u, v)
-        self._edge_count += 1
+        self._add_edge(u, v)
+        self.new_phase()
+        self.update_almost_heavy()
+
+    def remove_edge(self, u, v):
+        self._remove_edge(u, v)
         self.new_phase()
         self.update_almost_heavy()
 
-        # Do this first so that newly heavy nodes have a count
+    def _apply_edge_batch(self, inserted, removed):
+        # Counts are kept exact for every edge, the phase is only checked once per batch
+        for u, v in removed:
+            if self._graph.has_edge(u, v):
+                self._remove_edge(u, v)
+                self.update_almost_heavy()
+        for u, v in inserted:
+            if not self._graph.has_edge(u, v):
+                self._add_edge(u, v)
+                self.update_almost_heavy()
+        self.new_phase()
+
+    def _add_edge(self, u, v):
+        self._graph.add_edge(u, v)
+        self._edge_count += 1
+        self._degrees.update_edge(self._graph, u, v, 1)
+
         for node, other in [(u, v), (v, u)]:
-            if self.is_heavy(node) and node not in self._count:
+            if node not in self._count and self.is_heavy(node):
+                # Newly heavy node, _calculate_count already sees edge (node, other)
                 self._count[node] = self._calculate_count(node)
-                # _calculate_count already sees edge (node, other) -> result is 1 too high
-                if other in self._independent_set:
-                    self._count[node] -= 1
+                # A precomputed count missed edge (node, other) too, new_phase copies it back into _count
+                if node in self._almost_heavy_count:
+                    self._almost_heavy_count[node] = self._count[node]
+            elif other in self._independent_set:
+                self._update_count(node, 1)
 
         if u in self._independent_set and v in self._independent_set:
             self._independent_set.remove(u)
-            if self._graph.degree[node] > self._heavy_threshold:
-                self._count[u] = 1
+            # The count of v already includes u
             for w in self._graph[u]:
-                # Check for w != higher_deg here, because the new edge did not influence the count
-                if self._graph.degree[node] > self._heavy_threshold and w != v:
-                    # assert self._count[w] > 0
-                    self._count[w] -= 1
-
-        elif u in self._independent_set or v in self._independent_set:
-            non_mis_node = v if u in self._independent_set else u
-            if self._graph.degree[node] > self._heavy_threshold:
-                self._count[non_mis_node] += 1
+                self._update_count(w, -1)
 
-    def remove_edge(self, u, v):
+    def _remove_edge(self, u, v):
         self._graph.remove_edge(u, v)
         self._edge_count -= 1
-        self.new_phase()
-        self.update_almost_heavy()
+        self._degrees.update_edge(self._graph, u, v, -1)
 
         for node, other in [(u, v), (v, u)]:
-            if self.is_heavy(node) and other in self._independent_set:
-                self._count[node] -= 1
-            elif node in self._almost_heavy_count and other in self._independent_set:
-                self._almost_heavy_count[node] -= 1
-            elif self.is_light(node) and node in self._count:
+            if other in self._independent_set:
+                self._update_count(node, -1)
+            if node in self._count and self.is_light(node):
                 del self._count[node]
 
+    def _update_count(self, node, delta):
+        # Heavy nodes and nodes with a precomputed count track their independent set neighbors
+        if node in self._count or self.is_heavy(node):
+            self._count[node] += delta
+        if node in self._almost_heavy_count:
+            self._almost_heavy_count[node] += delta
+
     def update_almost_heavy(self):
         if self._edge_count < self._m_c:
             # Calculate the count of one node that will become heavy in the next boundary reduction
@@ -632,17 +1054,16 @@ class ImplicitMIS(Algorithm):
             self._almost_heavy_count.clear()
 
     def is_heavy(self, node):
-        return self._graph.degree[node] > self._heavy_threshold
+        return self._degrees[node] > self._heavy_threshold
 
     def is_light(self, node):
-        return self._graph.degree[node] <= self._heavy_threshold
+        return self._degrees[node] <= self._heavy_threshold
 
     def is_almost_heavy(self, node):
-        return self._heavy_threshold >= self._graph.degree[node] >= (self._m_c / 2.0) ** 0.5
+        return self._heavy_threshold >= self._degrees[node] >= (self._m_c / 2.0) ** 0.5
 
     def almost_heavy_nodes(self):
-        f = filter(self.is_almost_heavy, self._graph.nodes)
-        return set(f)
+        return set(self._degrees.between((self._m_c / 2.0) ** 0.5, self._heavy_threshold))
 
     def _calculate_count(self, node):
         # assert self.is_heavy(node)
@@ -657,8 +1078,7 @@ class ImplicitMIS(Algorithm):
         self._independent_set.add(v)
         for w in self._graph[v]:
             # assert w not in self._independent_set
-            if self.is_heavy(w):
-                self._count[w] += 1
+            self._update_count(w, 1)
 
     def is_in_mis(self, node):
         if node in self._independent_set:
@@ -678,6 +1098,151 @@ class ImplicitMIS(Algorithm):
         return False
 
     def get_mis(self):
-        for v in self._graph.nodes:
-            self.is_in_mis(v)
-        return self._independent_set
+        # Nodes join lazily, the view queries them when it is used
+        return QueryView(self)
+
+
+_MASK63 = (1 << 63) - 1
+
+
+def random_rank(v, seed=0):
+    # Position of v in a random order of all node ids that only depends on v and seed, so the order is the same
+    # after a snapshot and independent of the update history. splitmix64 on 63 bits is a bijection, distinct int
+    # ids in [0, 2^63) never tie. Other labels are hashed to an int first.
+    if isinstance(v, int):
+        x = v
+    else:
+        x = int.from_bytes(hashlib.blake2b(repr(v).encode(), digest_size=8).digest(), 'little')
+    x = (x + seed * 0x9E3779B97F4A7C15) & _MASK63
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK63
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK63
+    return x ^ (x >> 31)
+
+
+class RandomPriorityMIS(Algorithm):
+    # Maintains the lexicographically first mis under the random order of random_rank: a node is in the mis
+    # iff none of its earlier neighbors is. The count of a node only includes its earlier mis neighbors.
+    # After an update the nodes whose count crossed zero are settled in rank order with a heap, so every node
+    # changes at most once and only nodes with a changed earlier neighbor are visited. The mis only depends on
+    # the current graph, which bounds the expected number of mis changes per update by O(1) for an update
+    # sequence that doesn't know the seed.
+    mis_attributes = ('_mis',)
+
+    # compact keeps the counts in a CounterArray and the mis in a MembershipSet (see compact.py). The ranks
+    # stay in a dict, they don't fit into an int32 array.
+    def __init__(self, graph, seed=0, compact=False):
+        super(RandomPriorityMIS, self).__init__(graph)
+        self._seed = seed
+        self._compact = compact
+        self._rank = {v: random_rank(v, seed) for v in self._graph.nodes}
+        self._count = CounterArray(node_capacity(graph)) if compact else defaultdict(lambda: 0)
+        self._mis = MembershipSet(size=len(self._count)) if compact else set()
+
+        rank = self._rank
+        for v in sorted(rank, key=rank.__getitem__):
+            if self._count[v] == 0:
+                self._mis.add(v)
+                r = rank[v]
+                for w in self._graph[v]:
+                    if rank[w] > r:
+                        self._count[w] += 1
+
+    def _earlier(self, u, v):
+        # The endpoints ordered by rank
+        return (u, v) if self._rank[u] < self._rank[v] else (v, u)
+
+    def _propagate(self, nodes):
+        # Settles nodes whose membership no longer matches their count. A node is popped after all of its
+        # earlier neighbors are settled, so its count is final then.
+        rank, count, mis, graph = self._rank, self._count, self._mis, self._graph
+        heap = [(rank[v], v) for v in nodes if (count[v] == 0) != (v in mis)]
+        heapq.heapify(heap)
+        while heap:
+            r, v = heapq.heappop(heap)
+            joins = count[v] == 0
+            if joins == (v in mis):
+                continue
+            if joins:
+                mis.add(v)
+                delta = 1
+            else:
+                mis.remove(v)
+                delta = -1
+            for w in graph[v]:
+                if rank[w] > r:
+                    c = count[w] + delta
+                    count[w] = c
+                    if (c == 0) != (w in mis):
+                        heapq.heappush(heap, (rank[w], w))
+
+    def insert_edge(self, u, v):
+        assert u in self._graph and v in self._graph
+        if self._graph.has_edge(u, v):
+            return
+        self._graph.add_edge(u, v)
+
+        earlier, later = self._earlier(u, v)
+        if earlier in self._mis:
+            self._count[later] += 1
+            self._propagate([later])
+
+    def remove_edge(self, u, v):
+        self._graph.remove_edge(u, v)
+
+        earlier, later = self._earlier(u, v)
+        if earlier in self._mis:
+            self._count[later] -= 1
+            self._propagate([later])
+
+    def _apply_edge_batch(self, inserted, removed):
+        # The counts follow every edge while the mis stays unchanged, the heap settles all later endpoints once
+        touched = []
+        for u, v in removed:
+            if not self._graph.has_edge(u, v):
+                continue
+            self._graph.remove_edge(u, v)
+            earlier, later = self._earlier(u, v)
+            if earlier in self._mis:
+                self._count[later] -= 1
+                touched.append(later)
+        for u, v in inserted:
+            assert u in self._graph and v in self._graph
+            if self._graph.has_edge(u, v):
+                continue
+            self._graph.add_edge(u, v)
+            earlier, later = self._earlier(u, v)
+            if earlier in self._mis:
+                self._count[later] += 1
+                touched.append(later)
+        self._propagate(touched)
+
+    def insert_node(self, v, edges=[]):
+        self._graph.add_node(v)
+        filtered_edge_insert(self._graph, edges)
+
+        r = self._rank[v] = random_rank(v, self._seed)
+        if self._compact:
+            self._count.grow(v)
+        self._count[v] = sum(1 for w in self._graph[v] if self._rank[w] < r and w in self._mis)
+        self._propagate([v])
+
+    def remove_node(self, v):
+        r = self._rank[v]
+        later = [w for w in self._graph[v] if self._rank[w] > r]
+        if v in self._mis:
+            self._mis.remove(v)
+            for w in later:
+                self._count[w] -= 1
+        else:
+            later = []
+
+        self._graph.remove_node(v)
+        del self._rank[v]
+        self._count.pop(v, None)
+        self._propagate(later)
+
+    def is_in_mis(self, node):
+        return node in self._mis
+
+    def get_mis(self):
+        return MISView(self._mis)
@@ -1,18 +1,48 @@
 from dynamic_mis.algorithm import *
+from dynamic_mis.edgefile import load_edge_file
+from dynamic_mis.feed import TrackedMIS
+from dynamic_mis.generators import *
+from dynamic_mis.graph import AdjacencyGraph
+from dynamic_mis.instrumentation import InstrumentedMIS, LatencyHistogram
+from dynamic_mis.validation import VALIDATION_LEVELS, ValidatedMIS
+from dynamic_mis.interning import NodeInterner
+from dynamic_mis.vectorized import CSRGraph, luby_mis
+from dynamic_mis.parallel import parallel_luby_mis
+from dynamic_mis.sharded import ShardedMIS, ShardWorkers
+from dynamic_mis.stream import konect_events, replay
+from functools import partial
 from dynamic_mis.utility import *
+import argparse
+import csv
+import datetime
+import gc
+import json
+import numpy as np
 import numpy.random as npr
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
 import timeit
+import tracemalloc
 
+BACKENDS = {'networkx': nx.Graph, 'adjacency': AdjacencyGraph}
 
-def edge_from_line(line):
+
+def edge_from_line(line, interner=None):
     items = line.split()
+    if interner is not None:
+        return interner.intern_edge(items[0], items[1])
     return items[0], items[1]
 
 
-def nodes_from_file(dataset_file):
+def nodes_from_file(dataset_file, interner=None):
     nodes = set()
     for line in open(dataset_file):
-        e = edge_from_line(line)
+        e = edge_from_line(line, interner)
         if e[0] not in nodes:
             nodes.add(e[0])
         if e[1] not in nodes:
@@ -21,8 +51,15 @@ def nodes_from_file(dataset_file):
     return nodes
 
 
-def benchmark_edge_insertion(algo_cls, nodes, edges, benchmark_name=""):
-    graph = nx.Graph()
+def dataset_from_file(dataset_file):
+    # Node labels are interned to dense ints, the algorithms never see the strings.
+    # The text file is converted to a binary edge file on first use, reruns memory map that instead.
+    edge_file = load_edge_file(dataset_file)
+    return edge_file.nodes(), edge_file.edge_list(), edge_file.interner()
+
+
+def benchmark_edge_insertion(algo_cls, nodes, edges, benchmark_name="", backend=nx.Graph):
+    graph = backend()
     graph.add_nodes_from(nodes)
 
     def execute():
@@ -36,10 +73,10 @@ def benchmark_edge_insertion(algo_cls, nodes, edges, benchmark_name=""):
     return t
 
 
-def average_insertion_runs(algo_cls, nodes, edges, benchmark_name="", runs=5):
+def average_insertion_runs(algo_cls, nodes, edges, benchmark_name="", runs=5, backend=nx.Graph):
     total = 0
     for _ in range(runs):
-        total += benchmark_edge_insertion(algo_cls, nodes, edges, benchmark_name)
+        total += benchmark_edge_insertion(algo_cls, nodes, edges, benchmark_name, backend)
     total /= runs
     print("Average Benchmark {} in t={:.3f}\n".format(benchmark_name, total))
     return total
@@ -78,40 +115,109 @@ def benchmark_initialization(algo_cls, graph, benchmark_name=""):
     return t
 
 
-def graph_from_file(file):
-    g = nx.Graph()
-    edges = []
-    for line in open(file):
-        edges.append(edge_from_line(line))
-
+def graph_from_file(file, backend=nx.Graph):
+    edges = load_edge_file(file).edge_list()
+    g = backend()
     g.add_edges_from(edges)
     return g, edges
 
 
-def brightkite(data_dir, seed=2, iterations=10000):
+def graph_memory(backend, nodes, edges):
+    # Only the allocations of the graph itself are traced, nodes and edges already exist
+    tracemalloc.start()
+    g = backend()
+    g.add_nodes_from(nodes)
+    g.add_edges_from(edges)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def report_backend_memory(file, benchmark_name="", backends=BACKENDS):
+    nodes, edges, _ = dataset_from_file(file)
+
+    sizes = {name: graph_memory(backend, nodes, edges) for name, backend in backends.items()}
+    for name, size in sizes.items():
+        print("Graph Memory {} {}: {:.1f} MiB".format(benchmark_name, name, size / 2 ** 20))
+        if name != 'networkx' and 'networkx' in sizes:
+            print("Memory Saving {} {}: {:.2f}x".format(benchmark_name, name, sizes['networkx'] / size))
+    print()
+    return sizes
+
+
+def report_backend_speedup(times, benchmark_name=""):
+    # times maps backend name -> {benchmark: seconds}
+    if 'networkx' not in times:
+        return
+    base = times['networkx']
+    for name, results in times.items():
+        if name == 'networkx':
+            continue
+        for benchmark, t in results.items():
+            print("Speedup {} {} {}: {:.2f}x".format(benchmark_name, benchmark, name, base[benchmark] / t))
+    print()
+
+
+def brightkite(data_dir, seed=2, iterations=10000, backends=BACKENDS):
     file = data_dir + 'loc-brightkite_edges/out.loc-brightkite_edges'
-    graph, edges = graph_from_file(file)
 
-    rnd = npr.RandomState(seed)
-    idx = rnd.choice(len(edges), size=iterations, replace=False)
-    removals = [edges[i] for i in idx]
+    times = dict()
+    for backend_name, backend in backends.items():
+        graph, edges = graph_from_file(file, backend)
+
+        rnd = npr.RandomState(seed)
+        idx = rnd.choice(len(edges), size=iterations, replace=False)
+        removals = [edges[i] for i in idx]
+
+        name = 'Brightkite ({})'.format(backend_name)
+        times[backend_name] = {
+            'Trivial Init': benchmark_initialization(TrivialMIS, graph, name + " Trivial Init"),
+            'Simple Init': benchmark_initialization(SimpleMIS, graph, name + " Simple Init"),
+            'Dynamic Init': benchmark_initialization(ImprovedDynamicMIS, graph, name + " Dynamic Init"),
+            'Implicit Init': benchmark_initialization(ImplicitMIS, graph, name + " Implicit Init"),
+            'Luby Init': benchmark_initialization(luby_mis, graph, name + " Luby Init"),
+            'Simple Luby Init': benchmark_initialization(partial(SimpleMIS, initializer=luby_mis), graph,
+                                                         name + " Simple Luby Init"),
+
+            'Trivial': average_deletion_runs(TrivialMIS, graph, removals, name + " Trivial"),
+            'Simple': average_deletion_runs(SimpleMIS, graph, removals, name + " Simple"),
+            'Improved Dynamic': average_deletion_runs(ImprovedDynamicMIS, graph, removals, name + " Improved Dynamic"),
+            'Implicit': average_deletion_runs(ImplicitMIS, graph, removals, name + " Implicit"),
+        }
+
+    report_backend_speedup(times, 'Brightkite')
+    report_backend_memory(file, 'Brightkite', backends)
+
+
+def benchmark_stream_replay(algo_cls, file, benchmark_name="", backend=AdjacencyGraph, batch_size=1, sort=False,
+                            limit=None):
+    # Replays the timestamped +1/-1 events of a KONECT file, starting from an empty graph
+    def execute():
+        algo = algo_cls(backend())
+        counts = replay(algo, konect_events(file, NodeInterner(), sort=sort), batch_size, limit)
+        print("Replayed {}".format(counts))
 
-    benchmark_initialization(TrivialMIS, graph, "Brightkite Trivial Init")
-    benchmark_initialization(SimpleMIS, graph, "Brightkite Simple Init")
-    benchmark_initialization(ImprovedDynamicMIS, graph, "Brightkite Dynamic Init")
-    benchmark_initialization(ImplicitMIS, graph, "Brightkite Implicit Init")
+    print('Starting Stream Benchmark ' + benchmark_name)
+    t = timeit.timeit(execute, number=1)
+    print("Completed Benchmark {} in t={:.3f}".format(benchmark_name, t))
+    return t
 
-    average_deletion_runs(TrivialMIS, graph, removals, "Brightkite Trivial")
-    average_deletion_runs(SimpleMIS, graph, removals, "Brightkite Simple")
-    average_deletion_runs(ImprovedDynamicMIS, graph, removals, "Brightkite Improved Dynamic")
-    average_deletion_runs(ImplicitMIS, graph, removals, "Brightkite Implicit")
+
+def youtube_stream(data_dir, backend=AdjacencyGraph, batch_size=1, limit=None):
+    file = data_dir + 'youtube-u-growth/out.youtube-u-growth'
+    name = 'Youtube Stream (batch size {})'.format(batch_size)
+    return {
+        'Simple': benchmark_stream_replay(SimpleMIS, file, name + ' Simple', backend, batch_size, limit=limit),
+        'Improved Dynamic': benchmark_stream_replay(ImprovedDynamicMIS, file, name + ' Improved Dynamic', backend,
+                                                    batch_size, limit=limit),
+        'Implicit': benchmark_stream_replay(ImplicitMIS, file, name + ' Implicit', backend, batch_size, limit=limit),
+    }
 
 
 # In the final graph all nodes are considered light
 def wildbirds(data_dir):
     file = data_dir + 'aves-wildbird-network.edges'
-    nodes = nodes_from_file(file)
-    edges = [edge_from_line(line) for line in open(file)]
+    nodes, edges, _ = dataset_from_file(file)
     time_initialization_empty(file)
     # average_insertion_runs(TrivialMIS, nodes, edges, 'Wildbirds Trivial')
     average_insertion_runs(SimpleMIS, nodes, edges, 'Wildbirds Simple')
@@ -122,8 +228,7 @@ def wildbirds(data_dir):
 
 def topology(data_dir):
     file = data_dir + 'topology/out.topology'
-    nodes = nodes_from_file(file)
-    edges = [edge_from_line(line) for line in open(file)]
+    nodes, edges, _ = dataset_from_file(file)
 
     time_initialization_empty(file)
     # Takes a long time
@@ -136,32 +241,40 @@ def topology(data_dir):
 
 def facebook(data_dir):
     file = data_dir + 'facebook-wosn-links/out.facebook-wosn-links'
-    nodes = nodes_from_file(file)
-    edges = [edge_from_line(line) for line in open(file)]
+    nodes, edges, _ = dataset_from_file(file)
 
     time_initialization_empty(file)
     # average_insertion_runs(TrivialMIS, nodes, edges 'Facebook Trival')
     average_insertion_runs(SimpleMIS, nodes, edges, 'Facebook Simple')
     average_insertion_runs(ImprovedIncrementalMIS, nodes, edges, 'Facebook Improved Incremental')
-    # average_insertion_runs(ImprovedDynamicMIS, nodes, edges, 'Facebook Improved Dynamic')
+    average_insertion_runs(ImprovedDynamicMIS, nodes, edges, 'Facebook Improved Dynamic')
     average_insertion_runs(ImplicitMIS, nodes, edges, 'Facebook Implicit')
 
 
-def youtube(data_dir):
+def youtube(data_dir, backends=BACKENDS):
     file = data_dir + 'youtube-u-growth/out.youtube-u-growth'
-    nodes = nodes_from_file(file)
-    edges = [edge_from_line(line) for line in open(file)]
+    nodes, edges, _ = dataset_from_file(file)
 
     time_initialization_empty(file)
-    # average_insertion_runs(TrivialMIS, nodes, edges 'Youtube Trival')
-    average_insertion_runs(SimpleMIS, nodes, edges, 'Youtube Simple')
-    average_insertion_runs(ImprovedIncrementalMIS, nodes, edges, 'Youtube Improved Incremental')
-    # average_insertion_runs(ImprovedDynamicMIS, nodes, edges, 'Youtube Improved Dynamic')
-    average_insertion_runs(ImplicitMIS, nodes, edges, 'Youtube Implicit')
+    times = dict()
+    for backend_name, backend in backends.items():
+        name = 'Youtube ({})'.format(backend_name)
+        times[backend_name] = {
+            # 'Trivial': average_insertion_runs(TrivialMIS, nodes, edges, name + ' Trival', backend=backend),
+            'Simple': average_insertion_runs(SimpleMIS, nodes, edges, name + ' Simple', backend=backend),
+            'Improved Incremental': average_insertion_runs(ImprovedIncrementalMIS, nodes, edges,
+                                                           name + ' Improved Incremental', backend=backend),
+            'Improved Dynamic': average_insertion_runs(ImprovedDynamicMIS, nodes, edges,
+                                                       name + ' Improved Dynamic', backend=backend),
+            'Implicit': average_insertion_runs(ImplicitMIS, nodes, edges, name + ' Implicit', backend=backend),
+        }
+
+    report_backend_speedup(times, 'Youtube')
+    report_backend_memory(file, 'Youtube', backends)
 
 
 def time_initialization_empty(file):
-    nodes = nodes_from_file(file)
+    nodes, _, _ = dataset_from_file(file)
     graph = nx.Graph()
     graph.add_nodes_from(nodes)
     t = timeit.timeit(lambda: TrivialMIS.compute(graph), number=1)
@@ -169,30 +282,455 @@ def time_initialization_empty(file):
 
 
 def time_initialization_full(file):
-    nodes = nodes_from_file(file)
+    nodes, edges, _ = dataset_from_file(file)
     graph = nx.Graph()
     graph.add_nodes_from(nodes)
-    edges = [edge_from_line(line) for line in open(file)]
     graph.add_edges_from(edges)
     t = timeit.timeit(lambda: TrivialMIS.compute(graph), number=1)
     print("Completed Full Trivial in t={:.3f}".format(t))
+    t = timeit.timeit(lambda: luby_mis(graph), number=1)
+    print("Completed Full Luby in t={:.3f}".format(t))
+
+
+def time_parallel_initialization(file, workers=(1, 2, 4, 8), backend=AdjacencyGraph):
+    # Wall clock scaling of the process pool initializer against the number of workers
+    graph, _ = graph_from_file(file, backend)
+    csr = CSRGraph.from_graph(graph)
+    t = timeit.timeit(lambda: luby_mis(graph, csr=csr), number=1)
+    print("Completed Full Luby in t={:.3f}".format(t))
+    times = dict()
+    for w in workers:
+        times[w] = timeit.timeit(lambda: parallel_luby_mis(graph, workers=w, csr=csr), number=1)
+        print("Completed Parallel Luby with {} workers in t={:.3f} (speedup {:.2f}x over 1 worker)".format(
+            w, times[w], times[workers[0]] / times[w]))
+    return times
+
+
+DATASETS = {
+    'wildbirds': 'aves-wildbird-network.edges',
+    'topology': 'topology/out.topology',
+    'facebook': 'facebook-wosn-links/out.facebook-wosn-links',
+    'youtube': 'youtube-u-growth/out.youtube-u-growth',
+    'brightkite': 'loc-brightkite_edges/out.loc-brightkite_edges',
+}
+
+# Generated datasets, scale is the number of nodes. They are written to data_dir/synthetic/ on first use.
+SYNTHETIC = {
+    'pa': lambda scale, seed: preferential_attachment(scale, 3, seed),
+    'churn': lambda scale, seed: power_law_churn(scale, 3 * scale, 3 * scale, seed=seed),
+    'hubs': lambda scale, seed: hub_oscillation(scale, 3 * scale, hubs=4, rounds=scale, seed=seed),
+    'phases': lambda scale, seed: phase_oscillation(scale, 3 * scale, cycles=4, seed=seed),
+}
+
+
+def synthetic_file(data_dir, name, scale, seed=0):
+    file = os.path.join(data_dir, 'synthetic', 'out.{}-{}-{}'.format(name, scale, seed))
+    if not os.path.exists(file):
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+        write_konect(SYNTHETIC[name](scale, seed), file + '.tmp')
+        os.replace(file + '.tmp', file)
+    return file
+
+
+ALGORITHMS = {
+    'trivial': TrivialMIS,
+    'simple': SimpleMIS,
+    'incremental': ImprovedIncrementalMIS,
+    'degree': DegreeAwareMIS,
+    'dynamic': ImprovedDynamicMIS,
+    'implicit': ImplicitMIS,
+    'random': RandomPriorityMIS,
+    'sharded': ShardedMIS,
+}
+
+
+def _fresh_graph(backend, nodes, edges=()):
+    g = backend()
+    g.add_nodes_from(nodes)
+    g.add_edges_from(edges)
+    return g
 
 
-if __name__ == '__main__':
-    import sys
-    if len(sys.argv) > 1:
-        data_dir = sys.argv[1]
-    else:
-        data_dir = '../data/'
+def _operation(op, algo_cls, file, backend, args):
+    # Returns (setup, execute): setup builds the input of one run and is not timed, execute is timed
+    if op == 'stream':
+        return (lambda: algo_cls(backend()),
+                lambda algo: replay(algo, konect_events(file, NodeInterner(), sort=args.sort), args.batch_size,
+                                    args.limit))
+
+    edge_file = load_edge_file(file)
+    nodes, edges = edge_file.nodes(), edge_file.edge_list()
+    if op == 'init':
+        return lambda: _fresh_graph(backend, nodes, edges), algo_cls
+    if op == 'insert':
+        def insert(graph):
+            algo = algo_cls(graph)
+            for e in edges:
+                algo.insert_edge(*e)
+            return algo
+        return lambda: _fresh_graph(backend, nodes), insert
+    if op == 'delete':
+        idx = npr.RandomState(args.seed).choice(len(edges), size=min(args.removals, len(edges)), replace=False)
+        removals = [edges[i] for i in idx]
+
+        def delete(algo):
+            for e in removals:
+                algo.remove_edge(*e)
+            return algo
+        return lambda: algo_cls(_fresh_graph(backend, nodes, edges)), delete
+    raise ValueError('Unknown operation {}'.format(op))
 
-    # Insertions
-    # wildbirds(data_dir)
-    # topology(data_dir)
-    # facebook(data_dir)
-    # youtube(data_dir)
 
-    # Deletions
-    brightkite(data_dir, iterations=1000)
-    # brightkite(data_dir, iterations=10000)
-    # brightkite(data_dir, iterations=100000)
+def _instrumented(algo_cls, histograms, graph):
+    return InstrumentedMIS(algo_cls(graph), histograms)
+
+
+class ChurnMIS(TrackedMIS):
+    # Records the number of mis changes (joins plus leaves) of every update into a histogram, updates without
+    # changes included. ImplicitMIS only reports the joins of the nodes that are queried.
+
+    def __init__(self, algorithm, histogram):
+        super(ChurnMIS, self).__init__(algorithm)
+        self._histogram = histogram
+
+    def _publish(self):
+        delta = super(ChurnMIS, self)._publish()
+        self._histogram.record(len(delta.added) + len(delta.removed))
+        return delta
+
+
+def _churn(algo_cls, histogram, graph):
+    return ChurnMIS(algo_cls(graph), histogram)
+
+
+class _PrespawnedShards:
+    # Builds a ShardedMIS on workers that spawn() started in the untimed setup, so the process start is not timed
+
+    def __init__(self, shards):
+        self.shards = shards
+        self._workers = None
+
+    def spawn(self):
+        self._workers = ShardWorkers(self.shards)
+
+    def __call__(self, graph):
+        workers, self._workers = self._workers, None
+        return ShardedMIS(graph, self.shards, workers=workers)
+
+
+def _spawned_setup(prespawned, setup):
+    prespawned.spawn()
+    return setup()
+
+
+def _validated(algo_cls, level, graph):
+    return ValidatedMIS(algo_cls(graph), level)
+
+
+def _compact(algo_cls, graph):
+    if getattr(algo_cls, 'func', algo_cls) is TrivialMIS or isinstance(algo_cls, _PrespawnedShards):
+        # TrivialMIS recomputes from the graph and has no state to compact, ShardedMIS keeps it in its workers
+        raise NotImplementedError
+    return algo_cls(graph, compact=True)
+
+
+def _clear_histograms(histograms, churn):
+    # Drops what the warmup runs recorded
+    for h in histograms.values():
+        h.clear()
+    if churn is not None:
+        churn.clear()
+
+
+def report_latency(histograms, benchmark_name=""):
+    # Latency summaries in nanoseconds per operation, over all timed runs
+    latency = {op: h.summary() for op, h in histograms.items() if h.count > 0}
+    for op, s in latency.items():
+        print("Latency {} {}: n={count} p50={p50}ns p99={p99}ns p999={p999}ns max={max}ns".format(
+            benchmark_name, op, **s))
+    return latency
+
+
+def report_scaling(results):
+    # Speedup of the sharded runs over the smallest number of shards of the same dataset, operation and backend
+    base = dict()
+    for r in results:
+        if r['algorithm'] != 'sharded' or r['status'] != 'ok':
+            continue
+        key = r['dataset'], r['operation'], r['backend']
+        if key not in base:
+            base[key] = r
+        r['speedup'] = base[key]['median'] / r['median']
+        print("Scaling {} {} sharded ({}) {} shards: {:.2f}x over {} shards".format(
+            r['dataset'], r['operation'], r['backend'], r['shards'], r['speedup'], base[key]['shards']))
+    return results
+
+
+def report_churn(histogram, benchmark_name=""):
+    # Mis changes per update (per batch with --batch-size), over all timed runs
+    churn = histogram.summary()
+    print("Churn {}: n={count} mean={mean:.2f} p50={p50} p99={p99} max={max}".format(benchmark_name, **churn))
+    return churn
+
+
+def measure(setup, execute, runs=5, warmup=1, reset=None):
+    # Times runs executions after warmup untimed ones. Like timeit the garbage collector is off while timing.
+    # reset is called before the first timed run, e.g. to drop what the warmup runs recorded.
+    times = []
+    for i in range(warmup + runs):
+        if i == warmup and reset is not None:
+            reset()
+        state = setup()
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            execute(state)
+            t = time.perf_counter() - start
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if i >= warmup:
+            times.append(t)
+    return times
+
+
+# Allocations made by the graph backends, they are not part of the algorithm's state
+_GRAPH_FILTERS = [tracemalloc.Filter(True, os.path.join(os.path.dirname(nx.__file__), '*')),
+                  tracemalloc.Filter(True, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'graph.py'))]
+
+
+def rss():
+    # Resident set size in bytes, None where /proc is not available
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return None
+
+
+def max_rss():
+    # Peak resident set size of the process so far in bytes, ru_maxrss is in KiB on Linux and bytes on macOS
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RSSSampler(threading.Thread):
+    # Samples rss() every interval seconds while the with block runs
+
+    def __init__(self, interval=0.005):
+        super(RSSSampler, self).__init__(daemon=True)
+        self._interval = interval
+        self._done = threading.Event()
+        self.start_rss = self.last = self.peak = None
+
+    def __enter__(self):
+        self.start_rss = self.peak = rss()
+        if self.start_rss is not None:
+            self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        if self.is_alive():
+            self.join()
+        self.last = rss()
+        if self.last is not None:
+            self.peak = max(self.peak, self.last)
+
+    def run(self):
+        while not self._done.wait(self._interval):
+            self.peak = max(self.peak, rss())
+
+
+def measure_memory(setup, execute):
+    # Memory of the algorithm in bytes over one untimed run of setup and execute, graph allocations are left out.
+    # setup is traced too, delete builds the algorithm there and execute only shrinks it.
+    # tracemalloc gives steady (what the run left allocated, after a collection) and peak (the highest traced
+    # total minus the graph's allocations at the end, exact when the graph only grows). The graph itself is
+    # reported as the size of a fresh copy of the final graph.
+    # RSS is sampled in a second run without tracemalloc, whose bookkeeping would inflate it. rss and rss_peak
+    # are the growth of the process during execute, max_rss the peak of the whole process so far.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        state = setup()
+        result = execute(state)
+        gc.collect()
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    total = sum(trace.size for trace in snapshot.traces)
+    graph_growth = sum(trace.size for trace in snapshot.filter_traces(_GRAPH_FILTERS).traces)
+    del snapshot
+    algo = result if isinstance(result, Algorithm) else state
+    graph = algo.graph()
+    memory = {'steady': total - graph_growth, 'peak': max(total, peak) - graph_growth,
+              'graph': graph_memory(type(graph), list(graph.nodes), list(graph.edges))}
+    del state, result, algo, graph
+
+    state = setup()
+    gc.collect()
+    with RSSSampler() as sampler:
+        result = execute(state)
+    if sampler.start_rss is not None:
+        memory.update(rss=sampler.last - sampler.start_rss, rss_peak=sampler.peak - sampler.start_rss)
+    memory['max_rss'] = max_rss()
+    return memory
+
+
+def report_memory(memory, benchmark_name=""):
+    print("Memory {} steady={:.1f}MiB peak={:.1f}MiB graph={:.1f}MiB".format(
+        benchmark_name, memory['steady'] / 2 ** 20, memory['peak'] / 2 ** 20, memory['graph'] / 2 ** 20))
+    return memory
+
+
+def summarize(times):
+    return {
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'stddev': statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'hostname': platform.node(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'numpy': np.__version__,
+        'networkx': nx.__version__,
+        'commit': commit,
+        'argv': ' '.join(sys.argv),
+    }
+
+
+def write_results(path, results, env):
+    if path.endswith('.csv'):
+        columns = ['dataset', 'algorithm', 'shards', 'backend', 'operation', 'status', 'runs', 'warmup',
+                   'speedup', 'min', 'median', 'mean', 'stddev', 'times', 'latency', 'churn', 'memory']
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, columns + list(env))
+            writer.writeheader()
+            for result in results:
+                row = dict(result, **env)
+                row['times'] = ' '.join('{:.6f}'.format(t) for t in result.get('times', []))
+                for column in ['latency', 'churn', 'memory']:
+                    if column in row:
+                        row[column] = json.dumps(row[column])
+                writer.writerow(row)
+    else:
+        with open(path, 'w') as f:
+            json.dump({'environment': env, 'results': results}, f, indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m dynamic_mis.benchmark',
+                                     description='Benchmarks the dynamic MIS algorithms on KONECT networks')
+    parser.add_argument('data_dir', nargs='?', default='../data/')
+    parser.add_argument('-d', '--datasets', nargs='+', choices=sorted(DATASETS) + list(SYNTHETIC),
+                        default=['brightkite'])
+    parser.add_argument('--scale', type=int, default=10000, help='number of nodes of the synthetic datasets')
+    parser.add_argument('-a', '--algorithms', nargs='+', choices=list(ALGORITHMS),
+                        default=['trivial', 'simple', 'dynamic', 'implicit'])
+    parser.add_argument('-o', '--operations', nargs='+', choices=['init', 'insert', 'delete', 'stream'],
+                        default=['init', 'delete'])
+    parser.add_argument('-b', '--backends', nargs='+', choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument('-r', '--runs', type=int, default=5)
+    parser.add_argument('-w', '--warmup', type=int, default=1)
+    parser.add_argument('--removals', type=int, default=1000, help='number of random edges removed by delete')
+    parser.add_argument('--seed', type=int, default=2, help='seed of the removals and the synthetic datasets')
+    parser.add_argument('--batch-size', type=int, default=1, help='events per apply_updates call in stream')
+    parser.add_argument('--limit', type=int, default=None, help='maximum number of events replayed by stream')
+    parser.add_argument('--sort', action='store_true', help='sort stream events by time first')
+    parser.add_argument('--latency', action='store_true',
+                        help='record per update latency histograms (adds timing overhead to every call)')
+    parser.add_argument('--validate', choices=VALIDATION_LEVELS, default='off',
+                        help='check the mis while updating (see validation.py)')
+    parser.add_argument('--churn', action='store_true',
+                        help='record the number of mis changes of every update (tracks the mis, adds overhead)')
+    parser.add_argument('--memory', action='store_true',
+                        help='also record steady and peak memory of the algorithm state (one extra untimed run)')
+    parser.add_argument('--shards', type=int, nargs='+', default=sorted({1, os.cpu_count()}),
+                        help='numbers of worker processes the sharded algorithm is run with')
+    parser.add_argument('--compact', action='store_true',
+                        help='run the algorithms with compact=True (array based state, trivial is skipped)')
+    parser.add_argument('--output', help='write results to this .json or .csv file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    for dataset in args.datasets:
+        if dataset in SYNTHETIC:
+            file = synthetic_file(args.data_dir, dataset, args.scale, args.seed)
+        else:
+            file = os.path.join(args.data_dir, DATASETS[dataset])
+        for op in args.operations:
+            for backend_name in args.backends:
+                for algo_name in args.algorithms:
+                    for shards in (list(dict.fromkeys(args.shards)) if algo_name == 'sharded' else [None]):
+                        result = {'dataset': dataset, 'algorithm': algo_name, 'backend': backend_name, 'operation': op,
+                                  'runs': args.runs, 'warmup': args.warmup}
+                        name = '{} {} {} ({})'.format(dataset, op, algo_name, backend_name)
+                        algo_cls = ALGORITHMS[algo_name]
+                        prespawned = None
+                        if shards is not None:
+                            result['shards'] = shards
+                            name = '{} {} {} x{} ({})'.format(dataset, op, algo_name, shards, backend_name)
+                            algo_cls = prespawned = _PrespawnedShards(shards)
+                        if args.compact:
+                            algo_cls = partial(_compact, algo_cls)
+                        histograms = dict()
+                        churn = None
+                        if args.churn:
+                            churn = LatencyHistogram()
+                            algo_cls = partial(_churn, algo_cls, churn)
+                        if args.validate != 'off':
+                            algo_cls = partial(_validated, algo_cls, args.validate)
+                        if args.latency:
+                            algo_cls = partial(_instrumented, algo_cls, histograms)
+                        try:
+                            setup, execute = _operation(op, algo_cls, file, BACKENDS[backend_name], args)
+                            if prespawned is not None:
+                                setup = partial(_spawned_setup, prespawned, setup)
+                            times = measure(setup, execute, args.runs, args.warmup,
+                                            partial(_clear_histograms, histograms, churn))
+                        except NotImplementedError:
+                            result['status'] = 'unsupported'
+                            print('Skipped Benchmark {}: not supported'.format(name))
+                        else:
+                            result.update(summarize(times), status='ok', times=times)
+                            print('Completed Benchmark {} min={min:.3f} median={median:.3f} stddev={stddev:.3f}'.format(
+                                name, **result))
+                            if args.latency:
+                                result['latency'] = report_latency(histograms, name)
+                            if args.churn and churn.count > 0:
+                                result['churn'] = report_churn(churn, name)
+                            if args.memory:
+                                result['memory'] = report_memory(measure_memory(setup, execute), name)
+                        results.append(result)
+
+    report_scaling(results)
+    if args.output is not None:
+        write_results(args.output, results, environment())
+    return results
+
 
+if __name__ == '__main__':
+    main()
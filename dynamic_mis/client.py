@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+from .instrumentation import LatencyHistogram
+from .server import LINE_LIMIT
+from .updates import INSERT_EDGE, REMOVE_EDGE
+
+__all__ = ['MISClient', 'run_load']
+
+
+class MISClient:
+    # asyncio client for MISServer (see server.py for the protocol). Requests can be pipelined, responses are
+    # matched by id. Change notifications of subscribe() arrive in the events queue.
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._futures = dict()
+        self._error = None
+        self.events = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=7878):
+        reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+        return cls(reader, writer)
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _read_loop(self):
+        # Pending requests fail when the connection closes or a response can't be read (longer than LINE_LIMIT
+        # or not JSON), later requests fail right away
+        error = ConnectionError('connection closed')
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if 'event' in message:
+                    self.events.put_nowait(message)
+                    continue
+                future = self._futures.pop(message.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (ValueError, ConnectionError) as e:
+            error = ConnectionError('cannot read response: {}'.format(e))
+        self._error = error
+        for future in self._futures.values():
+            if not future.done():
+                future.set_exception(error)
+        self._futures.clear()
+
+    async def request(self, op, *args):
+        # Sends one request and returns the response object, errors are raised as RuntimeError
+        if self._error is not None:
+            raise self._error
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._futures[self._next_id] = future
+        self._writer.write(json.dumps({'id': self._next_id, 'op': op, 'args': list(args)}).encode() + b'\n')
+        await self._writer.drain()
+        response = await future
+        if 'error' in response:
+            raise RuntimeError(response['error'])
+        return response
+
+    async def insert_edge(self, u, v):
+        return (await self.request('insert_edge', u, v))['version']
+
+    async def remove_edge(self, u, v):
+        return (await self.request('remove_edge', u, v))['version']
+
+    async def insert_node(self, v, edges=()):
+        return (await self.request('insert_node', v, [list(e) for e in edges]))['version']
+
+    async def remove_node(self, v):
+        return (await self.request('remove_node', v))['version']
+
+    async def is_in_mis(self, v):
+        return (await self.request('is_in_mis', v))['result']
+
+    async def get_mis(self):
+        return set((await self.request('get_mis'))['result'])
+
+    async def subscribe(self):
+        return (await self.request('subscribe'))['version']
+
+    async def stats(self):
+        return (await self.request('stats'))['result']
+
+
+async def run_load(host='127.0.0.1', port=7878, connections=8, pipeline=16, duration=5.0, nodes=10000,
+                   query_ratio=0.5, seed=0):
+    # Closed loop load: every connection keeps pipeline requests in flight for duration seconds. A request is a
+    # query of a random node with probability query_ratio, else the insertion or removal of a random edge
+    # between the first nodes ids. Returns the throughput and latency summaries in nanoseconds.
+    histograms = {'update': LatencyHistogram(), 'query': LatencyHistogram()}
+    clients = [await MISClient.connect(host, port) for _ in range(connections)]
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def worker(client, rnd):
+        while time.perf_counter() < deadline:
+            if rnd.random_sample() < query_ratio:
+                kind = 'query'
+                request = ('is_in_mis', int(rnd.randint(nodes)))
+            else:
+                kind = 'update'
+                u, v = rnd.randint(nodes, size=2).tolist()
+                if u == v:
+                    continue
+                request = (INSERT_EDGE if rnd.random_sample() < 0.5 else REMOVE_EDGE, u, v)
+            sent = time.perf_counter_ns()
+            await client.request(*request)
+            histograms[kind].record(time.perf_counter_ns() - sent)
+
+    rnd = np.random.RandomState(seed)
+    try:
+        await asyncio.gather(*[worker(client, np.random.RandomState(rnd.randint(2 ** 31)))
+                               for client in clients for _ in range(pipeline)])
+        elapsed = time.perf_counter() - start
+        server = await clients[0].stats()
+    finally:
+        for client in clients:
+            await client.close()
+    ops = sum(h.count for h in histograms.values())
+    return {
+        'ops': ops,
+        'seconds': elapsed,
+        'ops_per_second': ops / elapsed,
+        'latency': {kind: h.summary() for kind, h in histograms.items() if h.count > 0},
+        # Updates per apply_updates call on the server, over its whole lifetime
+        'batch_size': server['updates'] / max(1, server['batches']),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m dynamic_mis.client',
+                                     description='Load generator for python3 -m dynamic_mis.server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7878)
+    parser.add_argument('-c', '--connections', type=int, default=8)
+    parser.add_argument('-p', '--pipeline', type=int, default=16, help='requests in flight per connection')
+    parser.add_argument('-d', '--duration', type=float, default=5.0, help='seconds')
+    parser.add_argument('--nodes', type=int, default=10000, help='requests use the node ids below this')
+    parser.add_argument('--query-ratio', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = asyncio.run(run_load(args.host, args.port, args.connections, args.pipeline, args.duration, args.nodes,
+                                  args.query_ratio, args.seed))
+    print('{ops} ops in {seconds:.2f}s: {ops_per_second:.0f} ops/s, {batch_size:.1f} updates per batch'.format(
+        **result))
+    for kind, s in result['latency'].items():
+        print('Latency {}: n={count} p50={p50}ns p99={p99}ns p999={p999}ns max={max}ns'.format(kind, **s))
+    return result
+
+
+if __name__ == '__main__':
+    main()
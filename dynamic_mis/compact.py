@@ -0,0 +1,116 @@
+from array import array
+from collections.abc import MutableSet
+from itertools import compress
+
+__all__ = ['CounterArray', 'MembershipSet', 'node_capacity']
+
+# Compact state for graphs with dense non-negative integer node ids (AdjacencyGraph, InternedMIS, edge files).
+# A counter takes 4 bytes and a membership flag 1 byte per node id, instead of a dict or set entry plus an int
+# object per node. Reads and writes go through Python methods or array indexing, so the compact layout saves
+# memory rather than time.
+
+
+def node_capacity(graph):
+    # Number of node ids the state has to cover
+    return max(graph, default=-1) + 1
+
+
+class CounterArray(array):
+    # int32 counter per node id with the interface of the defaultdict(lambda: 0) counters.
+    # Indexing is plain array indexing, so ids beyond the end raise IndexError, grow() covers new ids.
+    # pop and del reset a counter to 0 instead of shifting the array.
+
+    def __new__(cls, size=0):
+        return super(CounterArray, cls).__new__(cls, 'i', bytes(4 * size))
+
+    def grow(self, v):
+        if v >= len(self):
+            self.frombytes(bytes(4 * max(v + 1 - len(self), len(self))))
+
+    def pop(self, v, default=None):
+        if not 0 <= v < len(self):
+            return default
+        value = self[v]
+        self[v] = 0
+        return value
+
+    def __delitem__(self, v):
+        self[v] = 0
+
+    def clear(self):
+        self[:] = array('i', bytes(4 * len(self)))
+
+    def __reduce__(self):
+        return _counter_from_bytes, (self.tobytes(),)
+
+
+def _counter_from_bytes(data):
+    counter = CounterArray()
+    counter.frombytes(data)
+    return counter
+
+
+class MembershipSet(MutableSet):
+    # Set of node ids as one byte per id, grows on add
+
+    def __init__(self, values=(), size=0):
+        self._flags = bytearray(size)
+        self._len = 0
+        for v in values:
+            self.add(v)
+
+    def __contains__(self, v):
+        try:
+            return v >= 0 and self._flags[v] == 1
+        except (IndexError, TypeError):
+            return False
+
+    def __iter__(self):
+        return compress(range(len(self._flags)), self._flags)
+
+    def __len__(self):
+        return self._len
+
+    def add(self, v):
+        flags = self._flags
+        if v >= len(flags):
+            flags.extend(bytes(max(v + 1 - len(flags), len(flags))))
+        if not flags[v]:
+            flags[v] = 1
+            self._len += 1
+
+    def discard(self, v):
+        if v in self:
+            self._flags[v] = 0
+            self._len -= 1
+
+    def remove(self, v):
+        if v not in self:
+            raise KeyError(v)
+        self._flags[v] = 0
+        self._len -= 1
+
+    def pop(self):
+        i = self._flags.find(1)
+        if i < 0:
+            raise KeyError('pop from an empty set')
+        self._flags[i] = 0
+        self._len -= 1
+        return i
+
+    def clear(self):
+        self._flags = bytearray(len(self._flags))
+        self._len = 0
+
+    def update(self, *others):
+        for values in others:
+            for v in values:
+                self.add(v)
+
+    def intersection_update(self, *others):
+        keep = set(self).intersection(*others)
+        for v in [v for v in self if v not in keep]:
+            self.remove(v)
+
+    def __repr__(self):
+        return 'MembershipSet({})'.format(set(self))
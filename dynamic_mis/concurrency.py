@@ -0,0 +1,165 @@
+import threading
+from .algorithm import Algorithm
+from .feed import TrackedMIS
+from .updates import touched_nodes
+from .views import QueryView, _View
+
+__all__ = ['MISSnapshot', 'ConcurrentMIS']
+
+
+class MISSnapshot(_View):
+    # Immutable mis of one version. A frozenset base plus layers of changes ({node: in mis}, newest first) that
+    # are never modified once published, so readers need no lock and a snapshot stays consistent while the
+    # writer publishes newer versions.
+    # Layers are merged like a binary counter (a layer is merged into the next one when it is at least as large),
+    # so a lookup checks at most log2(changes) layers and every change is copied O(log) times. The writer folds
+    # the layers into a new base when they hold more entries than half the mis.
+
+    def __init__(self, version, base, layers=(), size=None):
+        self.version = version
+        self._base = base
+        self._layers = layers
+        self._size = len(base) if size is None else size
+
+    def __contains__(self, v):
+        for layer in self._layers:
+            member = layer.get(v)
+            if member is not None:
+                return member
+        return v in self._base
+
+    def __iter__(self):
+        if not self._layers:
+            return iter(self._base)
+        return self._iter_layers()
+
+    def _iter_layers(self):
+        seen = set()
+        for layer in self._layers:
+            for v, member in layer.items():
+                if v not in seen:
+                    seen.add(v)
+                    if member:
+                        yield v
+        for v in self._base:
+            if v not in seen:
+                yield v
+
+    def __len__(self):
+        return self._size
+
+    def changes(self):
+        return sum(len(layer) for layer in self._layers)
+
+    def next_version(self, deltas):
+        # The snapshot after the MISDeltas, which are relative to this snapshot and applied in order
+        layer = dict()
+        size = self._size
+        for delta in deltas:
+            layer.update(dict.fromkeys(delta.removed, False))
+            layer.update(dict.fromkeys(delta.added, True))
+            size += len(delta.added) - len(delta.removed)
+        layers = [layer] + list(self._layers)
+        while len(layers) > 1 and len(layers[0]) >= len(layers[1]):
+            merged = dict(layers[1])
+            merged.update(layers[0])
+            layers[0:2] = [merged]
+        return MISSnapshot(self.version + 1, self._base, tuple(layers), size)
+
+
+class ConcurrentMIS(Algorithm):
+    # Single writer, many readers. Updates are serialized by a lock and publish a new MISSnapshot when they are
+    # done, is_in_mis and get_mis only read the latest published snapshot: they never take the lock, don't block
+    # behind an update and see every update either completely or not at all. A reader that needs several
+    # lookups from the same version keeps the snapshot that get_mis returns.
+    # The changes of every update come from a TrackedMIS (see feed.py).
+    # Algorithms that decide membership on query (ImplicitMIS) are never queried by readers. The writer settles
+    # them instead: after every update it queries the nodes that may have lost their last mis neighbor (the
+    # endpoints and the neighbors of the nodes that left), so the set it holds is the complete mis. Queries only
+    # add nodes, one round is enough.
+
+    def __init__(self, algorithm):
+        super(ConcurrentMIS, self).__init__(algorithm.graph())
+        self._algorithm = algorithm
+        self._lock = threading.Lock()
+        self._deltas = []
+        self._tracked = TrackedMIS(algorithm)
+        self._tracked.subscribe(self._deltas.append)
+        self._lazy = isinstance(algorithm.get_mis(), QueryView)
+        with self._lock:
+            if self._lazy:
+                self._settle(self._graph.nodes)
+            self._deltas.clear()
+            self._snapshot = MISSnapshot(0, self._members())
+
+    def algorithm(self):
+        return self._algorithm
+
+    def version(self):
+        return self._snapshot.version
+
+    def _members(self):
+        sets = [getattr(self._algorithm, name) for name in self._algorithm.mis_attributes]
+        return frozenset().union(*sets)
+
+    def _settle(self, nodes):
+        for v in nodes:
+            if v in self._graph:
+                self._tracked.is_in_mis(v)
+
+    def _publish(self, touched):
+        if self._lazy:
+            candidates = set(touched)
+            for delta in list(self._deltas):
+                for v in delta.removed:
+                    if v in self._graph:
+                        candidates.update(self._graph[v])
+            self._settle(candidates)
+        if not self._deltas:
+            return
+        snapshot = self._snapshot.next_version(self._deltas)
+        self._deltas.clear()
+        if snapshot.changes() > max(len(snapshot._base), len(snapshot)) // 2:
+            snapshot = MISSnapshot(snapshot.version, self._members())
+        # Publishing is one attribute store, readers see the old or the new snapshot
+        self._snapshot = snapshot
+
+    def insert_edge(self, u, v):
+        with self._lock:
+            self._tracked.insert_edge(u, v)
+            self._publish([u, v])
+
+    def remove_edge(self, u, v):
+        with self._lock:
+            self._tracked.remove_edge(u, v)
+            self._publish([u, v])
+
+    def insert_node(self, v, edges=[]):
+        with self._lock:
+            edges = list(edges)
+            self._tracked.insert_node(v, edges)
+            self._publish([v] + [w for e in edges for w in e])
+
+    def remove_node(self, v):
+        with self._lock:
+            neighbors = list(self._graph[v])
+            self._tracked.remove_node(v)
+            self._publish(neighbors)
+
+    def apply_updates(self, updates):
+        # One version for the whole batch
+        with self._lock:
+            updates = list(updates)
+            touched = touched_nodes(self._graph, updates) if self._lazy else []
+            self._tracked.apply_updates(updates)
+            self._publish(touched)
+
+    def is_in_mis(self, node):
+        return node in self._snapshot
+
+    def get_mis(self):
+        return self._snapshot
+
+    def is_valid_mis(self):
+        with self._lock:
+            return self._algorithm.is_valid_mis()
@@ -0,0 +1,154 @@
+import math
+from array import array
+import numpy as np
+from .compact import CounterArray
+
+__all__ = ['DegreeIndex', 'CompactDegreeIndex']
+
+
+class DegreeIndex(dict):
+    # Degree of every node plus buckets of the nodes with the same degree, so the nodes in a degree range (e.g.
+    # between an old and a new heavy threshold) are found without scanning the graph.
+    # The index is a plain dict from node to degree, reading a degree costs a dict lookup. Updates only change the
+    # dict and note the node, the buckets are brought up to date when they are read. That keeps the cost of an
+    # edge update low, the algorithms read the buckets about once per phase.
+    # Degrees must be changed through update_node, add, update_edge and remove, not the dict methods.
+
+    def __init__(self, degrees=()):
+        # degrees are (node, degree) pairs, like graph.degree
+        super(DegreeIndex, self).__init__(degrees)
+        self._buckets = dict()
+        # The degree under which a node is filed in the buckets
+        self._filed = dict()
+        self._moved = list(self)
+        self._limit = 0
+
+    def update_node(self, v, degree):
+        self[v] = degree
+        self._note(v)
+
+    def add(self, v, delta=1):
+        self[v] += delta
+        self._note(v)
+
+    def update_edge(self, graph, u, v, delta):
+        # Called after the edge u-v was inserted into (delta=1) or removed from (delta=-1) graph.
+        # A self loop is read from the graph, which counts it twice.
+        # Endpoints that the graph created are added.
+        if u == v:
+            self[u] = graph.degree[u]
+        else:
+            try:
+                self[u] += delta
+            except KeyError:
+                self[u] = delta
+            try:
+                self[v] += delta
+            except KeyError:
+                self[v] = delta
+        moved = self._moved
+        moved += (u, v)
+        if len(moved) > self._limit:
+            self._refile()
+
+    def remove(self, v):
+        del self[v]
+        self._note(v)
+
+    def _note(self, v):
+        self._moved.append(v)
+        if len(self._moved) > self._limit:
+            self._refile()
+
+    def _refile(self):
+        buckets = self._buckets
+        filed = self._filed
+        for v in self._moved:
+            old = filed.get(v)
+            degree = self.get(v)
+            if old == degree:
+                continue
+            if old is not None:
+                bucket = buckets[old]
+                bucket.remove(v)
+                if not bucket:
+                    del buckets[old]
+            if degree is None:
+                del filed[v]
+                continue
+            filed[v] = degree
+            bucket = buckets.get(degree)
+            if bucket is None:
+                buckets[degree] = {v}
+            else:
+                bucket.add(v)
+        self._moved = []
+        # Refiling is linear in the noted nodes, the list is bounded by the size of the index
+        self._limit = 2 * len(self) + 1024
+
+    def between(self, low, high):
+        # Nodes with low <= degree <= high, the bounds may be floats and high may be infinite.
+        # Costs O(min(high - low, number of distinct degrees)) plus the nodes that are returned and the updates
+        # since the last call.
+        self._refile()
+        low = max(0, math.ceil(low))
+        if high < low:
+            return []
+        if high - low < len(self._buckets):
+            high = math.floor(high)
+            degrees = [d for d in range(low, high + 1) if d in self._buckets]
+        else:
+            degrees = [d for d in self._buckets if low <= d <= high]
+        return [v for d in degrees for v in self._buckets[d]]
+
+
+class CompactDegreeIndex(CounterArray):
+    # DegreeIndex for compact algorithms (see compact.py): one int32 degree per node id, -1 for missing ids.
+    # There are no buckets, between scans the degree array with NumPy. That is linear in the node ids, but the
+    # scan runs in C and only at phase changes, which rebuild linear state anyway.
+
+    def __new__(cls, degrees=()):
+        degrees = list(degrees)
+        index = super(CompactDegreeIndex, cls).__new__(cls)
+        index.grow(max((v for v, _ in degrees), default=-1))
+        for v, d in degrees:
+            index[v] = d
+        return index
+
+    def grow(self, v):
+        if v >= len(self):
+            self.extend(array('i', [-1]) * max(v + 1 - len(self), len(self)))
+
+    def __contains__(self, v):
+        return 0 <= v < len(self) and self[v] >= 0
+
+    def update_node(self, v, degree):
+        self.grow(v)
+        self[v] = degree
+
+    def add(self, v, delta=1):
+        self[v] += delta
+
+    def update_edge(self, graph, u, v, delta):
+        # Like DegreeIndex.update_edge
+        if u >= len(self) or v >= len(self):
+            self.grow(max(u, v))
+        du = self[u]
+        dv = self[v]
+        if u == v or du < 0 or dv < 0:
+            # Self loops and endpoints that the graph just created are read from the graph
+            self[u] = graph.degree[u]
+            self[v] = graph.degree[v]
+        else:
+            self[u] = du + delta
+            self[v] = dv + delta
+
+    def remove(self, v):
+        self[v] = -1
+
+    def between(self, low, high):
+        degrees = np.frombuffer(self, dtype=np.intc)
+        nodes = np.flatnonzero((degrees >= max(0, low)) & (degrees <= high)).tolist()
+        # The NumPy view must not outlive the call, the array can't grow while it is exported
+        del degrees
+        return nodes
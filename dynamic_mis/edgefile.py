@@ -0,0 +1,123 @@
+import os
+import struct
+from array import array
+import numpy as np
+from .graph import AdjacencyGraph
+from .interning import NodeInterner
+from .vectorized import CSRGraph
+
+__all__ = ['EdgeFile', 'convert_konect', 'load_edge_file']
+
+# Layout: header, edges as (m, 2) little endian int32 or int64 ids, label table.
+# Node i has the i-th label of the table, labels are utf-8 and separated by newlines.
+MAGIC = b'DMISEDG1'
+_HEADER = struct.Struct('<8s4s4xQQQQ')
+SUFFIX = '.dmis'
+
+
+def _konect_pairs(text_file):
+    # Comment lines start with % in KONECT files. Lines with a negative weight remove an edge in
+    # dynamic networks and are skipped, the time column is ignored.
+    for line in open(text_file):
+        items = line.split()
+        if len(items) < 2 or items[0].startswith('%'):
+            continue
+        if len(items) > 2 and items[2].startswith('-'):
+            continue
+        yield items[0], items[1]
+
+
+def convert_konect(text_file, binary_file=None):
+    if binary_file is None:
+        binary_file = text_file + SUFFIX
+
+    interner = NodeInterner()
+    ids = array('q')
+    for u, v in _konect_pairs(text_file):
+        ids.extend(interner.intern_edge(u, v))
+
+    dtype = np.dtype('<i4') if len(interner) < 2 ** 31 else np.dtype('<i8')
+    edges = np.frombuffer(ids, dtype=np.int64).astype(dtype) if len(ids) > 0 else np.empty(0, dtype=dtype)
+    labels = '\n'.join(interner.labels()).encode('utf-8')
+    labels_offset = _HEADER.size + edges.nbytes
+
+    # Write to a temporary name first, so a crash never leaves a truncated file behind for the loader
+    tmp_file = binary_file + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, dtype.str.encode('ascii'), len(interner), len(ids) // 2, labels_offset,
+                             len(labels)))
+        f.write(edges.tobytes())
+        f.write(labels)
+    os.replace(tmp_file, binary_file)
+    return binary_file
+
+
+def load_edge_file(text_file, binary_file=None):
+    # Converts the text file once and memory maps the binary file on every later call
+    if binary_file is None:
+        binary_file = text_file + SUFFIX
+    if not os.path.exists(binary_file) or os.path.getmtime(binary_file) < os.path.getmtime(text_file):
+        convert_konect(text_file, binary_file)
+    return EdgeFile(binary_file)
+
+
+class EdgeFile:
+    # Read-only view of a binary edge file. The edges are memory mapped, so opening is O(1) and
+    # pages are only read when the edges are used.
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            header = f.read(_HEADER.size)
+        if len(header) != _HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ValueError('{} is not a binary edge file'.format(path))
+
+        _, dtype, self.num_nodes, self.num_edges, self._labels_offset, self._labels_size = _HEADER.unpack(header)
+        dtype = np.dtype(dtype.rstrip(b'\0').decode('ascii'))
+        self.path = path
+        if self.num_edges > 0:
+            self.edges = np.memmap(path, dtype=dtype, mode='r', offset=_HEADER.size, shape=(self.num_edges, 2))
+        else:
+            self.edges = np.empty((0, 2), dtype=dtype)
+        self._labels = None
+
+    def __len__(self):
+        return self.num_edges
+
+    def nodes(self):
+        return range(self.num_nodes)
+
+    def labels(self):
+        if self._labels is None:
+            if self._labels_size == 0:
+                self._labels = []
+            else:
+                with open(self.path, 'rb') as f:
+                    f.seek(self._labels_offset)
+                    self._labels = f.read(self._labels_size).decode('utf-8').split('\n')
+        return self._labels
+
+    def interner(self):
+        return NodeInterner.from_labels(self.labels())
+
+    def edge_list(self):
+        # Edges as a list of int tuples, in file order
+        return list(zip(self.edges[:, 0].tolist(), self.edges[:, 1].tolist()))
+
+    def to_graph(self, backend=AdjacencyGraph):
+        graph = backend()
+        graph.add_nodes_from(self.nodes())
+        graph.add_edges_from(self.edge_list())
+        return graph
+
+    def csr(self):
+        # CSR snapshot of the simple graph, duplicate edges and self loops are dropped
+        n = self.num_nodes
+        u, v = self.edges[:, 0].astype(np.int64), self.edges[:, 1].astype(np.int64)
+        keep = u != v
+        src = np.concatenate((u[keep], v[keep]))
+        dst = np.concatenate((v[keep], u[keep]))
+        keys = np.unique(src * n + dst)
+        src, dst = keys // n, keys % n
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return CSRGraph(range(n), indptr, dst)
@@ -0,0 +1,183 @@
+from collections import namedtuple
+from collections.abc import MutableSet
+from .algorithm import Algorithm
+from .views import QueryView
+
+__all__ = ['MISDelta', 'TrackedSet', 'TrackedMIS']
+
+# Nodes that joined and left the mis during one update. A node that joins and leaves again within the same
+# update appears in neither set.
+MISDelta = namedtuple('MISDelta', ['added', 'removed'])
+
+
+class TrackedSet(MutableSet):
+    # Wraps a mis set and reports its net changes to a TrackedMIS.
+    # The changes go to the backing set itself, so it keeps its type (a compact MembershipSet stays compact) and
+    # views that were taken of it before it was wrapped stay current. Other iterables are copied into a set.
+
+    def __init__(self, values, feed):
+        self._values = values if isinstance(values, MutableSet) else set(values)
+        self._feed = feed
+
+    def unwrap(self):
+        return self._values
+
+    def __contains__(self, v):
+        return v in self._values
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, v):
+        if v not in self._values:
+            self._values.add(v)
+            self._feed._joined(v)
+
+    def remove(self, v):
+        self._values.remove(v)
+        self._feed._left(v)
+
+    def discard(self, v):
+        if v in self._values:
+            self.remove(v)
+
+    def pop(self):
+        v = self._values.pop()
+        self._feed._left(v)
+        return v
+
+    def clear(self):
+        for v in self._values:
+            self._feed._left(v)
+        self._values.clear()
+
+    def update(self, *others):
+        for values in others:
+            for v in values:
+                self.add(v)
+
+    def difference_update(self, *others):
+        for values in others:
+            for v in values:
+                self.discard(v)
+
+    def intersection_update(self, *others):
+        keep = set(self._values).intersection(*others)
+        for v in [v for v in self._values if v not in keep]:
+            self.remove(v)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __isub__(self, other):
+        self.difference_update(other)
+        return self
+
+    def __iand__(self, other):
+        self.intersection_update(other)
+        return self
+
+    def __repr__(self):
+        return 'TrackedSet({!r})'.format(self._values)
+
+    def __reduce__(self):
+        # Copies and pickles are plain sets, they are not attached to the feed
+        return set, (list(self),)
+
+
+class TrackedMIS(Algorithm):
+    # Wraps an algorithm and returns the MISDelta of every update, so the mis can be followed in O(changes)
+    # instead of diffing get_mis() after every update. Subscribers are called with every non-empty delta.
+    # The mis sets named in mis_attributes of the algorithm are wrapped in TrackedSets, algorithms that are
+    # not wrapped don't pay for the tracking. detach() puts the original sets back.
+    # ImplicitMIS only adds nodes to its set when they are queried, those joins are reported by the query
+    # (including the queries of the view that get_mis returns).
+
+    def __init__(self, algorithm):
+        super(TrackedMIS, self).__init__(algorithm.graph())
+        if not algorithm.mis_attributes:
+            raise TypeError('{} does not declare its mis sets'.format(type(algorithm).__name__))
+        self._algorithm = algorithm
+        self._added = set()
+        self._removed = set()
+        self._subscribers = []
+        for name in algorithm.mis_attributes:
+            setattr(algorithm, name, TrackedSet(getattr(algorithm, name), self))
+
+    def algorithm(self):
+        return self._algorithm
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def detach(self):
+        # Gives the algorithm its own sets back
+        for name in self._algorithm.mis_attributes:
+            setattr(self._algorithm, name, getattr(self._algorithm, name).unwrap())
+        return self._algorithm
+
+    def _joined(self, v):
+        if v in self._removed:
+            self._removed.remove(v)
+        else:
+            self._added.add(v)
+
+    def _left(self, v):
+        if v in self._added:
+            self._added.remove(v)
+        else:
+            self._removed.add(v)
+
+    def _publish(self):
+        delta = MISDelta(self._added, self._removed)
+        self._added = set()
+        self._removed = set()
+        if delta.added or delta.removed:
+            for callback in self._subscribers:
+                callback(delta)
+        return delta
+
+    def insert_edge(self, u, v):
+        self._algorithm.insert_edge(u, v)
+        return self._publish()
+
+    def remove_edge(self, u, v):
+        self._algorithm.remove_edge(u, v)
+        return self._publish()
+
+    def insert_node(self, v, edges=[]):
+        self._algorithm.insert_node(v, edges)
+        return self._publish()
+
+    def remove_node(self, v):
+        self._algorithm.remove_node(v)
+        return self._publish()
+
+    def apply_updates(self, updates):
+        # One delta for the whole batch
+        self._algorithm.apply_updates(updates)
+        return self._publish()
+
+    def is_in_mis(self, node):
+        result = self._algorithm.is_in_mis(node)
+        if self._added or self._removed:
+            self._publish()
+        return result
+
+    def get_mis(self):
+        mis = self._algorithm.get_mis()
+        if isinstance(mis, QueryView):
+            # Queries through the wrapper, so lazy joins are published
+            return QueryView(self)
+        return mis
+
+    def is_valid_mis(self):
+        return self._algorithm.is_valid_mis()
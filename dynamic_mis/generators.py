@@ -0,0 +1,226 @@
+import numpy as np
+from .updates import *
+
+__all__ = ['preferential_attachment', 'power_law_churn', 'hub_oscillation', 'phase_oscillation', 'write_konect']
+
+# All generators yield (INSERT_EDGE, u, v) and (REMOVE_EDGE, u, v) updates on int nodes, never a self loop,
+# a duplicate insertion or the removal of a missing edge. The same arguments always give the same stream.
+
+
+class _EdgeSet:
+    # Edge set with O(1) insertion, removal and uniform sampling
+
+    def __init__(self):
+        self._edges = []
+        self._index = dict()
+
+    def __len__(self):
+        return len(self._edges)
+
+    def __contains__(self, e):
+        return e in self._index
+
+    def add(self, u, v):
+        e = (u, v) if u < v else (v, u)
+        if u == v or e in self._index:
+            return None
+        self._index[e] = len(self._edges)
+        self._edges.append(e)
+        return e
+
+    def remove(self, e):
+        i = self._index.pop(e)
+        last = self._edges.pop()
+        if i < len(self._edges):
+            self._edges[i] = last
+            self._index[last] = i
+
+    def sample(self, rnd):
+        return self._edges[rnd.randint(len(self._edges))]
+
+
+def _insert(edges, u, v):
+    e = edges.add(u, v)
+    return None if e is None else (INSERT_EDGE,) + e
+
+
+def _remove(edges, e):
+    edges.remove(e)
+    return (REMOVE_EDGE,) + e
+
+
+def _random_edges(rnd, edges, n, m):
+    # Inserts m uniformly random edges between n nodes
+    while len(edges) < m:
+        for u, v in rnd.randint(n, size=(m - len(edges), 2)).tolist():
+            update = _insert(edges, u, v)
+            if update is not None:
+                yield update
+
+
+def preferential_attachment(n, m=3, seed=0):
+    # Barabasi-Albert growth: every new node is attached to m distinct earlier nodes, chosen with
+    # probability proportional to their degree
+    rnd = np.random.RandomState(seed)
+    # Every node appears once per incident edge, so a uniform sample is a degree proportional one
+    repeated = []
+    for u in range(1, min(m + 1, n)):
+        repeated += [0, u]
+        yield INSERT_EDGE, 0, u
+
+    for v in range(m + 1, n):
+        targets = set()
+        while len(targets) < m:
+            targets.add(repeated[rnd.randint(len(repeated))])
+        for u in sorted(targets):
+            repeated += [u, v]
+            yield INSERT_EDGE, u, v
+
+
+def power_law_churn(n, m, churn, exponent=2.5, removal_probability=0.5, seed=0):
+    # Chung-Lu graph with a power law degree distribution: m edges are inserted with endpoints drawn with
+    # probability proportional to (i + 1)^(-1 / (exponent - 1)). Then churn updates follow, each one removes a
+    # uniformly random edge with removal_probability and otherwise inserts a new power law edge.
+    rnd = np.random.RandomState(seed)
+    weights = np.arange(1, n + 1, dtype=float) ** (-1 / (exponent - 1))
+    weights /= weights.sum()
+    edges = _EdgeSet()
+
+    def endpoints(size):
+        return rnd.choice(n, size=(size, 2), p=weights).tolist()
+
+    while len(edges) < m:
+        for u, v in endpoints(m - len(edges)):
+            update = _insert(edges, u, v)
+            if update is not None:
+                yield update
+
+    done = 0
+    while done < churn:
+        size = min(churn - done, 4096)
+        removals = rnd.rand(size) < removal_probability
+        for remove, (u, v) in zip(removals.tolist(), endpoints(size)):
+            if remove and len(edges) > 0:
+                yield _remove(edges, edges.sample(rnd))
+                done += 1
+            elif not remove:
+                update = _insert(edges, u, v)
+                if update is not None:
+                    yield update
+                    done += 1
+
+
+class _Phase:
+    # Follows the phases of ImprovedDynamicMIS and ImplicitMIS for a graph that starts out empty:
+    # a phase ends once the edge count has halved or doubled since its start
+
+    def __init__(self, exponent):
+        self._exponent = exponent
+        self._m_c = 0
+
+    def update(self, m):
+        # Returns whether a new phase started
+        if m <= self._m_c / 2 or m >= self._m_c * 2:
+            self._m_c = m
+            return True
+        return False
+
+    def threshold(self):
+        return self._m_c ** self._exponent
+
+
+def hub_oscillation(n, m, hubs=4, rounds=1000, exponent=2 / 3, seed=0):
+    # Adversarial case for ImprovedDynamicMIS: a random graph with m edges, plus hubs whose degrees are pushed
+    # back and forth across the heavy threshold m_c^(2/3) of the current phase. Every round flips one hub between
+    # heavy and light, usually with a single edge update. With exponent=0.5 the hubs oscillate around the
+    # threshold of ImplicitMIS instead. Requires hubs * m^exponent < m / 2, so the hubs stay inside the phase.
+    rnd = np.random.RandomState(seed)
+    if 2 * hubs * m ** exponent >= m or m ** exponent >= n - hubs:
+        raise ValueError('Too many hubs for m={} and n={}'.format(m, n))
+
+    edges = _EdgeSet()
+    phase = _Phase(exponent)
+    for update in _random_edges(rnd, edges, n, m):
+        phase.update(len(edges))
+        yield update
+
+    hub_nodes = rnd.choice(n, size=hubs, replace=False).tolist()
+    # Incident edges of every hub
+    hub_edges = {h: [] for h in hub_nodes}
+    for e in edges._edges:
+        for w in e:
+            if w in hub_edges:
+                hub_edges[w].append(e)
+
+    def add_hub_edge(h):
+        update = None
+        while update is None:
+            update = _insert(edges, h, rnd.randint(n))
+        for w in update[1:]:
+            if w in hub_edges:
+                hub_edges[w].append(update[1:])
+        phase.update(len(edges))
+        return update
+
+    def remove_hub_edge(h):
+        e = hub_edges[h][rnd.randint(len(hub_edges[h]))]
+        for w in e:
+            if w in hub_edges:
+                hub_edges[w].remove(e)
+        update = _remove(edges, e)
+        phase.update(len(edges))
+        return update
+
+    def is_heavy(h):
+        return len(hub_edges[h]) >= phase.threshold()
+
+    # Start every hub just below the threshold
+    for h in hub_nodes:
+        while len(hub_edges[h]) < phase.threshold() - 1:
+            yield add_hub_edge(h)
+        while is_heavy(h):
+            yield remove_hub_edge(h)
+
+    for r in range(rounds):
+        h = hub_nodes[r % hubs]
+        if is_heavy(h):
+            while is_heavy(h):
+                yield remove_hub_edge(h)
+        else:
+            while not is_heavy(h):
+                yield add_hub_edge(h)
+
+
+def phase_oscillation(n, m, cycles=4, seed=0):
+    # Adversarial case for the phases of ImplicitMIS and ImprovedDynamicMIS: after a random graph with m edges,
+    # random edges are inserted until the edge count has doubled since the start of the phase, and then random
+    # edges are removed until it has halved again. Every swing ends a phase.
+    rnd = np.random.RandomState(seed)
+    edges = _EdgeSet()
+    phase = _Phase(1)
+    for update in _random_edges(rnd, edges, n, m):
+        phase.update(len(edges))
+        yield update
+
+    for _ in range(cycles):
+        changed = False
+        while not changed:
+            for update in _random_edges(rnd, edges, n, len(edges) + 1):
+                changed = phase.update(len(edges))
+                yield update
+        changed = False
+        while not changed:
+            update = _remove(edges, edges.sample(rnd))
+            changed = phase.update(len(edges))
+            yield update
+
+
+def write_konect(updates, path):
+    # Writes updates as a KONECT file with +1/-1 weights and the position as time stamp.
+    # The file can be used with the benchmark harness, load_edge_file and konect_events.
+    count = 0
+    with open(path, 'w') as f:
+        for op, u, v in updates:
+            f.write('{} {} {} {}\n'.format(u, v, 1 if op == INSERT_EDGE else -1, count))
+            count += 1
+    return count
@@ -0,0 +1,283 @@
+from array import array
+from typing import Iterable, Iterator, Protocol
+
+__all__ = ['GraphBackend', 'AdjacencyGraph']
+
+
+class GraphBackend(Protocol):
+    # The subset of the networkx.Graph interface the algorithms rely on.
+    # networkx.Graph and AdjacencyGraph both implement it.
+
+    nodes: Iterable
+    edges: Iterable
+    degree: object
+
+    def __getitem__(self, v) -> Iterable: ...
+
+    def __contains__(self, v) -> bool: ...
+
+    def __iter__(self) -> Iterator: ...
+
+    def __len__(self) -> int: ...
+
+    def has_node(self, v) -> bool: ...
+
+    def has_edge(self, u, v) -> bool: ...
+
+    def add_node(self, v) -> None: ...
+
+    def add_nodes_from(self, nodes: Iterable) -> None: ...
+
+    def remove_node(self, v) -> None: ...
+
+    def add_edge(self, u, v) -> None: ...
+
+    def add_edges_from(self, edges: Iterable) -> None: ...
+
+    def remove_edge(self, u, v) -> None: ...
+
+    def number_of_nodes(self) -> int: ...
+
+    def number_of_edges(self) -> int: ...
+
+
+class _NodeView:
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __iter__(self):
+        return iter(self._graph)
+
+    def __len__(self):
+        return len(self._graph)
+
+    def __contains__(self, v):
+        return v in self._graph
+
+    def __repr__(self):
+        return 'NodeView({})'.format(tuple(self))
+
+
+class _EdgeView:
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __iter__(self):
+        adj = self._graph._adj
+        for u, neighbors in enumerate(adj):
+            if neighbors is not None:
+                for w in neighbors:
+                    if u <= w:
+                        yield u, w
+
+    def __len__(self):
+        return self._graph.number_of_edges()
+
+    def __contains__(self, e):
+        u, v = e
+        return self._graph.has_edge(u, v)
+
+
+class _DegreeView:
+    # Like networkx a self loop adds 2 to the degree
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._loops = graph._loops
+
+    def __getitem__(self, v):
+        return len(self._graph[v]) + (v in self._loops)
+
+    def __call__(self, v):
+        return self[v]
+
+    def __iter__(self):
+        for v, neighbors in enumerate(self._graph._adj):
+            if neighbors is not None:
+                yield v, len(neighbors) + (v in self._loops)
+
+
+class AdjacencyGraph:
+    # Compact undirected graph on non-negative integer node ids.
+    # Every node owns a growable int32 array of its neighbors. Edges are removed by swapping the
+    # last neighbor into the freed slot, so neighbor order is not stable across removals.
+    # A self loop is stored once in the neighbor array, the nodes that have one are kept in a set.
+    # Degree lookups are O(1), has_edge scans the shorter of the two neighbor arrays.
+
+    typecode = 'i'
+
+    def __init__(self, incoming_graph_data=None):
+        self._adj = []
+        self._loops = set()
+        self._node_count = 0
+        self._edge_count = 0
+        self.nodes = _NodeView(self)
+        self.edges = _EdgeView(self)
+        self.degree = _DegreeView(self)
+
+        if incoming_graph_data is not None:
+            if hasattr(incoming_graph_data, 'nodes') and hasattr(incoming_graph_data, 'edges'):
+                self.add_nodes_from(incoming_graph_data.nodes)
+                self.add_edges_from(incoming_graph_data.edges)
+            else:
+                self.add_edges_from(incoming_graph_data)
+
+    def __getitem__(self, v):
+        try:
+            neighbors = self._adj[v] if v >= 0 else None
+        except (IndexError, TypeError):
+            neighbors = None
+        if neighbors is None:
+            raise KeyError(v)
+        return neighbors
+
+    def __contains__(self, v):
+        try:
+            return v >= 0 and self._adj[v] is not None
+        except (IndexError, TypeError):
+            return False
+
+    def __iter__(self):
+        for v, neighbors in enumerate(self._adj):
+            if neighbors is not None:
+                yield v
+
+    def __len__(self):
+        return self._node_count
+
+    def has_node(self, v):
+        return v in self
+
+    def has_edge(self, u, v):
+        if u not in self or v not in self:
+            return False
+        adj_u = self._adj[u]
+        adj_v = self._adj[v]
+        if len(adj_u) <= len(adj_v):
+            return v in adj_u
+        return u in adj_v
+
+    def neighbors(self, v):
+        return iter(self[v])
+
+    def add_node(self, v):
+        if v < 0:
+            raise ValueError('AdjacencyGraph node ids must be non-negative integers, got {}'.format(v))
+        if v >= len(self._adj):
+            self._adj.extend([None] * (v + 1 - len(self._adj)))
+        if self._adj[v] is None:
+            self._adj[v] = array(self.typecode)
+            self._node_count += 1
+
+    def add_nodes_from(self, nodes):
+        for v in nodes:
+            self.add_node(v)
+
+    def remove_node(self, v):
+        neighbors = self[v]
+        for w in neighbors:
+            if w != v:
+                self._swap_remove(self._adj[w], v)
+        self._edge_count -= len(neighbors)
+        self._adj[v] = None
+        self._loops.discard(v)
+        self._node_count -= 1
+
+    def remove_nodes_from(self, nodes):
+        for v in nodes:
+            if v in self:
+                self.remove_node(v)
+
+    def add_edge(self, u, v):
+        # Like networkx, missing endpoints are created
+        if u not in self:
+            self.add_node(u)
+        if v not in self:
+            self.add_node(v)
+        if self.has_edge(u, v):
+            return
+
+        self._adj[u].append(v)
+        if u != v:
+            self._adj[v].append(u)
+        else:
+            self._loops.add(u)
+        self._edge_count += 1
+
+    def add_edges_from(self, edges):
+        for e in edges:
+            self.add_edge(e[0], e[1])
+
+    def remove_edge(self, u, v):
+        if not self.has_edge(u, v):
+            raise KeyError('The edge {}-{} is not in the graph'.format(u, v))
+        self._swap_remove(self._adj[u], v)
+        if u != v:
+            self._swap_remove(self._adj[v], u)
+        else:
+            self._loops.discard(u)
+        self._edge_count -= 1
+
+    def remove_edges_from(self, edges):
+        for e in list(edges):
+            if self.has_edge(e[0], e[1]):
+                self.remove_edge(e[0], e[1])
+
+    @staticmethod
+    def _swap_remove(neighbors, v):
+        i = neighbors.index(v)
+        last = neighbors.pop()
+        if i < len(neighbors):
+            neighbors[i] = last
+
+    def number_of_nodes(self):
+        return self._node_count
+
+    def number_of_edges(self):
+        return self._edge_count
+
+    def clear(self):
+        self._adj = []
+        self._loops = set()
+        self._node_count = 0
+        self._edge_count = 0
+        self.degree = _DegreeView(self)
+
+    def copy(self):
+        g = AdjacencyGraph()
+        g._adj = [None if neighbors is None else array(self.typecode, neighbors) for neighbors in self._adj]
+        g._loops = set(self._loops)
+        g._node_count = self._node_count
+        g._edge_count = self._edge_count
+        g.degree = _DegreeView(g)
+        return g
+
+    @classmethod
+    def from_csr(cls, indptr, indices, present, edge_count=None):
+        # Inverse of CSRGraph.from_graph: node v is present if present[v], its neighbors are
+        # indices[indptr[v]:indptr[v + 1]]. indices is a buffer of C ints, neighbor order is kept.
+        g = cls()
+        neighbors = array(cls.typecode)
+        neighbors.frombytes(memoryview(indices).cast('B'))
+        g._adj = [neighbors[indptr[v]:indptr[v + 1]] if p else None for v, p in enumerate(present)]
+        g._node_count = sum(1 for p in present if p)
+        g._loops = {v for v in g if v in g._adj[v]}
+        if edge_count is None:
+            # Self loops are stored once
+            edge_count = (indptr[-1] + len(g._loops)) // 2
+        g._edge_count = edge_count
+        g.degree = _DegreeView(g)
+        return g
+
+    def to_networkx(self):
+        import networkx as nx
+        g = nx.Graph()
+        g.add_nodes_from(self)
+        g.add_edges_from(self.edges)
+        return g
+
+    def __repr__(self):
+        return 'AdjacencyGraph(nodes={}, edges={})'.format(self._node_count, self._edge_count)
+
@@ -0,0 +1,139 @@
+import math
+from time import perf_counter_ns
+from .algorithm import Algorithm
+
+__all__ = ['LatencyHistogram', 'InstrumentedMIS']
+
+OPERATIONS = ('insert_edge', 'remove_edge', 'insert_node', 'remove_node', 'is_in_mis', 'apply_updates')
+
+
+class LatencyHistogram:
+    # Log-linear histogram of latencies in nanoseconds.
+    # Values below 2^(SUB_BITS + 1) are counted exactly, above that every power of two is split into
+    # 2^SUB_BITS buckets, so a reported quantile is at most about 6% above the real value.
+    SUB_BITS = 4
+    _EXACT = 1 << (SUB_BITS + 1)
+    _SUB = 1 << SUB_BITS
+
+    def __init__(self):
+        self._buckets = [0] * (self._EXACT + 64 * self._SUB)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        if value < self._EXACT:
+            self._buckets[value] += 1
+        else:
+            shift = value.bit_length() - self.SUB_BITS - 1
+            self._buckets[self._EXACT + (shift - 1) * self._SUB + (value >> shift) - self._SUB] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def _upper_bound(self, index):
+        # Largest value counted in a bucket
+        if index < self._EXACT:
+            return index
+        shift, sub = divmod(index - self._EXACT, self._SUB)
+        shift += 1
+        return ((sub + self._SUB + 1) << shift) - 1
+
+    def quantile(self, q):
+        if self.count == 0:
+            return 0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, c in enumerate(self._buckets):
+            seen += c
+            if seen >= rank:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def clear(self):
+        self._buckets = [0] * len(self._buckets)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def merge(self, other):
+        for index, c in enumerate(other._buckets):
+            self._buckets[index] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count > 0 else 0,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+            'p999': self.quantile(0.999),
+            'max': self.max,
+        }
+
+
+class InstrumentedMIS(Algorithm):
+    # Wraps an algorithm and records the latency of every update and query into one histogram per operation.
+    # Only wrapped instances pay for the timing, the algorithms themselves are not changed.
+    # Histograms can be shared between several wrappers to aggregate over runs.
+
+    def __init__(self, algorithm, histograms=None):
+        super(InstrumentedMIS, self).__init__(algorithm.graph())
+        self._algorithm = algorithm
+        self._histograms = dict() if histograms is None else histograms
+        for op in OPERATIONS:
+            if op not in self._histograms:
+                self._histograms[op] = LatencyHistogram()
+        self._record = {op: self._histograms[op].record for op in OPERATIONS}
+
+    def algorithm(self):
+        return self._algorithm
+
+    def histograms(self):
+        return self._histograms
+
+    def report(self):
+        # Latency summary in nanoseconds for every operation that was called
+        return {op: h.summary() for op, h in self._histograms.items() if h.count > 0}
+
+    def insert_edge(self, u, v):
+        start = perf_counter_ns()
+        self._algorithm.insert_edge(u, v)
+        self._record['insert_edge'](perf_counter_ns() - start)
+
+    def remove_edge(self, u, v):
+        start = perf_counter_ns()
+        self._algorithm.remove_edge(u, v)
+        self._record['remove_edge'](perf_counter_ns() - start)
+
+    def insert_node(self, v, edges=[]):
+        start = perf_counter_ns()
+        self._algorithm.insert_node(v, edges)
+        self._record['insert_node'](perf_counter_ns() - start)
+
+    def remove_node(self, v):
+        start = perf_counter_ns()
+        self._algorithm.remove_node(v)
+        self._record['remove_node'](perf_counter_ns() - start)
+
+    def is_in_mis(self, node):
+        start = perf_counter_ns()
+        result = self._algorithm.is_in_mis(node)
+        self._record['is_in_mis'](perf_counter_ns() - start)
+        return result
+
+    def apply_updates(self, updates):
+        # A batch is recorded as one call, the wrapped algorithm keeps its own batching
+        updates = list(updates)
+        start = perf_counter_ns()
+        self._algorithm.apply_updates(updates)
+        self._record['apply_updates'](perf_counter_ns() - start)
+
+    def get_mis(self):
+        return self._algorithm.get_mis()
+
+    def is_valid_mis(self):
+        return self._algorithm.is_valid_mis()
@@ -0,0 +1,124 @@
+from .algorithm import Algorithm
+from .graph import AdjacencyGraph
+from .updates import INSERT_NODE
+from .views import LabelledView
+
+__all__ = ['NodeInterner', 'InternedMIS']
+
+
+class NodeInterner:
+    # Maps arbitrary hashable node labels to dense integer ids 0, 1, 2, ... and back.
+    # Ids are never reused, so an id stays valid for its label after the node is removed.
+
+    def __init__(self, labels=()):
+        self._ids = dict()
+        self._labels = []
+        for label in labels:
+            self.intern(label)
+
+    @classmethod
+    def from_labels(cls, labels):
+        # Labels must be unique, label i gets id i
+        interner = cls()
+        interner._labels = list(labels)
+        interner._ids = dict(zip(interner._labels, range(len(interner._labels))))
+        return interner
+
+    def intern(self, label):
+        i = self._ids.get(label)
+        if i is None:
+            i = len(self._labels)
+            self._ids[label] = i
+            self._labels.append(label)
+        return i
+
+    def intern_edge(self, u, v):
+        return self.intern(u), self.intern(v)
+
+    def id(self, label):
+        return self._ids[label]
+
+    def get(self, label, default=None):
+        return self._ids.get(label, default)
+
+    def label(self, i):
+        return self._labels[i]
+
+    def labels(self):
+        return self._labels
+
+    def __contains__(self, label):
+        return label in self._ids
+
+    def __len__(self):
+        return len(self._labels)
+
+
+class InternedMIS(Algorithm):
+    # Runs any algorithm on interned integer ids while exposing the original labels.
+    # Labels are translated once per call, so the wrapped algorithm only ever hashes small ints.
+    # Only insert_node interns a new label, the other updates look their labels up and raise KeyError for a label
+    # that was never a node.
+
+    def __init__(self, algo_cls, graph=None, backend=AdjacencyGraph, interner=None, nodes=(), edges=(), **kwargs):
+        # Either a labelled graph or labelled nodes and edges can be passed
+        if graph is not None:
+            nodes, edges = graph.nodes, graph.edges
+
+        self._interner = NodeInterner() if interner is None else interner
+        interned = backend()
+        interned.add_nodes_from(self._interner.intern(v) for v in nodes)
+        interned.add_edges_from(self._interner.intern_edge(u, v) for u, v in edges)
+
+        super(InternedMIS, self).__init__(interned)
+        self._algorithm = algo_cls(interned, **kwargs)
+
+    def interner(self):
+        return self._interner
+
+    def algorithm(self):
+        return self._algorithm
+
+    def insert_edge(self, u, v):
+        self._algorithm.insert_edge(self._interner.id(u), self._interner.id(v))
+
+    def remove_edge(self, u, v):
+        self._algorithm.remove_edge(self._interner.id(u), self._interner.id(v))
+
+    def insert_node(self, v, edges=[]):
+        i = self._interner.intern(v)
+        ids = self._interner
+        # Edges to unknown nodes are dropped by the algorithm anyway, don't intern them
+        interned_edges = [(ids.get(a), ids.get(b)) for a, b in edges if a in ids and b in ids]
+        self._algorithm.insert_node(i, interned_edges)
+
+    def remove_node(self, v):
+        self._algorithm.remove_node(self._interner.id(v))
+
+    def apply_updates(self, updates):
+        # Translated in order, so an update can use a node inserted earlier in the same call
+        self._algorithm.apply_updates(self.translate(update) for update in updates)
+
+    def translate(self, update):
+        # The update tuple with ids instead of labels, interns the node of insert_node
+        ids = self._interner
+        if update[0] != INSERT_NODE:
+            return (update[0],) + tuple(ids.id(v) for v in update[1:])
+        i = ids.intern(update[1])
+        edges = update[2] if len(update) > 2 else []
+        return INSERT_NODE, i, [(ids.get(a), ids.get(b)) for a, b in edges if a in ids and b in ids]
+
+    def is_in_mis(self, node):
+        i = self._interner.get(node)
+        return i is not None and self._algorithm.is_in_mis(i)
+
+    def get_mis(self):
+        return LabelledView(self._algorithm.get_mis(), self._interner)
+
+    def is_valid_at(self, nodes):
+        # Labels that were never interned are skipped like nodes that are not in the graph
+        ids = self._interner
+        return self._algorithm.is_valid_at([ids.get(v) for v in nodes if v in ids])
+
+    def is_valid_mis(self):
+        return self._algorithm.is_valid_mis()
@@ -0,0 +1,149 @@
+import os
+from functools import partial
+import numpy as np
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from .algorithm import SimpleMIS
+from .vectorized import CSRGraph
+
+__all__ = ['parallel_luby_mis', 'parallel_simple_mis']
+
+class _SharedArrays:
+    # Numpy arrays backed by shared memory blocks that worker processes attach to by name
+
+    def __init__(self, **arrays):
+        self._blocks = []
+        self.specs = dict()
+        self.arrays = dict()
+        for name, array in arrays.items():
+            block = SharedMemory(create=True, size=max(1, array.nbytes))
+            view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            view[...] = array
+            self._blocks.append(block)
+            self.specs[name] = (block.name, array.shape, array.dtype.str)
+            self.arrays[name] = view
+
+    def close(self):
+        self.arrays.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+def _task(func, specs, bounds):
+    # Runs func(shared arrays, bounds) in a worker. The blocks are attached for this task only and closed when it
+    # returns, so workers hold no mappings between tasks. func must not return views of the arrays.
+    blocks = []
+    try:
+        shared = dict()
+        for name, (block_name, shape, dtype) in specs.items():
+            block = SharedMemory(name=block_name)
+            blocks.append(block)
+            shared[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+        return func(shared, bounds)
+    finally:
+        # The arrays export the buffers, they must be gone before the blocks can be closed
+        shared = None
+        for block in blocks:
+            block.close()
+
+
+def _segment_reduce(shared, ufunc, values, lo, hi, empty):
+    # Reduces the neighbor values of the nodes lo..hi-1, nodes without neighbors get empty
+    indptr = shared['indptr']
+    starts = indptr[lo:hi] - indptr[lo]
+    values = np.append(values, empty)
+    result = ufunc.reduceat(values, starts)
+    result[indptr[lo + 1:hi + 1] == indptr[lo:hi]] = empty
+    return result
+
+
+def _select(shared, bounds):
+    # Nodes whose rank is lower than the rank of all their active neighbors
+    lo, hi = bounds
+    indptr, indices, rank, active = shared['indptr'], shared['indices'], shared['rank'], shared['active']
+    n = len(rank) - 1
+    dst = indices[indptr[lo]:indptr[hi]]
+    neighbor_rank = np.where(active[dst], rank[dst], n)
+    neighbor_min = _segment_reduce(shared, np.minimum, neighbor_rank, lo, hi, n)
+    shared['selected'][lo:hi] = active[lo:hi] & (rank[lo:hi] < neighbor_min)
+
+
+def _deactivate(shared, bounds):
+    # Selected nodes join the mis, they and their neighbors leave the active set
+    lo, hi = bounds
+    indptr, indices, selected, active = shared['indptr'], shared['indices'], shared['selected'], shared['active']
+    dst = indices[indptr[lo]:indptr[hi]]
+    neighbor_selected = _segment_reduce(shared, np.maximum, selected[dst], lo, hi, False)
+    shared['in_mis'][lo:hi] |= selected[lo:hi]
+    active[lo:hi] &= ~(selected[lo:hi] | neighbor_selected)
+    return int(np.count_nonzero(active[lo:hi]))
+
+
+def _count(shared, bounds):
+    lo, hi = bounds
+    indptr, indices = shared['indptr'], shared['indices']
+    dst = indices[indptr[lo]:indptr[hi]]
+    shared['count'][lo:hi] = _segment_reduce(shared, np.add, shared['in_mis'][dst].astype(np.int64), lo, hi, 0)
+
+
+def _partition(indptr, parts):
+    # Node ranges with about the same number of adjacency entries each
+    n = len(indptr) - 1
+    targets = np.linspace(0, indptr[-1], parts + 1)
+    bounds = np.searchsorted(indptr, targets, side='left')
+    bounds[0], bounds[-1] = 0, n
+    bounds = np.maximum.accumulate(np.minimum(bounds, n))
+    return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:]) if lo < hi]
+
+
+def _parallel_luby(csr, rank, active, workers, counts):
+    # Returns the mis mask and, if requested, the number of mis neighbors per position.
+    # Position n is a sentinel that is never active, self loops are redirected to it.
+    n = len(csr)
+    indices = csr.indices.copy()
+    indices[indices == csr.sources()] = n
+    shared = _SharedArrays(
+        indptr=csr.indptr, indices=indices, rank=np.append(rank, n), active=np.append(active, False),
+        selected=np.zeros(n + 1, dtype=bool), in_mis=np.zeros(n + 1, dtype=bool), count=np.zeros(n, dtype=np.int64))
+    try:
+        ranges = _partition(csr.indptr, workers * 4)
+        with Pool(workers) as pool:
+            remaining = int(np.count_nonzero(active))
+            while remaining > 0:
+                pool.map(partial(_task, _select, shared.specs), ranges)
+                remaining = sum(pool.map(partial(_task, _deactivate, shared.specs), ranges))
+            if counts:
+                pool.map(partial(_task, _count, shared.specs), ranges)
+
+        return shared.arrays['in_mis'][:n].copy(), shared.arrays['count'].copy() if counts else None
+    finally:
+        shared.close()
+
+
+def parallel_luby_mis(graph, candidate_filter=None, nodes=None, seed=0, workers=None, csr=None):
+    # Same result as vectorized.luby_mis with the same seed, but every round is split over a process pool.
+    # The workers share the CSR adjacency and the round state through shared memory.
+    if csr is None:
+        csr = CSRGraph.from_graph(graph)
+    if workers is None:
+        workers = os.cpu_count()
+
+    rank = np.random.RandomState(seed).permutation(len(csr))
+    active = csr.mask(nodes, candidate_filter)
+    in_mis, _ = _parallel_luby(csr, rank, active, workers, counts=False)
+    return csr.to_labels(in_mis)
+
+
+def parallel_simple_mis(graph, cls=SimpleMIS, seed=0, workers=None):
+    # Builds a SimpleMIS (or subclass) whose mis and counts are both computed by the pool
+    if workers is None:
+        workers = os.cpu_count()
+    csr = CSRGraph.from_graph(graph)
+    rank = np.random.RandomState(seed).permutation(len(csr))
+    in_mis, count = _parallel_luby(csr, rank, csr.mask(), workers, counts=True)
+
+    positions = np.flatnonzero(count).tolist()
+    labels = csr.labels
+    return cls.from_state(graph, csr.to_labels(in_mis), {labels[i]: int(count[i]) for i in positions})
@@ -0,0 +1,353 @@
+import json
+import os
+import struct
+import time
+from collections import defaultdict
+import networkx as nx
+import numpy as np
+from . import algorithm
+from .algorithm import Algorithm
+from .compact import CounterArray, MembershipSet
+from .degrees import DegreeIndex, CompactDegreeIndex
+from .graph import AdjacencyGraph
+from .updates import *
+from .vectorized import CSRGraph
+
+__all__ = ['save_snapshot', 'load_snapshot', 'UpdateLog', 'LoggedMIS', 'recover']
+
+# A snapshot is an uncompressed npz file: the graph as CSR arrays, every set, dict, list and compact attribute of the
+# algorithm as arrays and a JSON header with the class, the scalars and the log generation.
+# Callable attributes (initializers, filters) are not stored, they are passed to load_snapshot again.
+# Degree indexes are not stored either, they are rebuilt from the graph.
+# Nothing is pickled, a snapshot is loaded with allow_pickle=False. Values that are not all ints (string labels,
+# float scalars in dicts) are stored as a JSON array instead, so labels must be JSON values (str, int, float).
+
+
+def _store(arrays, header, name, values):
+    values = list(values)
+    if all(type(v) is int for v in values):
+        arrays[name] = np.array(values, dtype=np.int64)
+    else:
+        arrays[name] = np.frombuffer(json.dumps(values).encode('utf-8'), dtype=np.uint8)
+        header['json'].append(name)
+
+
+def _restore(data, header, name):
+    if name in header['json']:
+        return json.loads(data[name].tobytes().decode('utf-8'))
+    return data[name].tolist()
+
+
+def save_snapshot(algo: Algorithm, path, generation=0):
+    graph = algo.graph()
+    csr = CSRGraph.from_graph(graph)
+    arrays = {
+        'graph.indptr': csr.indptr,
+        'graph.indices': csr.indices.astype(np.intc),
+        'graph.present': csr.present,
+    }
+    header = {
+        'class': type(algo).__name__,
+        'backend': 'adjacency' if isinstance(graph, AdjacencyGraph) else 'networkx',
+        'generation': generation,
+        'scalars': dict(),
+        'attributes': dict(),
+        'json': [],
+    }
+    if not isinstance(csr.labels, range):
+        _store(arrays, header, 'graph.labels', csr.labels)
+    for name, value in vars(algo).items():
+        if name == '_graph' or callable(value) or isinstance(value, (DegreeIndex, CompactDegreeIndex)):
+            continue
+        if value is None or isinstance(value, (bool, int, float)):
+            header['scalars'][name] = value
+        elif isinstance(value, CounterArray):
+            header['attributes'][name] = 'counter_array'
+            arrays[name] = np.frombuffer(value, dtype=np.intc)
+        elif isinstance(value, MembershipSet):
+            header['attributes'][name] = 'membership'
+            _store(arrays, header, name, value)
+        elif isinstance(value, dict):
+            header['attributes'][name] = 'counter' if isinstance(value, defaultdict) else 'dict'
+            _store(arrays, header, name + '.keys', value.keys())
+            _store(arrays, header, name + '.values', value.values())
+        elif isinstance(value, (set, list)):
+            header['attributes'][name] = 'set' if isinstance(value, set) else 'list'
+            _store(arrays, header, name, value)
+        else:
+            raise TypeError('Cannot snapshot attribute {} of {}'.format(name, type(algo).__name__))
+    arrays['header'] = np.frombuffer(json.dumps(header).encode('utf-8'), dtype=np.uint8)
+
+    # Written under a temporary name, a crash never leaves a partial snapshot behind
+    with open(path + '.tmp', 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(path + '.tmp', path)
+
+
+def _load_graph(data, header, backend):
+    indptr, indices, present = data['graph.indptr'], data['graph.indices'], data['graph.present']
+    n = len(present)
+    src = np.repeat(np.arange(n), np.diff(indptr))
+    if 'graph.labels' not in data and backend is AdjacencyGraph:
+        edge_count = (len(indices) + int(np.count_nonzero(src == indices))) // 2
+        return AdjacencyGraph.from_csr(indptr.tolist(), indices, present.tolist(), edge_count)
+
+    labels = _restore(data, header, 'graph.labels') if 'graph.labels' in data else range(n)
+    keep = src <= indices
+    graph = backend()
+    graph.add_nodes_from(labels[i] for i in np.flatnonzero(present).tolist())
+    graph.add_edges_from((labels[u], labels[v]) for u, v in zip(src[keep].tolist(), indices[keep].tolist()))
+    return graph
+
+
+def load_snapshot(path, backend=None, **kwargs):
+    # Returns the algorithm and the log generation of the snapshot.
+    # kwargs are passed to the constructor, e.g. an initializer that was used before.
+    with np.load(path, allow_pickle=False) as data:
+        header = json.loads(data['header'].tobytes().decode('utf-8'))
+        if backend is None:
+            backend = AdjacencyGraph if header['backend'] == 'adjacency' else nx.Graph
+        graph = _load_graph(data, header, backend)
+
+        # The constructor on an empty graph is cheap and sets everything that is not stored, like initializers
+        algo = getattr(algorithm, header['class'])(backend(), **kwargs)
+        algo._graph = graph
+        for name, value in header['scalars'].items():
+            # Unset callables are stored as None, don't overwrite the ones passed in kwargs
+            if not callable(getattr(algo, name, None)):
+                setattr(algo, name, value)
+        for name, kind in header['attributes'].items():
+            if kind == 'counter_array':
+                counter = CounterArray()
+                counter.frombytes(data[name].tobytes())
+                setattr(algo, name, counter)
+            elif kind == 'membership':
+                setattr(algo, name, MembershipSet(_restore(data, header, name)))
+            elif kind in ('counter', 'dict'):
+                items = zip(_restore(data, header, name + '.keys'), _restore(data, header, name + '.values'))
+                setattr(algo, name, defaultdict(lambda: 0, items) if kind == 'counter' else dict(items))
+            else:
+                values = _restore(data, header, name)
+                setattr(algo, name, set(values) if kind == 'set' else values)
+    for name, value in vars(algo).items():
+        if isinstance(value, (DegreeIndex, CompactDegreeIndex)):
+            setattr(algo, name, type(value)(graph.degree))
+    return algo, header['generation']
+
+
+class UpdateLog:
+    # Append-only binary log of updates on integer node ids.
+    # The header holds the generation of the snapshot the log continues, a log with another generation is stale.
+    # A record that was cut off by a crash at the end of the file is ignored when reading.
+    # Updates that were applied together by apply_updates are preceded by a batch record with their number,
+    # so recovery applies them together again. A batch that was cut off is ignored as a whole.
+    MAGIC = b'DMISWAL1'
+    _HEADER = struct.Struct('<8sQ')
+    _EDGE = struct.Struct('<Bqq')
+    _NODE = struct.Struct('<BqI')
+    _BATCH = struct.Struct('<BI')
+    _BATCH_CODE = 5
+    _CODES = {INSERT_EDGE: 1, REMOVE_EDGE: 2, INSERT_NODE: 3, REMOVE_NODE: 4}
+    _OPS = {code: op for op, code in _CODES.items()}
+
+    def __init__(self, path, generation=0, sync=False):
+        # Continues the log at path if it has the same generation, starts a new one otherwise
+        self.path = path
+        self.sync = sync
+        if UpdateLog.generation_of(path) == generation:
+            self._file = open(path, 'r+b')
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, 'w+b')
+            self._file.write(self._HEADER.pack(self.MAGIC, generation))
+            self.flush()
+        self.generation = generation
+
+    @staticmethod
+    def generation_of(path):
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            header = f.read(UpdateLog._HEADER.size)
+        if len(header) < UpdateLog._HEADER.size or header[:8] != UpdateLog.MAGIC:
+            return None
+        return UpdateLog._HEADER.unpack(header)[1]
+
+    def _encode(self, update):
+        op, v = update[0], update[1]
+        if op in EDGE_OPS:
+            return self._EDGE.pack(self._CODES[op], v, update[2])
+        edges = update[2] if op == INSERT_NODE and len(update) > 2 else []
+        record = self._NODE.pack(self._CODES[op], v, len(edges))
+        return record + b''.join(struct.pack('<qq', a, b) for a, b in edges)
+
+    def append(self, update):
+        self._file.write(self._encode(update))
+        self.flush()
+
+    def extend(self, updates, batch=False):
+        updates = list(updates)
+        marker = self._BATCH.pack(self._BATCH_CODE, len(updates)) if batch else b''
+        self._file.write(marker + b''.join(self._encode(update) for update in updates))
+        self.flush()
+
+    def position(self):
+        return self._file.tell()
+
+    def truncate(self, position):
+        # Drops the records written after position, e.g. of an update the algorithm rejected
+        self._file.seek(position)
+        self._file.truncate()
+        self.flush()
+
+    def flush(self):
+        self._file.flush()
+        if self.sync:
+            os.fsync(self._file.fileno())
+
+    def reset(self, generation):
+        # Drops all records, called once a snapshot contains them
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(self._HEADER.pack(self.MAGIC, generation))
+        self.flush()
+        self.generation = generation
+
+    def close(self):
+        self._file.close()
+
+    @staticmethod
+    def _decode(data, i):
+        # Returns the update at offset i and the offset after it, None if the record was cut off
+        code = data[i]
+        if code in (1, 2):
+            if i + UpdateLog._EDGE.size > len(data):
+                return None
+            _, u, v = UpdateLog._EDGE.unpack_from(data, i)
+            return (UpdateLog._OPS[code], u, v), i + UpdateLog._EDGE.size
+
+        if i + UpdateLog._NODE.size > len(data):
+            return None
+        _, v, count = UpdateLog._NODE.unpack_from(data, i)
+        i += UpdateLog._NODE.size
+        if i + 16 * count > len(data):
+            return None
+        edges = [struct.unpack_from('<qq', data, i + 16 * k) for k in range(count)]
+        return ((INSERT_NODE, v, edges) if code == 3 else (REMOVE_NODE, v)), i + 16 * count
+
+    @staticmethod
+    def read_entries(path):
+        # Yields (batch, updates) in log order: batch is True for updates that apply_updates applied together,
+        # every other update is its own entry
+        with open(path, 'rb') as f:
+            data = f.read()
+        i = UpdateLog._HEADER.size
+        while i < len(data):
+            if data[i] != UpdateLog._BATCH_CODE:
+                decoded = UpdateLog._decode(data, i)
+                if decoded is None:
+                    return
+                update, i = decoded
+                yield False, [update]
+                continue
+
+            if i + UpdateLog._BATCH.size > len(data):
+                return
+            _, count = UpdateLog._BATCH.unpack_from(data, i)
+            i += UpdateLog._BATCH.size
+            updates = []
+            for _ in range(count):
+                decoded = UpdateLog._decode(data, i) if i < len(data) else None
+                if decoded is None:
+                    return
+                update, i = decoded
+                updates.append(update)
+            yield True, updates
+
+    @staticmethod
+    def read(path):
+        for _, updates in UpdateLog.read_entries(path):
+            yield from updates
+
+
+class LoggedMIS(Algorithm):
+    # Writes every update to the log before applying it, checkpoint() replaces the log with a snapshot.
+    # An update the algorithm rejects (raises) is removed from the log again. A batch that raised halfway may
+    # have been applied in part, that part is not in the log.
+    # After a crash recover() loads the last snapshot and replays the log tail the same way it was applied.
+
+    def __init__(self, algorithm, snapshot_path, log_path, generation=None, sync=False):
+        super(LoggedMIS, self).__init__(algorithm.graph())
+        self._algorithm = algorithm
+        self._snapshot_path = snapshot_path
+        if generation is None:
+            # A new log, start with a snapshot of the current state. The generation is taken from the clock,
+            # so a log that is left over from an earlier run never matches the new snapshot.
+            self._log = UpdateLog(log_path, time.time_ns(), sync)
+            self.checkpoint()
+        else:
+            self._log = UpdateLog(log_path, generation, sync)
+
+    def algorithm(self):
+        return self._algorithm
+
+    def log(self):
+        return self._log
+
+    def checkpoint(self):
+        generation = self._log.generation + 1
+        save_snapshot(self._algorithm, self._snapshot_path, generation)
+        # A crash before the reset leaves a log with the old generation, which recover() ignores
+        self._log.reset(generation)
+
+    def _logged(self, updates, batch, apply, *args):
+        # Logs the updates, calls apply(*args) and takes the records back if it raises
+        position = self._log.position()
+        self._log.extend(updates, batch)
+        try:
+            apply(*args)
+        except BaseException:
+            self._log.truncate(position)
+            raise
+
+    def insert_edge(self, u, v):
+        self._logged([(INSERT_EDGE, u, v)], False, self._algorithm.insert_edge, u, v)
+
+    def remove_edge(self, u, v):
+        self._logged([(REMOVE_EDGE, u, v)], False, self._algorithm.remove_edge, u, v)
+
+    def insert_node(self, v, edges=[]):
+        edges = list(edges)
+        self._logged([(INSERT_NODE, v, edges)], False, self._algorithm.insert_node, v, edges)
+
+    def remove_node(self, v):
+        self._logged([(REMOVE_NODE, v)], False, self._algorithm.remove_node, v)
+
+    def apply_updates(self, updates):
+        updates = list(updates)
+        self._logged(updates, True, self._algorithm.apply_updates, updates)
+
+    def is_in_mis(self, node):
+        return self._algorithm.is_in_mis(node)
+
+    def get_mis(self):
+        return self._algorithm.get_mis()
+
+    def is_valid_mis(self):
+        return self._algorithm.is_valid_mis()
+
+    def close(self):
+        self._log.close()
+
+
+def recover(snapshot_path, log_path, backend=None, sync=False, **kwargs):
+    # Loads the snapshot, replays the updates logged after it and keeps logging to the same log
+    algo, generation = load_snapshot(snapshot_path, backend, **kwargs)
+    if UpdateLog.generation_of(log_path) == generation:
+        # One by one or as a batch like the updates were applied, batches take another path in the algorithms
+        for batch, updates in UpdateLog.read_entries(log_path):
+            if batch:
+                algo.apply_updates(updates)
+            else:
+                getattr(algo, updates[0][0])(*updates[0][1:])
+    return LoggedMIS(algo, snapshot_path, log_path, generation, sync)
@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import json
+import networkx as nx
+from .algorithm import *
+from .feed import TrackedMIS
+from .graph import AdjacencyGraph
+from .updates import EDGE_OPS, NODE_OPS, INSERT_NODE
+
+__all__ = ['MISServer']
+
+# JSON lines protocol, one object per line in both directions.
+# Requests carry an id that is echoed in the response:
+#   {"id": 1, "op": "insert_edge", "args": [u, v]}            -> {"id": 1, "ok": true, "version": 7}
+#   {"id": 2, "op": "insert_node", "args": [v, [[v, w], ...]]}
+#   {"id": 3, "op": "is_in_mis", "args": [v]}                 -> {"id": 3, "result": true, "version": 7}
+#   {"id": 4, "op": "get_mis"}                                -> {"id": 4, "result": [...], "version": 7}
+#   {"id": 5, "op": "subscribe"}                              -> {"id": 5, "ok": true, "version": 7}
+#   {"id": 6, "op": "stats"}                                  -> {"id": 6, "result": {...}, "version": 7}
+# Errors are answered with {"id": ..., "error": "..."}. Subscribed connections also receive
+#   {"event": "mis", "version": 8, "added": [...], "removed": [...]}
+# after every batch that changed the mis.
+
+UPDATE_OPS = EDGE_OPS + NODE_OPS
+
+# Longest line either side reads. get_mis answers with the whole mis on one line, asyncio's default of 64 KiB is
+# reached at about 10000 nodes.
+LINE_LIMIT = 1 << 28
+
+
+class _Pending:
+
+    def __init__(self, request, writer, update=None):
+        self.request = request
+        self.writer = writer
+        self.update = update
+
+
+class MISServer:
+    # Serves one algorithm over TCP. Everything runs on the event loop thread, so the algorithm needs no locks and
+    # queries are answered from the current state right away.
+    # Updates are not applied one by one: they are queued and a single task applies everything that arrived in the
+    # meantime (up to max_batch updates) with one apply_updates call, answering each request when its batch is
+    # done. Every update is checked against the graph before it joins a batch, an invalid one is answered with an
+    # error and left out, so a batch only fails as a whole if the algorithm itself raises. Requests of one
+    # connection are processed in order, a query that follows an update of the same connection waits for that
+    # update.
+
+    def __init__(self, algorithm, max_batch=4096):
+        self._tracked = TrackedMIS(algorithm)
+        self._max_batch = max_batch
+        self._pending = []
+        self._waiting = dict()
+        self._subscribers = set()
+        self._wakeup = None
+        self._server = None
+        self._task = None
+        self.version = 0
+        self.batches = 0
+        self.updates = 0
+        self.queries = 0
+
+    def algorithm(self):
+        return self._tracked.algorithm()
+
+    async def start(self, host='127.0.0.1', port=0):
+        # Returns the address the server listens on, port 0 picks a free port
+        self._wakeup = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle, host, port, limit=LINE_LIMIT)
+        self._task = asyncio.get_running_loop().create_task(self._apply_loop())
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    def stats(self):
+        return {'version': self.version, 'batches': self.batches, 'updates': self.updates, 'queries': self.queries,
+                'subscribers': len(self._subscribers)}
+
+    async def _handle(self, reader, writer):
+        self._waiting[writer] = 0
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    op = request['op']
+                    update = self._update(op, request.get('args', [])) if op in UPDATE_OPS else None
+                except (ValueError, KeyError, TypeError):
+                    self._send(writer, {'id': None, 'error': 'invalid request'})
+                    continue
+                if update is not None:
+                    self._queue(_Pending(request, writer, update))
+                elif self._waiting[writer] > 0:
+                    self._queue(_Pending(request, writer))
+                else:
+                    self._answer(request, writer)
+                await writer.drain()
+        except ValueError:
+            # The line exceeded LINE_LIMIT, the rest of the stream can't be split into requests anymore
+            self._send(writer, {'id': None, 'error': 'request too long'})
+        except ConnectionError:
+            pass
+        finally:
+            self._subscribers.discard(writer)
+            del self._waiting[writer]
+            writer.close()
+
+    @staticmethod
+    def _update(op, args):
+        if op == INSERT_NODE and len(args) > 1:
+            return (op, args[0], [tuple(e) for e in args[1]])
+        return (op,) + tuple(args)
+
+    def _queue(self, pending):
+        if pending.update is not None:
+            self._waiting[pending.writer] += 1
+        self._pending.append(pending)
+        self._wakeup.set()
+
+    async def _apply_loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Requests that are already in the socket buffers join this batch
+            await asyncio.sleep(0)
+            pending, self._pending = self._pending, []
+            batch = []
+            for item in pending:
+                if item.update is None:
+                    self._apply(batch)
+                    batch = []
+                    self._answer(item.request, item.writer)
+                else:
+                    batch.append(item)
+                    if len(batch) >= self._max_batch:
+                        self._apply(batch)
+                        batch = []
+            self._apply(batch)
+
+    def _check(self, update, changed):
+        # Reason the algorithm would reject the update, None if it is valid. Node existence is checked against
+        # the graph as the earlier updates of the batch leave it, changed maps their nodes to present or not.
+        graph = self._tracked.graph()
+
+        def present(v):
+            return changed[v] if v in changed else graph.has_node(v)
+
+        op = update[0]
+        if op in EDGE_OPS:
+            if len(update) != 3:
+                return 'expected 2 args'
+            for v in update[1:]:
+                if not present(v):
+                    return 'unknown node {}'.format(v)
+        elif op == INSERT_NODE:
+            if len(update) not in (2, 3) or (len(update) == 3 and any(len(e) != 2 for e in update[2])):
+                return 'expected a node and a list of edges'
+            v = update[1]
+            if present(v):
+                return 'node {} exists'.format(v)
+            for a, b in (update[2] if len(update) == 3 else []):
+                if v not in (a, b):
+                    return 'edge {} does not contain node {}'.format((a, b), v)
+                w = b if a == v else a
+                if w != v and not present(w):
+                    return 'unknown node {}'.format(w)
+            changed[v] = True
+        else:
+            if len(update) != 2:
+                return 'expected 1 arg'
+            if not present(update[1]):
+                return 'unknown node {}'.format(update[1])
+            changed[update[1]] = False
+        return None
+
+    def _reply(self, item, response):
+        if item.writer in self._waiting:
+            self._waiting[item.writer] -= 1
+            self._send(item.writer, dict(response, id=item.request.get('id')))
+
+    def _apply(self, batch):
+        changed = dict()
+        valid = []
+        for item in batch:
+            try:
+                error = self._check(item.update, changed)
+            except TypeError as e:
+                error = '{}: {}'.format(type(e).__name__, e)
+            if error is None:
+                valid.append(item)
+            else:
+                self._reply(item, {'error': 'invalid update: {}'.format(error), 'version': self.version})
+        batch = valid
+        if not batch:
+            return
+        try:
+            delta = self._tracked.apply_updates([item.update for item in batch])
+        except Exception as e:
+            # The updates before the failing one may have been applied
+            response = {'error': '{}: {}'.format(type(e).__name__, e)}
+            delta = self._tracked.apply_updates([])
+        else:
+            response = {'ok': True}
+        self.version += 1
+        self.batches += 1
+        self.updates += len(batch)
+        response['version'] = self.version
+        for item in batch:
+            self._reply(item, response)
+        if delta.added or delta.removed:
+            event = {'event': 'mis', 'version': self.version, 'added': list(delta.added),
+                     'removed': list(delta.removed)}
+            for writer in self._subscribers:
+                self._send(writer, event)
+
+    def _answer(self, request, writer):
+        op = request['op']
+        args = request.get('args', [])
+        response = {'id': request.get('id'), 'version': self.version}
+        try:
+            if op == 'is_in_mis':
+                self.queries += 1
+                response['result'] = bool(self._tracked.is_in_mis(args[0]))
+            elif op == 'get_mis':
+                self.queries += 1
+                response['result'] = list(self._tracked.get_mis())
+            elif op == 'subscribe':
+                self._subscribers.add(writer)
+                response['ok'] = True
+            elif op == 'unsubscribe':
+                self._subscribers.discard(writer)
+                response['ok'] = True
+            elif op == 'stats':
+                response['result'] = self.stats()
+            else:
+                response['error'] = 'unknown op {}'.format(op)
+        except (IndexError, KeyError, TypeError) as e:
+            response['error'] = '{}: {}'.format(type(e).__name__, e)
+        self._send(writer, response)
+
+    @staticmethod
+    def _send(writer, message):
+        if not writer.is_closing():
+            writer.write(json.dumps(message).encode() + b'\n')
+
+
+ALGORITHMS = {
+    'simple': SimpleMIS,
+    'degree': DegreeAwareMIS,
+    'dynamic': ImprovedDynamicMIS,
+    'implicit': ImplicitMIS,
+    'random': RandomPriorityMIS,
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m dynamic_mis.server',
+                                     description='Serves a dynamic MIS over a JSON lines socket protocol')
+    parser.add_argument('-a', '--algorithm', choices=list(ALGORITHMS), default='simple')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7878)
+    parser.add_argument('--nodes', type=int, default=10000, help='nodes of the initial random graph')
+    parser.add_argument('--edges', type=int, default=0, help='edges of the initial random graph')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-batch', type=int, default=4096, help='most updates applied by one apply_updates')
+    return parser.parse_args(argv)
+
+
+async def _serve(args):
+    graph = AdjacencyGraph(nx.gnm_random_graph(args.nodes, args.edges, seed=args.seed))
+    server = MISServer(ALGORITHMS[args.algorithm](graph), args.max_batch)
+    host, port = await server.start(args.host, args.port)
+    print('Serving {} on {}:{}'.format(args.algorithm, host, port), flush=True)
+    await server.serve_forever()
+
+
+def main(argv=None):
+    try:
+        asyncio.run(_serve(parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+import os
+import weakref
+import zlib
+from collections import defaultdict
+from multiprocessing import Pipe, Process
+from .algorithm import Algorithm, filtered_edge_insert
+from .views import MISView
+
+__all__ = ['ShardedMIS', 'ShardWorkers', 'node_priority', 'shard_of']
+
+
+def node_priority(v):
+    # Deterministic in every process (hash() of a str is not), distinct reprs never tie
+    key = repr(v).encode()
+    return zlib.crc32(key), key
+
+
+def shard_of(v, shards):
+    # Dense integer ids are dealt round robin, other labels by a stable hash
+    if isinstance(v, int):
+        return v % shards
+    return zlib.crc32(repr(v).encode()) % shards
+
+
+class _Shard:
+    # The SimpleMIS state of the nodes one worker owns: their adjacency, mis neighbor counts and mis membership.
+    # A remote neighbor (owned by another shard) maps to whether it is known to be in the mis, a local one to None.
+    # Membership of remote neighbors is only learned from join and leave messages, one per cut edge, so the
+    # counts include every mis neighbor once all messages are delivered.
+
+    def __init__(self, index, shards, partition):
+        self._index = index
+        self._shards = shards
+        self._partition = partition
+        self._adj = dict()
+        self._count = dict()
+        self._mis = set()
+
+    def _owner(self, v):
+        return self._partition(v, self._shards)
+
+    def step(self, events):
+        # Applies one round of events and returns (messages per shard, [(node, in mis)] in order).
+        # Nodes that become free join at the end of the round, so within a shard no two neighbors join together.
+        self._outbox = [[] for _ in range(self._shards)]
+        self._changes = []
+        self._free = []
+        for event in events:
+            getattr(self, '_' + event[0])(*event[1:])
+        for v in self._free:
+            if self._count.get(v) == 0 and v not in self._mis:
+                self._join(v)
+        return self._outbox, self._changes
+
+    def _join(self, v):
+        self._mis.add(v)
+        self._changes.append((v, True))
+        for w, remote in self._adj[v].items():
+            if remote is None:
+                self._count[w] += 1
+            else:
+                self._outbox[self._owner(w)].append(('joined', v, w))
+
+    def _leave(self, v):
+        self._mis.remove(v)
+        self._changes.append((v, False))
+        for w, remote in self._adj[v].items():
+            if remote is None:
+                self._decrease(w)
+            else:
+                self._outbox[self._owner(w)].append(('left', v, w))
+
+    def _decrease(self, v):
+        self._count[v] -= 1
+        if self._count[v] == 0 and v not in self._mis:
+            self._free.append(v)
+
+    def _resolve(self, u, v):
+        # Both u and v are in the mis: the endpoint with the lower priority leaves, every shard decides the same
+        if node_priority(u) < node_priority(v):
+            self._leave(u)
+        else:
+            self._leave(v)
+
+    def _insert_node(self, v):
+        self._adj[v] = dict()
+        self._count[v] = 0
+        self._free.append(v)
+
+    def _remove_node(self, v):
+        # The owners of the remote neighbors remove their half of the cut edges themselves
+        in_mis = v in self._mis
+        if in_mis:
+            self._mis.remove(v)
+            self._changes.append((v, False))
+        for w, remote in self._adj.pop(v).items():
+            if remote is None:
+                del self._adj[w][v]
+                if in_mis:
+                    self._decrease(w)
+        del self._count[v]
+
+    def _insert_edge(self, u, v):
+        # u is owned by this shard. A cut edge only adds u's half, the owner of v adds the other one.
+        if v in self._adj[u]:
+            return
+        if self._owner(v) != self._index:
+            self._adj[u][v] = False
+            if u in self._mis:
+                self._outbox[self._owner(v)].append(('joined', u, v))
+            return
+
+        self._adj[u][v] = None
+        self._adj[v][u] = None
+        if u in self._mis:
+            self._count[v] += 1
+        if v in self._mis:
+            self._count[u] += 1
+            if u in self._mis:
+                self._resolve(u, v)
+
+    def _remove_edge(self, u, v):
+        if v not in self._adj[u]:
+            return
+        remote = self._adj[u].pop(v)
+        if remote is not None:
+            if remote:
+                self._decrease(u)
+            return
+
+        del self._adj[v][u]
+        if u in self._mis:
+            self._decrease(v)
+        if v in self._mis:
+            self._decrease(u)
+
+    def _joined(self, u, v):
+        # Remote u joined the mis (or a cut edge to it was inserted while it was in the mis)
+        if v not in self._adj or self._adj[v].get(u) is not False:
+            return
+        self._adj[v][u] = True
+        self._count[v] += 1
+        if v in self._mis and node_priority(v) < node_priority(u):
+            self._leave(v)
+
+    def _left(self, u, v):
+        if v not in self._adj or self._adj[v].get(u) is not True:
+            return
+        self._adj[v][u] = False
+        self._decrease(v)
+
+
+def _serve(conn, index, shards, partition):
+    shard = _Shard(index, shards, partition)
+    while True:
+        events = conn.recv()
+        if events is None:
+            break
+        conn.send(shard.step(events))
+    conn.close()
+
+
+def _shutdown(conns, processes):
+    for conn in conns:
+        try:
+            conn.send(None)
+            conn.close()
+        except OSError:
+            pass
+    for p in processes:
+        p.join()
+
+
+class ShardWorkers:
+    # The worker processes of a ShardedMIS. Started ahead, ShardedMIS(graph, workers=...) takes them over and
+    # skips the process start, e.g. so that a benchmark times the initialization alone. One ShardedMIS can use
+    # them, they stop with it (or when they are garbage collected unused).
+
+    def __init__(self, shards=None, partition=shard_of):
+        self.shards = os.cpu_count() if shards is None else shards
+        self.partition = partition
+        self.conns = []
+        self.used = False
+        processes = []
+        for i in range(self.shards):
+            conn, child = Pipe()
+            p = Process(target=_serve, args=(child, i, self.shards, partition), daemon=True)
+            p.start()
+            child.close()
+            self.conns.append(conn)
+            processes.append(p)
+        self.close = weakref.finalize(self, _shutdown, self.conns, processes)
+
+
+class ShardedMIS(Algorithm):
+    # SimpleMIS with the nodes partitioned over worker processes. Every shard keeps the counts and the mis of the
+    # nodes it owns and applies its part of an update in parallel with the others. Membership changes on cut
+    # edges are sent as messages to the owner of the other endpoint, delivered in rounds until no shard has
+    # anything left to send. Two nodes of different shards can join in the same round, the conflict is resolved
+    # on both sides by node_priority: the lower endpoint leaves.
+    # The coordinator keeps the graph and the global mis, assembled from the changes the shards report, and
+    # only returns from an update when the shards agree, so queries never see a conflict.
+    # Batches (apply_updates) are sent as one round and pay the round trips once, single updates are dominated
+    # by them. partition(v, shards) returns the owning shard of v, it must be picklable. With workers (see
+    # ShardWorkers) shards and partition are taken from them.
+    mis_attributes = ('_mis',)
+
+    def __init__(self, graph, shards=None, partition=shard_of, workers=None):
+        super(ShardedMIS, self).__init__(graph)
+        if workers is None:
+            workers = ShardWorkers(shards, partition)
+        elif workers.used:
+            raise ValueError('The workers are used by another ShardedMIS')
+        workers.used = True
+        self._workers = workers
+        self._shards = workers.shards
+        self._partition = workers.partition
+        self._conns = workers.conns
+        self._mis = set()
+        self.rounds = 0
+
+        events = self._events()
+        for v in self._graph.nodes:
+            events[self._owner(v)].append(('insert_node', v))
+        for u, v in self._graph.edges:
+            self._add_edge_events(events, 'insert_edge', u, v)
+        self._run(events)
+
+    def close(self):
+        # Stops the workers, the algorithm can't be updated afterwards
+        self._workers.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def shards(self):
+        return self._shards
+
+    def _owner(self, v):
+        return self._partition(v, self._shards)
+
+    def _events(self):
+        return [[] for _ in range(self._shards)]
+
+    def _add_edge_events(self, events, op, u, v):
+        owner_u, owner_v = self._owner(u), self._owner(v)
+        events[owner_u].append((op, u, v))
+        if owner_u != owner_v:
+            events[owner_v].append((op, v, u))
+
+    def _run(self, events):
+        # Delivers events and then messages in rounds until every shard is done
+        while any(events):
+            active = [i for i, inbox in enumerate(events) if inbox]
+            for i in active:
+                self._conns[i].send(events[i])
+            events = self._events()
+            for i in active:
+                outbox, changes = self._conns[i].recv()
+                for shard, messages in enumerate(outbox):
+                    events[shard].extend(messages)
+                for v, in_mis in changes:
+                    if in_mis:
+                        self._mis.add(v)
+                    else:
+                        self._mis.discard(v)
+            self.rounds += 1
+
+    def insert_edge(self, u, v):
+        assert u in self._graph and v in self._graph
+        if self._graph.has_edge(u, v):
+            return
+        self._graph.add_edge(u, v)
+        events = self._events()
+        self._add_edge_events(events, 'insert_edge', u, v)
+        self._run(events)
+
+    def remove_edge(self, u, v):
+        self._graph.remove_edge(u, v)
+        events = self._events()
+        self._add_edge_events(events, 'remove_edge', u, v)
+        self._run(events)
+
+    def _apply_edge_batch(self, inserted, removed):
+        events = self._events()
+        for u, v in removed:
+            if self._graph.has_edge(u, v):
+                self._graph.remove_edge(u, v)
+                self._add_edge_events(events, 'remove_edge', u, v)
+        for u, v in inserted:
+            assert u in self._graph and v in self._graph
+            if not self._graph.has_edge(u, v):
+                self._graph.add_edge(u, v)
+                self._add_edge_events(events, 'insert_edge', u, v)
+        self._run(events)
+
+    def insert_node(self, v, edges=[]):
+        self._graph.add_node(v)
+        filtered_edge_insert(self._graph, edges)
+        events = self._events()
+        events[self._owner(v)].append(('insert_node', v))
+        for w in self._graph[v]:
+            self._add_edge_events(events, 'insert_edge', v, w)
+        self._run(events)
+
+    def remove_node(self, v):
+        events = self._events()
+        owner = self._owner(v)
+        for w in self._graph[v]:
+            if self._owner(w) != owner:
+                events[self._owner(w)].append(('remove_edge', w, v))
+        events[owner].append(('remove_node', v))
+        self._graph.remove_node(v)
+        self._run(events)
+
+    def is_in_mis(self, node):
+        return node in self._mis
+
+    def get_mis(self):
+        return MISView(self._mis)
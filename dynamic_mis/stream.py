@@ -0,0 +1,164 @@
+import heapq
+import pickle
+import tempfile
+from collections import defaultdict
+from .updates import *
+
+__all__ = ['konect_events', 'replay']
+
+
+def _number(s):
+    try:
+        return int(s)
+    except ValueError:
+        return float(s)
+
+
+def _konect_records(text_file):
+    # (time, line, u, v, insert) for every edge line. KONECT lines are "u v [weight [time]]",
+    # a negative weight removes the edge. Lines without a time keep their position in the file.
+    with open(text_file) as f:
+        for i, line in enumerate(f):
+            items = line.split()
+            if len(items) < 2 or items[0].startswith('%'):
+                continue
+            insert = len(items) < 3 or _number(items[2]) >= 0
+            time = _number(items[3]) if len(items) > 3 else 0
+            yield time, i, items[0], items[1], insert
+
+
+def _spill(records):
+    f = tempfile.TemporaryFile()
+    for record in records:
+        pickle.dump(record, f, pickle.HIGHEST_PROTOCOL)
+    f.seek(0)
+    return f
+
+
+def _unspill(f):
+    while True:
+        try:
+            yield pickle.load(f)
+        except EOFError:
+            return
+
+
+def _sorted_by_time(records, chunk_size):
+    # External merge sort: sorted runs of chunk_size records are spilled to temporary files and merged,
+    # so at most chunk_size records are held in memory
+    runs = []
+    chunk = []
+    try:
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                chunk.sort()
+                runs.append(_spill(chunk))
+                chunk = []
+        chunk.sort()
+        if len(runs) == 0:
+            yield from chunk
+            return
+        runs.append(_spill(chunk))
+        yield from heapq.merge(*(_unspill(f) for f in runs))
+    finally:
+        for f in runs:
+            f.close()
+
+
+def konect_events(text_file, interner=None, sort=False, chunk_size=1000000):
+    # Yields (INSERT_EDGE, u, v) and (REMOVE_EDGE, u, v) updates in time order.
+    # Files that are already in time order are streamed line by line, with sort=True an external sort is done first.
+    # Labels are interned in the order of the events if an interner is given.
+    records = _konect_records(text_file)
+    if sort:
+        records = _sorted_by_time(records, chunk_size)
+
+    for _, _, u, v, insert in records:
+        if interner is not None:
+            u, v = interner.intern_edge(u, v)
+        yield INSERT_EDGE if insert else REMOVE_EDGE, u, v
+
+
+def replay(algo, events, batch_size=1, limit=None):
+    # Feeds edge events to any Algorithm and returns counts of what was applied.
+    # Endpoints that are not in the graph yet are inserted as nodes first. Events are read with multigraph
+    # semantics: an edge inserted twice stays in the graph until it was removed twice.
+    # Removals of missing edges and self loops are skipped.
+    # With batch_size > 1 the updates are handed to apply_updates in batches of that many events. The new nodes of
+    # a batch are inserted at its start: node updates split the edge runs of apply_updates, and an isolated node
+    # can be inserted before the edge that needs it.
+    graph = algo.graph()
+    counts = defaultdict(lambda: 0)
+    # Additional copies of edges that were inserted more than once
+    copies = defaultdict(lambda: 0)
+    # Edges whose presence changed in the current batch and are not applied to the graph yet
+    pending = dict()
+    # Nodes of the current batch in insertion order
+    pending_nodes = dict()
+    batch = []
+
+    def key(u, v):
+        return (u, v) if u <= v else (v, u)
+
+    def has_node(v):
+        return v in pending_nodes or graph.has_node(v)
+
+    def has_edge(u, v):
+        present = pending.get(key(u, v))
+        return graph.has_edge(u, v) if present is None else present
+
+    def flush():
+        algo.apply_updates([(INSERT_NODE, w, []) for w in pending_nodes] + batch)
+        batch.clear()
+        pending.clear()
+        pending_nodes.clear()
+
+    for i, (op, u, v) in enumerate(events):
+        if limit is not None and i >= limit:
+            break
+        counts['events'] += 1
+        if u == v:
+            counts['skipped'] += 1
+            continue
+
+        if op == INSERT_EDGE:
+            for w in (u, v):
+                if not has_node(w):
+                    counts['nodes'] += 1
+                    if batch_size > 1:
+                        pending_nodes[w] = None
+                    else:
+                        algo.insert_node(w, [])
+
+            if has_edge(u, v):
+                copies[key(u, v)] += 1
+                counts['duplicates'] += 1
+                continue
+            counts['inserted'] += 1
+        else:
+            k = key(u, v)
+            if copies.get(k, 0) > 0:
+                copies[k] -= 1
+                if copies[k] == 0:
+                    del copies[k]
+                counts['duplicates'] += 1
+                continue
+            if not has_node(u) or not has_node(v) or not has_edge(u, v):
+                counts['skipped'] += 1
+                continue
+            counts['removed'] += 1
+
+        if batch_size > 1:
+            pending[key(u, v)] = op == INSERT_EDGE
+            batch.append((op, u, v))
+            if len(batch) >= batch_size:
+                flush()
+        elif op == INSERT_EDGE:
+            algo.insert_edge(u, v)
+        else:
+            algo.remove_edge(u, v)
+
+    if len(batch) > 0 or len(pending_nodes) > 0:
+        flush()
+    return dict(counts)
@@ -0,0 +1,68 @@
+# Updates are plain tuples: (INSERT_EDGE, u, v), (REMOVE_EDGE, u, v), (INSERT_NODE, v[, edges]), (REMOVE_NODE, v)
+
+INSERT_EDGE = 'insert_edge'
+REMOVE_EDGE = 'remove_edge'
+INSERT_NODE = 'insert_node'
+REMOVE_NODE = 'remove_node'
+
+EDGE_OPS = (INSERT_EDGE, REMOVE_EDGE)
+NODE_OPS = (INSERT_NODE, REMOVE_NODE)
+
+
+class EdgeBatch:
+    # Net effect of a run of consecutive edge updates.
+    # Only the last update of an edge counts, so inserting and then removing an edge cancels out.
+
+    def __init__(self):
+        self._present = dict()
+
+    def add(self, op, u, v):
+        key = (v, u) if (v, u) in self._present else (u, v)
+        self._present[key] = op == INSERT_EDGE
+
+    def inserted(self):
+        return [e for e, present in self._present.items() if present]
+
+    def removed(self):
+        return [e for e, present in self._present.items() if not present]
+
+    def __len__(self):
+        return len(self._present)
+
+
+def coalesce(updates):
+    # Yields EdgeBatch objects for runs of edge updates and node updates unchanged.
+    # Node updates are barriers: edges before and after them are never merged.
+    batch = EdgeBatch()
+    for update in updates:
+        op = update[0]
+        if op in EDGE_OPS:
+            batch.add(op, update[1], update[2])
+        elif op in NODE_OPS:
+            if len(batch) > 0:
+                yield batch
+                batch = EdgeBatch()
+            yield update
+        else:
+            raise ValueError('Unknown update {}'.format(op))
+
+    if len(batch) > 0:
+        yield batch
+
+
+def touched_nodes(graph, updates):
+    # Nodes whose neighborhood the updates change, read before they are applied: the endpoints of edge updates,
+    # inserted nodes with the endpoints of their edges and the neighbors of removed nodes
+    nodes = []
+    for update in updates:
+        op = update[0]
+        if op == REMOVE_NODE:
+            if graph.has_node(update[1]):
+                nodes.extend(graph[update[1]])
+        elif op == INSERT_NODE:
+            nodes.append(update[1])
+            for e in (update[2] if len(update) > 2 else []):
+                nodes.extend(e)
+        else:
+            nodes.extend(update[1:])
+    return nodes
@@ -0,0 +1,148 @@
+import numpy as np
+from .algorithm import Algorithm
+from .feed import TrackedMIS
+from .interning import InternedMIS
+from .updates import INSERT_EDGE, REMOVE_EDGE, INSERT_NODE, REMOVE_NODE, touched_nodes
+from .vectorized import CSRGraph
+
+__all__ = ['VALIDATION_LEVELS', 'InvalidMISError', 'find_violations', 'ValidatedMIS']
+
+# off: no checks, local: the nodes touched by every update, full: the whole mis every interval updates
+VALIDATION_LEVELS = ('off', 'local', 'full')
+
+
+class InvalidMISError(AssertionError):
+    # nodes are the violations (full) or the nodes that were checked (local)
+
+    def __init__(self, message, nodes=()):
+        super(InvalidMISError, self).__init__(message)
+        self.nodes = nodes
+
+
+def find_violations(algorithm, csr=None):
+    # Nodes where the mis is not independent or not maximal, as a set. One vectorized O(n + m) pass over a CSR
+    # snapshot of the graph instead of the Python loops of is_valid_mis.
+    if csr is None:
+        csr = CSRGraph.from_graph(algorithm.graph())
+    in_mis = csr.mask(algorithm.get_mis())
+    src, dst = csr.sources(), csr.indices
+    # Like is_valid_mis a self loop counts as a conflict and as a mis neighbor
+    conflicts = np.zeros(len(csr), dtype=bool)
+    conflicts[src[in_mis[src] & in_mis[dst]]] = True
+    dominated = np.zeros(len(csr), dtype=bool)
+    dominated[src[in_mis[dst]]] = True
+    return csr.to_labels(conflicts | (csr.present & ~in_mis & ~dominated))
+
+
+class ValidatedMIS(Algorithm):
+    # Wraps an algorithm and checks the mis while it is updated, raising InvalidMISError on the first violation.
+    # local checks, after every update, the endpoints and the nodes whose mis membership changed together with the
+    # neighbors of the nodes that left. The changes come from a TrackedMIS (see feed.py), for algorithms without
+    # mis_attributes (e.g. other wrappers) the neighbors of the endpoints are checked instead. local also rejects
+    # edges whose endpoints are not in the graph, which the algorithms don't check.
+    # With sample=k local only checks every k-th update, the changes of the other updates are not checked.
+    # full runs find_violations every interval updates and validate() runs it on demand.
+    # An InternedMIS is checked on the algorithm it wraps: the updates are translated to ids up front and
+    # applied to that algorithm directly, queries still answer with labels.
+
+    def __init__(self, algorithm, level='local', interval=1000, sample=1):
+        if level not in VALIDATION_LEVELS:
+            raise ValueError('Unknown validation level {}, expected one of {}'.format(level, VALIDATION_LEVELS))
+        super(ValidatedMIS, self).__init__(algorithm.graph())
+        self._algorithm = algorithm
+        self._level = level
+        self._interval = interval
+        self._sample = sample
+        self._updates = 0
+        self._translate = lambda update: update
+        self._checked = algorithm
+        if isinstance(algorithm, InternedMIS):
+            self._translate = algorithm.translate
+            self._checked = algorithm.algorithm()
+        self._tracked = None
+        if level == 'local' and self._checked.mis_attributes:
+            self._tracked = TrackedMIS(self._checked)
+        self._target = self._checked if self._tracked is None else self._tracked
+        self._queried = algorithm if self._checked is not algorithm else self._target
+
+    def algorithm(self):
+        return self._algorithm
+
+    def level(self):
+        return self._level
+
+    def detach(self):
+        # Gives the algorithm its own sets back
+        if self._tracked is not None:
+            self._tracked.detach()
+        return self._algorithm
+
+    def validate(self):
+        violations = find_violations(self._checked)
+        if violations:
+            raise InvalidMISError('The mis is invalid at {} nodes'.format(len(violations)), violations)
+        return True
+
+    def _require_nodes(self, *nodes):
+        if self._level == 'local':
+            for v in nodes:
+                if not self._graph.has_node(v):
+                    raise InvalidMISError('Node {} is not in the graph'.format(v), [v])
+
+    def _updated(self, operation, nodes, delta=None, count=1):
+        self._updates += count
+        if self._level == 'local' and self._due(self._sample, count):
+            nodes = set(nodes)
+            if delta is None:
+                nodes.update([w for v in list(nodes) if v in self._graph for w in self._graph[v]])
+            else:
+                nodes.update(delta.added)
+                for v in delta.removed:
+                    nodes.add(v)
+                    if v in self._graph:
+                        nodes.update(self._graph[v])
+            if not self._checked.is_valid_at(nodes):
+                raise InvalidMISError('The mis is invalid after {}'.format(operation), nodes)
+        elif self._level == 'full' and self._due(self._interval, count):
+            self.validate()
+
+    def _due(self, every, count):
+        # Whether the last count updates reached a multiple of every
+        return self._updates // every > (self._updates - count) // every
+
+    def insert_edge(self, u, v):
+        _, u, v = self._translate((INSERT_EDGE, u, v))
+        self._require_nodes(u, v)
+        delta = self._target.insert_edge(u, v)
+        self._updated((INSERT_EDGE, u, v), [u, v], delta)
+
+    def remove_edge(self, u, v):
+        _, u, v = self._translate((REMOVE_EDGE, u, v))
+        delta = self._target.remove_edge(u, v)
+        self._updated((REMOVE_EDGE, u, v), [u, v], delta)
+
+    def insert_node(self, v, edges=[]):
+        _, v, edges = self._translate((INSERT_NODE, v, list(edges)))
+        delta = self._target.insert_node(v, edges)
+        self._updated((INSERT_NODE, v), [v] + [w for e in edges for w in e], delta)
+
+    def remove_node(self, v):
+        _, v = self._translate((REMOVE_NODE, v))
+        neighbors = list(self._graph[v]) if self._level == 'local' else []
+        delta = self._target.remove_node(v)
+        self._updated((REMOVE_NODE, v), neighbors, delta)
+
+    def apply_updates(self, updates):
+        updates = [self._translate(update) for update in updates]
+        nodes = touched_nodes(self._graph, updates) if self._level == 'local' else []
+        delta = self._target.apply_updates(updates)
+        self._updated('apply_updates', nodes, delta, len(updates))
+
+    def is_in_mis(self, node):
+        return self._queried.is_in_mis(node)
+
+    def get_mis(self):
+        return self._queried.get_mis()
+
+    def is_valid_mis(self):
+        return self._algorithm.is_valid_mis()
@@ -0,0 +1,121 @@
+import numpy as np
+from .graph import AdjacencyGraph
+
+__all__ = ['CSRGraph', 'luby_mis']
+
+
+class CSRGraph:
+    # Read-only compressed sparse row snapshot of a graph.
+    # Node i of the snapshot is labels[i], its neighbors are indices[indptr[i]:indptr[i + 1]].
+    # For an AdjacencyGraph the positions are the node ids themselves and removed ids are absent.
+
+    def __init__(self, labels, indptr, indices, present=None):
+        self.labels = labels
+        self.indptr = indptr
+        self.indices = indices
+        self.present = np.ones(len(labels), dtype=bool) if present is None else present
+
+    @staticmethod
+    def from_graph(graph):
+        if isinstance(graph, AdjacencyGraph):
+            return CSRGraph._from_adjacency(graph)
+
+        labels = list(graph.nodes)
+        index = {v: i for i, v in enumerate(labels)}
+        degrees = np.fromiter((len(graph[v]) for v in labels), dtype=np.int64, count=len(labels))
+        indptr = np.zeros(len(labels) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        indices = np.fromiter((index[w] for v in labels for w in graph[v]), dtype=np.int64, count=indptr[-1])
+        return CSRGraph(labels, indptr, indices)
+
+    @staticmethod
+    def _from_adjacency(graph):
+        adj = graph._adj
+        empty = b''
+        parts = [empty if neighbors is None else neighbors for neighbors in adj]
+        degrees = np.fromiter(map(len, parts), dtype=np.int64, count=len(parts))
+        indptr = np.zeros(len(parts) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        # The neighbor arrays support the buffer protocol, so they are joined without a Python level loop
+        indices = np.frombuffer(b''.join(parts), dtype=np.intc).astype(np.int64)
+        present = np.fromiter((neighbors is not None for neighbors in adj), dtype=bool, count=len(adj))
+        return CSRGraph(range(len(adj)), indptr, indices, present)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def sources(self):
+        # Source position of every entry in indices
+        return np.repeat(np.arange(len(self), dtype=np.int64), self.degrees())
+
+    def mask(self, nodes=None, candidate_filter=None):
+        # Boolean mask of the positions that are present, in nodes and accepted by the filter
+        if nodes is None:
+            mask = self.present.copy()
+        else:
+            mask = np.zeros(len(self), dtype=bool)
+            positions = self.positions(nodes)
+            mask[positions] = self.present[positions]
+
+        if candidate_filter is not None:
+            idx = np.flatnonzero(mask)
+            labels = self.labels
+            mask[idx] = np.fromiter((candidate_filter(labels[i]) for i in idx.tolist()), dtype=bool, count=len(idx))
+        return mask
+
+    def positions(self, nodes):
+        if isinstance(self.labels, range):
+            return np.fromiter(nodes, dtype=np.int64)
+        index = {v: i for i, v in enumerate(self.labels)}
+        return np.fromiter((index[v] for v in nodes), dtype=np.int64)
+
+    def to_labels(self, mask):
+        positions = np.flatnonzero(mask).tolist()
+        if isinstance(self.labels, range):
+            return set(positions)
+        return {self.labels[i] for i in positions}
+
+
+def luby_rounds(src, dst, rank, active):
+    # Luby's algorithm with fixed priorities: in every round all active nodes whose rank is lower than
+    # the rank of all their active neighbors join, and they and their neighbors are deactivated.
+    # With fixed priorities the result is the same as the sequential greedy scan in rank order.
+    n = len(rank)
+    in_mis = np.zeros(n, dtype=bool)
+    active = active.copy()
+    # Self loops would block their node forever
+    keep = active[src] & active[dst] & (src != dst)
+    src, dst = src[keep], dst[keep]
+
+    while active.any():
+        neighbor_min = np.full(n, n, dtype=rank.dtype)
+        if len(src) > 0:
+            # src is sorted, so every run of equal sources is the active neighborhood of one node
+            starts = np.flatnonzero(np.concatenate(([True], src[1:] != src[:-1])))
+            neighbor_min[src[starts]] = np.minimum.reduceat(rank[dst], starts)
+
+        selected = active & (rank < neighbor_min)
+        in_mis |= selected
+
+        deactivated = selected.copy()
+        deactivated[dst[selected[src]]] = True
+        active &= ~deactivated
+
+        keep = active[src] & active[dst]
+        src, dst = src[keep], dst[keep]
+
+    return in_mis
+
+
+def luby_mis(graph, candidate_filter=None, nodes=None, seed=0, csr=None):
+    # Drop-in replacement for TrivialMIS.compute that works on a CSR snapshot with array operations
+    if csr is None:
+        csr = CSRGraph.from_graph(graph)
+
+    rank = np.random.RandomState(seed).permutation(len(csr))
+    active = csr.mask(nodes, candidate_filter)
+    in_mis = luby_rounds(csr.sources(), csr.indices, rank, active)
+    return csr.to_labels(in_mis)
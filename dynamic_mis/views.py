@@ -0,0 +1,82 @@
+from collections.abc import Set
+from itertools import chain
+
+__all__ = ['MISView', 'QueryView', 'LabelledView']
+
+# get_mis() returns a read-only view on the state of the algorithm instead of a copy. Views are live: they
+# follow later updates and must not be iterated while the algorithm is updated. snapshot() copies the current
+# mis into a frozenset. Set operations like view | other return frozensets.
+
+
+class _View(Set):
+
+    @classmethod
+    def _from_iterable(cls, it):
+        return frozenset(it)
+
+    def snapshot(self):
+        return frozenset(self)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, set(self))
+
+
+class MISView(_View):
+    # Union of the disjoint sets that hold the mis, without copying them
+
+    def __init__(self, *sets):
+        self._sets = sets
+
+    def __contains__(self, v):
+        for s in self._sets:
+            if v in s:
+                return True
+        return False
+
+    def __iter__(self):
+        return chain.from_iterable(self._sets)
+
+    def __len__(self):
+        return sum(len(s) for s in self._sets)
+
+    def snapshot(self):
+        if not self._sets:
+            return frozenset()
+        return frozenset(self._sets[0]).union(*self._sets[1:])
+
+
+class QueryView(_View):
+    # Mis of an algorithm that decides membership on query, like ImplicitMIS.
+    # Membership costs one is_in_mis call, iteration and len query every node of the graph.
+
+    def __init__(self, algorithm):
+        self._algorithm = algorithm
+
+    def __contains__(self, v):
+        return self._algorithm.graph().has_node(v) and self._algorithm.is_in_mis(v)
+
+    def __iter__(self):
+        is_in_mis = self._algorithm.is_in_mis
+        return (v for v in self._algorithm.graph().nodes if is_in_mis(v))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class LabelledView(_View):
+    # Translates a view on interned ids back to the labels of a NodeInterner
+
+    def __init__(self, view, interner):
+        self._view = view
+        self._interner = interner
+
+    def __contains__(self, label):
+        i = self._interner.get(label)
+        return i is not None and i in self._view
+
+    def __iter__(self):
+        labels = self._interner.labels()
+        return (labels[i] for i in self._view)
+
+    def __len__(self):
+        return len(self._view)
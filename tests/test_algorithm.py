@@ -72,6 +72,9 @@ class TestTrivialMIS(unittest.TestCase):
     def test_insert_edges(self):
         _test_insert_edges(self, TrivialMIS)
 
+    def test_apply_updates(self):
+        _test_apply_updates(self, TrivialMIS)
+
 
 class TestSimpleMIS(unittest.TestCase):
 
@@ -92,6 +95,9 @@ class TestSimpleMIS(unittest.TestCase):
     def test_insert_edges(self):
         _test_insert_edges(self, SimpleMIS)
 
+    def test_apply_updates(self):
+        _test_apply_updates(self, SimpleMIS)
+
 
 class TestImprovedIncrementalMIS(unittest.TestCase):
 
@@ -106,6 +112,43 @@ class TestImprovedIncrementalMIS(unittest.TestCase):
     def test_insert_edges(self):
         _test_insert_edges(self, ImprovedIncrementalMIS)
 
+    def test_apply_updates(self):
+        _test_apply_updates(self, ImprovedIncrementalMIS, removals=False)
+
+
+class TestDegreeAwareMIS(unittest.TestCase):
+
+    def test_valid(self):
+        g = nx.gnp_random_graph(20, 0.3, seed=1234)
+        self.assertTrue(DegreeAwareMIS(g).is_valid_mis())
+
+    def test_remove_nodes(self):
+        _test_remove_nodes(self, DegreeAwareMIS)
+
+    def test_remove_edges(self):
+        _test_remove_edges(self, DegreeAwareMIS)
+
+    def test_insert_nodes(self):
+        _test_insert_nodes(self, DegreeAwareMIS)
+
+    def test_insert_edges(self):
+        _test_insert_edges(self, DegreeAwareMIS)
+
+    def test_apply_updates(self):
+        _test_apply_updates(self, DegreeAwareMIS)
+
+    def test_low_degree_reentry(self):
+        # Removing 0 frees 1 and 2. Node 2 comes first in the adjacency of 0 but has the higher degree,
+        # so 1 joins and keeps 2 out.
+        g = nx.Graph([(0, 2), (0, 1), (1, 2), (3, 6), (4, 7), (5, 8), (2, 6), (2, 7), (2, 8)])
+        for cls, joined in [(SimpleMIS, 2), (DegreeAwareMIS, 1)]:
+            algo = cls(g.copy())
+            self.assertEqual(algo.get_mis(), {0, 3, 4, 5})
+            algo.remove_node(0)
+            self.assertIn(joined, algo.get_mis())
+            self.assertTrue(algo.is_valid_mis())
+            self.assertTrue(algo._valid_count())
+
 
 class TestImprovedDynamicMIS(unittest.TestCase):
 
@@ -126,6 +169,50 @@ class TestImprovedDynamicMIS(unittest.TestCase):
     def test_insert_edges(self):
         _test_insert_edges(self, ImprovedDynamicMIS)
 
+    def test_apply_updates(self):
+        _test_apply_updates(self, ImprovedDynamicMIS)
+
+    def test_heavy_nodes(self):
+        algo = ImprovedDynamicMIS(_hub_graph(seed=0))
+        self.assertTrue(len(algo._heavy_nodes) > 0)
+        self.assertTrue(len(algo._heavy_mis) > 0)
+        self.assertTrue(algo.is_valid_mis())
+
+    def test_hub_updates(self):
+        _test_hub_updates(self, ImprovedDynamicMIS)
+
+    def test_missing_endpoint(self):
+        # The unwrapped algorithm rejects edges to missing nodes instead of adding them without bookkeeping
+        g = nx.path_graph(4)
+        algo = ImprovedDynamicMIS(g)
+        self.assertRaises(KeyError, algo.insert_edge, 0, 42)
+        self.assertRaises(KeyError, algo.apply_updates, [(INSERT_EDGE, 1, 42)])
+        self.assertNotIn(42, g)
+        self.assertTrue(algo.is_valid_mis())
+
+    def test_insert_node_edge_count(self):
+        g = nx.path_graph(4)
+        algo = ImprovedDynamicMIS(g)
+        # The edge to a missing node is dropped
+        algo.insert_node(10, [(10, 0), (10, 3), (10, 42)])
+        self.assertEqual(algo._edge_count, g.number_of_edges())
+        self.assertEqual(filtered_edge_insert(g, [(0, 1), (1, 3), (1, 42)]), 1)
+
+    def test_phase_reclassification(self):
+        # Heavy nodes stay exact when a phase change only reclassifies the nodes between the thresholds
+        for backend in [nx.Graph, AdjacencyGraph]:
+            graph = backend()
+            graph.add_nodes_from(range(150))
+            algo = ImprovedDynamicMIS(graph)
+            updates = list(phase_oscillation(150, 300, cycles=2, seed=2))
+            for i, (op, u, v) in enumerate(updates):
+                getattr(algo, op)(u, v)
+                if i % 100 == 0 or i == len(updates) - 1:
+                    graph = algo.graph()
+                    self.assertEqual({v: algo._degrees[v] for v in graph}, dict(graph.degree))
+                    self.assertEqual(algo._heavy_nodes, {v for v, d in graph.degree if d >= algo._delta_c})
+            self.assertTrue(algo.is_valid_mis())
+
 
 class TestImplicitMIS(unittest.TestCase):
 
@@ -140,10 +227,176 @@ class TestImplicitMIS(unittest.TestCase):
     def test_remove_edges(self):
         _test_remove_edges(self, ImplicitMIS)
 
+    def test_remove_nodes(self):
+        _test_remove_nodes(self, ImplicitMIS)
+
+    def test_insert_nodes(self):
+        _test_insert_nodes(self, ImplicitMIS)
+
+    def test_apply_updates(self):
+        _test_apply_updates(self, ImplicitMIS)
+
+    def test_node_churn(self):
+        # Heavy counts and the edge count stay exact when heavy nodes and independent set nodes are removed
+        g = nx.barabasi_albert_graph(120, 4, seed=5)
+        algo = ImplicitMIS(g)
+        rnd = np.random.RandomState(5)
+        for i in range(60):
+            algo.get_mis().snapshot()
+            v = int(rnd.choice(list(g.nodes)))
+            edges = [(v, w) for w in g[v]]
+            algo.remove_node(v)
+            self.assertTrue(algo.is_valid_mis())
+            if i % 2 == 0:
+                algo.insert_node(v, edges)
+            self.assertEqual(algo._edge_count, g.number_of_edges())
+            for w in g.nodes:
+                if algo.is_heavy(w):
+                    self.assertEqual(algo._count[w], algo._calculate_count(w))
+        self.assertTrue(algo.is_valid_mis())
+
+    def test_almost_heavy_counts(self):
+        # Precomputed counts stay exact when a node turns heavy, new_phase copies them into _count
+        for seed in range(40):
+            rnd = np.random.RandomState(seed)
+            algo = ImplicitMIS(nx.empty_graph(12))
+            g = algo.graph()
+            for i in range(120):
+                u, v = rnd.randint(12, size=2).tolist()
+                if u == v:
+                    continue
+                update = (REMOVE_EDGE if g.has_edge(u, v) else INSERT_EDGE, u, v)
+                if i % 2 == 0:
+                    algo.apply_updates([update])
+                else:
+                    getattr(algo, update[0])(u, v)
+                if i % 3 == 0:
+                    algo.is_in_mis(int(rnd.randint(12)))
+                for w, c in algo._almost_heavy_count.items():
+                    self.assertEqual(c, algo._calculate_count(w))
+                for w in list(algo._count):
+                    self.assertEqual(algo._count[w], algo._calculate_count(w))
+            self.assertTrue(algo.is_valid_mis())
+
+    def test_phase_counts(self):
+        # Counts of heavy nodes stay exact when phases change the threshold in both directions
+        algo = ImplicitMIS(nx.Graph())
+        for i, (op, u, v) in enumerate(phase_oscillation(200, 400, cycles=3, seed=1)):
+            getattr(algo, op)(u, v)
+            if i % 50 == 0:
+                algo.get_mis().snapshot()
+        for v, d in algo.graph().degree:
+            self.assertEqual(algo._degrees[v], d)
+            if algo.is_heavy(v):
+                self.assertEqual(algo._count[v], algo._calculate_count(v))
+        self.assertTrue(all(algo.is_heavy(v) for v in algo._count))
+        self.assertEqual(algo.almost_heavy_nodes(), set(filter(algo.is_almost_heavy, algo.graph().nodes)))
+        self.assertTrue(algo.is_valid_mis())
+
+
+class TestRandomPriorityMIS(unittest.TestCase):
+
+    def test_valid(self):
+        g = nx.gnp_random_graph(20, 0.3, seed=1234)
+        self.assertTrue(RandomPriorityMIS(g).is_valid_mis())
 
-def _test_remove_nodes(test: unittest.TestCase, cls: Type[Algorithm]):
-    g = nx.gnp_random_graph(20, 0.3, seed=42)
-    removal_order = np.random.RandomState(seed=42).permutation(g.nodes)
+    def test_remove_nodes(self):
+        _test_remove_nodes(self, RandomPriorityMIS)
+
+    def test_remove_edges(self):
+        _test_remove_edges(self, RandomPriorityMIS)
+
+    def test_insert_nodes(self):
+        _test_insert_nodes(self, RandomPriorityMIS)
+
+    def test_insert_edges(self):
+        _test_insert_edges(self, RandomPriorityMIS)
+
+    def test_apply_updates(self):
+        _test_apply_updates(self, RandomPriorityMIS)
+
+    def test_lexicographically_first(self):
+        # After any sequence of updates the mis is the greedy mis in rank order of the current graph
+        g = nx.gnp_random_graph(60, 0.1, seed=7)
+        algo = RandomPriorityMIS(g, seed=3)
+        rnd = np.random.RandomState(7)
+        for i in range(150):
+            u, v = rnd.randint(60, size=2).tolist()
+            if u == v:
+                continue
+            if g.has_edge(u, v):
+                algo.remove_edge(u, v)
+            else:
+                algo.insert_edge(u, v)
+            if i % 10 == 0:
+                order = sorted(g.nodes, key=lambda w: random_rank(w, 3))
+                self.assertEqual(algo.get_mis(), TrivialMIS.compute(g, nodes=order))
+                self.assertTrue(all(algo._count[w] == sum(1 for x in g[w] if x in algo.get_mis()
+                                                          and random_rank(x, 3) < random_rank(w, 3))
+                                    for w in g.nodes))
+
+    def test_history_independent(self):
+        g = nx.gnp_random_graph(40, 0.15, seed=8)
+        algo = RandomPriorityMIS(nx.Graph(), seed=5)
+        for v in np.random.RandomState(8).permutation(40).tolist():
+            algo.insert_node(v, [(v, w) for w in g[v]])
+        self.assertEqual(algo.get_mis(), RandomPriorityMIS(g.copy(), seed=5).get_mis())
+        self.assertNotEqual(algo.get_mis(), RandomPriorityMIS(g.copy(), seed=6).get_mis())
+
+    def test_ranks(self):
+        self.assertEqual(len({random_rank(v) for v in range(10000)}), 10000)
+        self.assertEqual(random_rank('a', 1), random_rank('a', 1))
+        self.assertNotEqual(random_rank(1, 0), random_rank(1, 1))
+
+
+class TestCoalesce(unittest.TestCase):
+
+    def test_redundant_updates_cancel(self):
+        updates = [(INSERT_EDGE, 1, 2), (REMOVE_EDGE, 2, 1), (INSERT_EDGE, 3, 4),
+                   (REMOVE_NODE, 5), (REMOVE_EDGE, 3, 4), (INSERT_EDGE, 4, 3)]
+        batches = list(coalesce(updates))
+
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(batches[0].inserted(), [(3, 4)])
+        self.assertEqual(batches[0].removed(), [(1, 2)])
+        self.assertEqual(batches[1], (REMOVE_NODE, 5))
+        self.assertEqual(batches[2].inserted(), [(3, 4)])
+
+    def test_unknown_update(self):
+        self.assertRaises(ValueError, list, coalesce([('flip_edge', 1, 2)]))
+
+
+class TestAdjacencyBackend(unittest.TestCase):
+
+    def test_valid(self):
+        for cls in [TrivialMIS, SimpleMIS, ImprovedDynamicMIS, ImplicitMIS]:
+            g = AdjacencyGraph(nx.gnp_random_graph(20, 0.3, seed=1234))
+            self.assertTrue(cls(g).is_valid_mis())
+
+    def test_remove_nodes(self):
+        for cls in [TrivialMIS, SimpleMIS, DegreeAwareMIS, ImprovedDynamicMIS, ImplicitMIS, RandomPriorityMIS]:
+            _test_remove_nodes(self, cls, AdjacencyGraph)
+
+    def test_remove_edges(self):
+        for cls in [TrivialMIS, SimpleMIS, DegreeAwareMIS, ImprovedDynamicMIS, ImplicitMIS, RandomPriorityMIS]:
+            _test_remove_edges(self, cls, AdjacencyGraph)
+
+    def test_insert_nodes(self):
+        for cls in [TrivialMIS, SimpleMIS, ImprovedDynamicMIS, ImplicitMIS, RandomPriorityMIS]:
+            _test_insert_nodes(self, cls, AdjacencyGraph)
+
+    def test_insert_edges(self):
+        for cls in [TrivialMIS, SimpleMIS, ImprovedIncrementalMIS, ImprovedDynamicMIS, ImplicitMIS]:
+            _test_insert_edges(self, cls, AdjacencyGraph)
+
+
+def _as_networkx(g):
+    return g if isinstance(g, nx.Graph) else g.to_networkx()
+
+
+def _test_remove_nodes(test: unittest.TestCase, cls: Type[Algorithm], backend=nx.Graph):
+    g = backend(nx.gnp_random_graph(20, 0.3, seed=42))
+    removal_order = np.random.RandomState(seed=42).permutation(list(g.nodes))
     algo = cls(g)
 
     test.assertTrue(algo.is_valid_mis())
@@ -156,9 +409,9 @@ def _test_remove_nodes(test: unittest.TestCase, cls: Type[Algorithm]):
         test.assertTrue(valid)
 
 
-def _test_remove_edges(test: unittest.TestCase, cls: Type[Algorithm]):
-    g = nx.gnp_random_graph(20, 0.3, seed=42)
-    removal_order = np.random.RandomState(seed=42).permutation(g.edges)
+def _test_remove_edges(test: unittest.TestCase, cls: Type[Algorithm], backend=nx.Graph):
+    g = backend(nx.gnp_random_graph(20, 0.3, seed=42))
+    removal_order = np.random.RandomState(seed=42).permutation(list(g.edges))
     algo = cls(g)
 
     test.assertTrue(algo.is_valid_mis())
@@ -169,10 +422,10 @@ def _test_remove_edges(test: unittest.TestCase, cls: Type[Algorithm]):
         test.assertTrue(algo.is_valid_mis())
 
 
-def _test_insert_edges(test: unittest.TestCase, cls: Type[Algorithm]):
-    g = nx.gnp_random_graph(20, 0.3, seed=42)
-    g_original = g.copy()
-    insert_order = np.random.RandomState(seed=42).permutation(g.edges)
+def _test_insert_edges(test: unittest.TestCase, cls: Type[Algorithm], backend=nx.Graph):
+    g = backend(nx.gnp_random_graph(20, 0.3, seed=42))
+    g_original = _as_networkx(g).copy()
+    insert_order = np.random.RandomState(seed=42).permutation(list(g.edges))
 
     g.remove_edges_from(g.edges)
 
@@ -182,13 +435,78 @@ def _test_insert_edges(test: unittest.TestCase, cls: Type[Algorithm]):
         valid = algo.is_valid_mis()
         test.assertTrue(valid)
 
-    test.assertTrue(iso.is_isomorphic(g, g_original))
+    test.assertTrue(iso.is_isomorphic(_as_networkx(g), g_original))
+
+
+def _hub_graph(seed, n=60, hubs=3, guards=10, leaves=30):
+    # A few hubs on top of a sparse random graph. The hubs are close to the heavy threshold of
+    # ImprovedDynamicMIS, so updates move them between heavy and light. Every leaf hangs off a
+    # guard node with a lower id, which keeps the leaves out of the light mis and the hubs free.
+    rnd = np.random.RandomState(seed)
+    g = nx.gnp_random_graph(n, 0.01, seed=seed)
+    for w in range(hubs + guards, n):
+        g.add_edge(w, hubs + w % guards)
+    for h in range(hubs):
+        for w in rnd.choice(np.arange(hubs + guards, n), size=leaves, replace=False):
+            g.add_edge(h, int(w))
+        if h % 2 == 1:
+            g.add_edge(h, h - 1)
+    return g
+
+
+def _test_hub_updates(test: unittest.TestCase, cls: Type[Algorithm], backend=nx.Graph):
+    rnd = np.random.RandomState(seed=42)
+    for seed in range(5):
+        g = backend(_hub_graph(seed))
+        algo = cls(g)
+        for _ in range(100):
+            # Half of the updates touch a hub
+            u = int(rnd.randint(0, 4)) if rnd.rand() < 0.5 else int(rnd.randint(0, 60))
+            v = int(rnd.randint(0, 60))
+            if u == v:
+                continue
+            if u not in g:
+                algo.insert_node(u, [(u, int(w)) for w in rnd.choice(60, size=5) if int(w) in g and int(w) != u])
+            elif rnd.rand() < 0.05:
+                algo.remove_node(u)
+            elif v not in g:
+                continue
+            elif g.has_edge(u, v):
+                algo.remove_edge(u, v)
+            else:
+                algo.insert_edge(u, v)
+            test.assertTrue(algo.is_valid_mis())
+
+
+def _test_apply_updates(test: unittest.TestCase, cls: Type[Algorithm], backend=nx.Graph, removals=True):
+    g = backend(nx.gnp_random_graph(30, 0.2, seed=42))
+    reference = _as_networkx(g).copy()
+    if not removals:
+        g.remove_edges_from(list(g.edges))
+        reference.remove_edges_from(list(reference.edges))
+    rnd = np.random.RandomState(seed=42)
+
+    algo = cls(g)
+    for _ in range(20):
+        batch = []
+        for _ in range(rnd.randint(1, 40)):
+            u, v = (int(x) for x in rnd.choice(30, size=2, replace=False))
+            if removals and reference.has_edge(u, v):
+                batch.append((REMOVE_EDGE, u, v))
+                reference.remove_edge(u, v)
+            else:
+                batch.append((INSERT_EDGE, u, v))
+                reference.add_edge(u, v)
+
+        algo.apply_updates(batch)
+        test.assertTrue(algo.is_valid_mis())
+        test.assertEqual({frozenset(e) for e in g.edges}, {frozenset(e) for e in reference.edges})
 
 
-def _test_insert_nodes(test: unittest.TestCase, cls: Type[Algorithm]):
-    g = nx.gnp_random_graph(20, 0.3, seed=42)
-    g_original = g.copy()
-    insert_order = np.random.RandomState(seed=42).permutation(g.nodes)
+def _test_insert_nodes(test: unittest.TestCase, cls: Type[Algorithm], backend=nx.Graph):
+    g = backend(nx.gnp_random_graph(20, 0.3, seed=42))
+    g_original = _as_networkx(g).copy()
+    insert_order = np.random.RandomState(seed=42).permutation(list(g.nodes))
 
     edges = dict()
     for v in g.nodes:
@@ -201,7 +519,7 @@ def _test_insert_nodes(test: unittest.TestCase, cls: Type[Algorithm]):
         valid = algo.is_valid_mis()
         test.assertTrue(valid)
 
-    test.assertTrue(iso.is_isomorphic(g, g_original))
+    test.assertTrue(iso.is_isomorphic(_as_networkx(g), g_original))
 
 
 if __name__ == '__main__':
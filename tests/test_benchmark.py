@@ -0,0 +1,139 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+import unittest
+from functools import partial
+import networkx as nx
+
+from dynamic_mis import benchmark
+
+
+class TestBenchmarkCLI(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.dir.name, 'youtube-u-growth'))
+        g = nx.gnp_random_graph(40, 0.1, seed=1)
+        with open(os.path.join(self.dir.name, benchmark.DATASETS['youtube']), 'w') as f:
+            for t, (u, v) in enumerate(g.edges):
+                f.write('{} {} 1 {}\n'.format(u, v, t))
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _main(self, *args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return benchmark.main([self.dir.name, '-d', 'youtube', '-r', '3', '-w', '1'] + list(args))
+
+    def test_json(self):
+        output = os.path.join(self.dir.name, 'results.json')
+        self._main('-a', 'simple', 'incremental', '-o', 'init', 'insert', 'delete', 'stream', '--removals', '5',
+                   '--output', output)
+        with open(output) as f:
+            data = json.load(f)
+
+        self.assertEqual(data['environment']['cpu_count'], os.cpu_count())
+        results = data['results']
+        self.assertEqual(len(results), 2 * 4 * 2)
+        unsupported = {(r['algorithm'], r['operation']) for r in results if r['status'] == 'unsupported'}
+        self.assertEqual(unsupported, {('incremental', 'delete'), ('incremental', 'stream')})
+        for r in results:
+            if r['status'] == 'ok':
+                self.assertEqual(len(r['times']), 3)
+                self.assertLessEqual(r['min'], r['median'])
+
+    def test_csv(self):
+        output = os.path.join(self.dir.name, 'results.csv')
+        results = self._main('-a', 'simple', '-o', 'init', '-b', 'adjacency', '--output', output)
+        with open(output) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['algorithm'], 'simple')
+        self.assertEqual(float(rows[0]['median']), results[0]['median'])
+        self.assertIn('python', rows[0])
+
+    def test_memory(self):
+        output = os.path.join(self.dir.name, 'results.json')
+        self._main('-a', 'trivial', 'simple', 'dynamic', 'implicit', '-o', 'init', 'stream', '-b', 'adjacency',
+                   '--memory', '--output', output)
+        with open(output) as f:
+            results = json.load(f)['results']
+        self.assertEqual(len(results), 8)
+        for r in results:
+            memory = r['memory']
+            self.assertGreater(memory['steady'], 0)
+            self.assertGreaterEqual(memory['peak'], memory['steady'])
+            self.assertGreater(memory['graph'], 0)
+            self.assertGreater(memory['max_rss'], 0)
+        init = {r['algorithm']: r['memory']['steady'] for r in results if r['operation'] == 'init'}
+        # ImprovedDynamicMIS keeps two counters, a degree index and more sets than SimpleMIS
+        self.assertGreater(init['dynamic'], init['simple'])
+
+    def test_memory_delete(self):
+        # delete builds the algorithm in the untimed setup, its state still has to be measured
+        results = self._main('-a', 'simple', 'dynamic', '-o', 'init', 'delete', '-b', 'adjacency', '--removals', '5',
+                             '--memory')
+        steady = {(r['operation'], r['algorithm']): r['memory']['steady'] for r in results}
+        for algo in ['simple', 'dynamic']:
+            self.assertGreater(steady['delete', algo], steady['init', algo] / 2)
+
+    def test_churn(self):
+        output = os.path.join(self.dir.name, 'results.csv')
+        results = self._main('-a', 'simple', 'random', '-o', 'init', 'stream', '-b', 'adjacency', '--churn',
+                             '--output', output)
+        stream = [r for r in results if r['operation'] == 'stream']
+        self.assertEqual(len(stream), 2)
+        for r in stream:
+            # One record per update of the 3 timed runs, the warmup run is dropped
+            self.assertEqual(r['churn']['count'] % 3, 0)
+            self.assertGreater(r['churn']['count'], 0)
+            self.assertGreaterEqual(r['churn']['max'], r['churn']['p50'])
+        self.assertTrue(all('churn' not in r for r in results if r['operation'] == 'init'))
+        with open(output) as f:
+            rows = [row for row in csv.DictReader(f) if row['operation'] == 'stream']
+        self.assertEqual(json.loads(rows[1]['churn']), stream[1]['churn'])
+
+    def test_sharded_scaling(self):
+        output = os.path.join(self.dir.name, 'results.csv')
+        results = self._main('-a', 'sharded', '-o', 'init', 'stream', '-b', 'adjacency', '--shards', '1', '2',
+                             '2', '--batch-size', '50', '--output', output)
+        self.assertEqual([(r['operation'], r['shards']) for r in results],
+                         [('init', 1), ('init', 2), ('stream', 1), ('stream', 2)])
+        for r in results:
+            self.assertEqual(r['status'], 'ok')
+            self.assertGreater(r['speedup'], 0)
+        self.assertEqual(results[0]['speedup'], 1.0)
+        with open(output) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row['shards'] for row in rows], ['1', '2', '1', '2'])
+
+    def test_sharded_workers_are_spawned_in_setup(self):
+        prespawned = benchmark._PrespawnedShards(2)
+        setup = partial(benchmark._spawned_setup, prespawned, lambda: nx.path_graph(10))
+        graph = setup()
+        workers = prespawned._workers
+        with prespawned(graph) as algo:
+            self.assertIs(algo._workers, workers)
+            self.assertTrue(algo.is_valid_mis())
+        self.assertIsNone(prespawned._workers)
+
+    def test_warmup_is_not_recorded(self):
+        histogram = benchmark.LatencyHistogram()
+        benchmark.measure(lambda: None, lambda state: histogram.record(1), runs=3, warmup=2, reset=histogram.clear)
+        self.assertEqual(histogram.count, 3)
+        results = self._main('-a', 'simple', '-o', 'stream', '-b', 'adjacency', '--latency', '--batch-size', '1000')
+        self.assertEqual(results[0]['latency']['apply_updates']['count'], 3)
+
+    def test_rss_sampler(self):
+        with benchmark.RSSSampler(interval=0.001) as sampler:
+            data = bytearray(32 * 2 ** 20)
+            data[::4096] = b'x' * len(data[::4096])
+        if sampler.start_rss is not None:
+            self.assertGreaterEqual(sampler.peak - sampler.start_rss, 16 * 2 ** 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import *
+
+
+def random_updates(graph, count, seed=0):
+    # Toggles random edges of a copy of graph
+    graph = graph.copy()
+    rnd = np.random.RandomState(seed)
+    nodes = list(graph.nodes)
+    updates = []
+    for _ in range(count):
+        u, v = rnd.choice(nodes, size=2, replace=False).tolist()
+        if graph.has_edge(u, v):
+            graph.remove_edge(u, v)
+            updates.append((REMOVE_EDGE, u, v))
+        else:
+            graph.add_edge(u, v)
+            updates.append((INSERT_EDGE, u, v))
+    return updates
+
+
+class TestTrackedSet(unittest.TestCase):
+
+    def test_net_changes(self):
+        algo = TrackedMIS(SimpleMIS(nx.Graph()))
+        s = TrackedSet([1, 2], algo)
+        s.add(3)
+        s.remove(1)
+        s.add(1)
+        s.discard(2)
+        s.update([4, 5])
+        s.difference_update([5])
+        self.assertEqual(algo._publish(), MISDelta({3, 4}, {2}))
+        self.assertEqual(s, {1, 3, 4})
+        self.assertIs(type(set(s)), set)
+
+
+class TestTrackedMIS(unittest.TestCase):
+
+    def follow(self, cls, updates, **kwargs):
+        graph = nx.gnm_random_graph(60, 120, seed=1)
+        algo = TrackedMIS(cls(graph, **kwargs))
+        mis = set(algo.get_mis())
+        published = []
+        algo.subscribe(published.append)
+
+        for op, u, v in updates(graph):
+            before = set(algo.get_mis())
+            delta = getattr(algo, op)(u, v)
+            after = set(algo.get_mis())
+            self.assertEqual(delta.added, after - before)
+            self.assertEqual(delta.removed, before - after)
+            mis = (mis - delta.removed) | delta.added
+            self.assertEqual(mis, after)
+        self.assertTrue(algo.is_valid_mis())
+        self.assertTrue(all(delta.added or delta.removed for delta in published))
+        return algo
+
+    def test_algorithms(self):
+        for cls in [TrivialMIS, SimpleMIS, ImprovedDynamicMIS]:
+            with self.subTest(cls=cls.__name__):
+                self.follow(cls, lambda g: random_updates(g, 300))
+        insertions = lambda g: [update for update in random_updates(g, 300) if update[0] == INSERT_EDGE]
+        self.follow(ImprovedIncrementalMIS, insertions)
+
+    def test_batches(self):
+        graph = nx.gnm_random_graph(60, 120, seed=2)
+        algo = TrackedMIS(ImprovedDynamicMIS(graph))
+        mis = set(algo.get_mis())
+        for i in range(10):
+            updates = random_updates(graph, 20, seed=i)
+            delta = algo.apply_updates(updates)
+            mis = (mis - delta.removed) | delta.added
+            self.assertEqual(mis, set(algo.get_mis()))
+
+    def test_node_updates(self):
+        graph = nx.gnm_random_graph(30, 60, seed=3)
+        algo = TrackedMIS(SimpleMIS(graph))
+        mis = set(algo.get_mis())
+        for v in list(graph.nodes)[:10]:
+            delta = algo.remove_node(v)
+            mis = (mis - delta.removed) | delta.added
+        delta = algo.insert_node(100, [(100, w) for w in list(graph.nodes)[:5]])
+        mis = (mis - delta.removed) | delta.added
+        self.assertEqual(mis, set(algo.get_mis()))
+
+    def test_lazy_joins_are_published(self):
+        graph = nx.gnm_random_graph(40, 80, seed=4)
+        algo = TrackedMIS(ImplicitMIS(graph))
+        published = []
+        algo.subscribe(published.append)
+        mis = set(algo.get_mis())
+        self.assertEqual(set.union(set(), *(delta.added for delta in published)), set(mis))
+
+    def test_detach(self):
+        algo = TrackedMIS(SimpleMIS(nx.path_graph(5)))
+        inner = algo.detach()
+        self.assertIs(type(inner._mis), set)
+        self.assertTrue(inner.is_valid_mis())
+
+    def test_compact(self):
+        # The compact mis sets are wrapped in place, views taken before stay current
+        for cls in [SimpleMIS, ImprovedDynamicMIS, RandomPriorityMIS]:
+            with self.subTest(cls=cls.__name__):
+                graph = AdjacencyGraph(nx.gnm_random_graph(60, 120, seed=5))
+                inner = cls(graph, compact=True)
+                view = inner.get_mis()
+                algo = TrackedMIS(inner)
+                mis = set(view)
+                for op, u, v in random_updates(graph, 100, seed=6):
+                    delta = getattr(algo, op)(u, v)
+                    mis = (mis - delta.removed) | delta.added
+                self.assertEqual(set(view), mis)
+                self.assertTrue(algo.is_valid_mis())
+                algo.detach()
+                for name in inner.mis_attributes:
+                    self.assertIsInstance(getattr(inner, name), MembershipSet)
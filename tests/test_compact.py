@@ -0,0 +1,126 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import *
+
+
+def _updates(n, count, seed):
+    rnd = np.random.RandomState(seed)
+    edges = set()
+    for u, v in rnd.randint(n, size=(count, 2)).tolist():
+        e = (min(u, v), max(u, v))
+        if u == v:
+            continue
+        if e in edges:
+            edges.remove(e)
+            yield (REMOVE_EDGE,) + e
+        else:
+            edges.add(e)
+            yield (INSERT_EDGE,) + e
+
+
+class TestCounterArray(unittest.TestCase):
+
+    def test_counter(self):
+        c = CounterArray(3)
+        c[1] += 2
+        c.grow(10)
+        self.assertGreaterEqual(len(c), 11)
+        c[10] = 5
+        self.assertEqual((c[0], c[1], c[10]), (0, 2, 5))
+        self.assertEqual(c.pop(1, None), 2)
+        self.assertEqual(c.pop(100, None), None)
+        del c[10]
+        self.assertEqual(sum(c), 0)
+        c[2] = 1
+        c.clear()
+        self.assertEqual(sum(c), 0)
+
+
+class TestMembershipSet(unittest.TestCase):
+
+    def test_set(self):
+        s = MembershipSet([3, 1], size=2)
+        s.add(7)
+        s.add(3)
+        self.assertEqual(s, {1, 3, 7})
+        self.assertEqual(len(s), 3)
+        self.assertNotIn('x', s)
+        self.assertNotIn(100, s)
+        s.remove(3)
+        s.discard(3)
+        self.assertRaises(KeyError, s.remove, 3)
+        s.intersection_update({7, 8})
+        self.assertEqual(list(s), [7])
+        self.assertEqual(s.pop(), 7)
+        self.assertEqual(len(s), 0)
+
+
+class TestCompactDegreeIndex(unittest.TestCase):
+
+    def test_degrees(self):
+        graph = AdjacencyGraph(nx.path_graph(4))
+        index = CompactDegreeIndex(graph.degree)
+        self.assertEqual(list(index), [1, 2, 2, 1])
+        self.assertEqual(sorted(index.between(1.5, float('inf'))), [1, 2])
+        graph.add_edge(3, 9)
+        index.update_edge(graph, 3, 9, 1)
+        self.assertEqual((index[3], index[9]), (2, 1))
+        self.assertNotIn(7, index)
+        index.remove(0)
+        self.assertNotIn(0, index)
+        self.assertEqual(sorted(index.between(0, 1)), [9])
+
+
+class TestCompactAlgorithms(unittest.TestCase):
+
+    def test_same_mis(self):
+        # The compact layout must not change any decision
+        for cls in [SimpleMIS, DegreeAwareMIS, ImprovedDynamicMIS, ImplicitMIS, RandomPriorityMIS]:
+            with self.subTest(cls=cls.__name__):
+                algos = []
+                for compact in [False, True]:
+                    graph = AdjacencyGraph(nx.gnm_random_graph(80, 200, seed=3))
+                    algos.append(cls(graph, compact=compact))
+                for algo in algos:
+                    algo.apply_updates(_updates(80, 300, seed=4))
+                    for op, u, v in _updates(80, 200, seed=5):
+                        if op == INSERT_EDGE and algo.graph().has_edge(u, v):
+                            continue
+                        if op == REMOVE_EDGE and not algo.graph().has_edge(u, v):
+                            continue
+                        getattr(algo, op)(u, v)
+                    # New ids beyond the current capacity
+                    algo.insert_node(500, [(500, 1), (500, 2)])
+                    algo.insert_node(501, [(501, 500)])
+                    algo.remove_node(3)
+                    self.assertTrue(algo.is_valid_mis())
+                self.assertEqual(set(algos[0].get_mis()), set(algos[1].get_mis()))
+
+    def test_snapshot(self):
+        algo = ImprovedDynamicMIS(AdjacencyGraph(nx.gnm_random_graph(60, 150, seed=6)), compact=True)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'mis.snapshot')
+            save_snapshot(algo, path)
+            restored, _ = load_snapshot(path)
+        self.assertIsInstance(restored._light_count, CounterArray)
+        self.assertIsInstance(restored._light_mis, MembershipSet)
+        self.assertEqual(set(restored.get_mis()), set(algo.get_mis()))
+        restored.insert_node(100, [(100, 0)])
+        self.assertTrue(restored.is_valid_mis())
+
+    def test_memory(self):
+        graph = AdjacencyGraph(nx.gnm_random_graph(20000, 40000, seed=7))
+
+        def allocated(compact):
+            tracemalloc.start()
+            algo = SimpleMIS(graph, compact=compact)
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            return size
+
+        self.assertLess(allocated(True) * 4, allocated(False))
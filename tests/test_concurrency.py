@@ -0,0 +1,134 @@
+import threading
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import *
+
+
+def random_updates(n, count, seed=0):
+    # Toggles random edges between n nodes
+    rnd = np.random.RandomState(seed)
+    edges = set()
+    updates = []
+    for u, v in rnd.randint(n, size=(count, 2)).tolist():
+        e = (min(u, v), max(u, v))
+        if u == v:
+            continue
+        if e in edges:
+            edges.remove(e)
+            updates.append((REMOVE_EDGE,) + e)
+        else:
+            edges.add(e)
+            updates.append((INSERT_EDGE,) + e)
+    return updates
+
+
+class TestMISSnapshot(unittest.TestCase):
+
+    def test_layers(self):
+        snapshot = MISSnapshot(0, frozenset({1, 2, 3}))
+        versions = [snapshot]
+        for i in range(10):
+            versions.append(versions[-1].next_version([MISDelta({10 + i}, set()), MISDelta(set(), {10 + i - 1} - {9})]))
+        last = versions[-1]
+        self.assertEqual(last, {1, 2, 3, 19})
+        self.assertEqual(len(last), 4)
+        self.assertEqual(last.version, 10)
+        # Older versions are unchanged
+        self.assertEqual(versions[3], {1, 2, 3, 12})
+        self.assertEqual(versions[0], {1, 2, 3})
+        # Binary counter merging keeps the number of layers logarithmic
+        self.assertLessEqual(len(last._layers), 4)
+        self.assertIsInstance(last | {5}, frozenset)
+
+
+class TestConcurrentMIS(unittest.TestCase):
+
+    def test_same_mis(self):
+        for cls in [SimpleMIS, ImprovedDynamicMIS, ImplicitMIS]:
+            with self.subTest(cls=cls.__name__):
+                graph = nx.gnm_random_graph(80, 200, seed=1)
+                algo = ConcurrentMIS(cls(graph))
+                updates = random_updates(80, 400, seed=2)
+                for op, u, v in updates[:200]:
+                    getattr(algo, op)(u, v)
+                algo.apply_updates(updates[200:])
+                algo.insert_node(100, [(100, 1), (100, 2)])
+                algo.remove_node(1)
+                mis = algo.get_mis()
+                for v in graph.nodes:
+                    self.assertEqual(v in mis, algo.algorithm().is_in_mis(v))
+                self.assertEqual(len(mis), len(set(mis)))
+                self.assertTrue(algo.is_valid_mis())
+
+    def test_compact(self):
+        inner = ImprovedDynamicMIS(AdjacencyGraph(nx.gnm_random_graph(80, 200, seed=1)), compact=True)
+        algo = ConcurrentMIS(inner)
+        algo.apply_updates(random_updates(80, 200, seed=2))
+        self.assertIsInstance(inner._light_mis.unwrap(), MembershipSet)
+        self.assertEqual(algo.get_mis(), set(inner.get_mis()))
+        self.assertTrue(algo.is_valid_mis())
+
+    def test_implicit_is_settled(self):
+        # Readers never call ImplicitMIS.is_in_mis, its set holds the whole mis after every update
+        inner = ImplicitMIS(nx.path_graph(6))
+        algo = ConcurrentMIS(inner)
+        for op, u, v in random_updates(6, 30, seed=3):
+            getattr(algo, op)(u, v)
+            self.assertEqual(algo.get_mis(), inner._independent_set)
+            self.assertTrue(inner.is_valid_mis())
+
+    def test_versions(self):
+        algo = ConcurrentMIS(SimpleMIS(nx.path_graph(3)))
+        old = algo.get_mis()
+        self.assertEqual(old, {0, 2})
+        algo.insert_edge(0, 2)
+        self.assertEqual(algo.version(), old.version + 1)
+        self.assertEqual(old, {0, 2})
+        self.assertEqual(len(algo.get_mis()), 1)
+        # Updates that don't change the mis don't publish
+        algo.insert_edge(0, 2)
+        algo.apply_updates([])
+        self.assertEqual(algo.version(), 1)
+
+    def test_concurrent_readers(self):
+        graph = AdjacencyGraph(nx.gnm_random_graph(200, 500, seed=4))
+        algo = ConcurrentMIS(ImprovedDynamicMIS(graph))
+        published = {0: algo.get_mis().snapshot()}
+        updates = random_updates(200, 3000, seed=5)
+        errors = []
+
+        def writer():
+            for op, u, v in updates:
+                getattr(algo, op)(u, v)
+                snapshot = algo.get_mis()
+                published[snapshot.version] = snapshot.snapshot()
+
+        def reader():
+            last = 0
+            while writer_thread.is_alive() or last < algo.version():
+                snapshot = algo.get_mis()
+                if snapshot.version < last:
+                    errors.append('version went back')
+                last = snapshot.version
+                members = snapshot.snapshot()
+                # The writer records the version right after publishing it
+                expected = published.get(snapshot.version)
+                if expected is not None and members != expected:
+                    errors.append('inconsistent version {}'.format(snapshot.version))
+
+        writer_thread = threading.Thread(target=writer)
+        readers = [threading.Thread(target=reader) for _ in range(3)]
+        writer_thread.start()
+        for r in readers:
+            r.start()
+        writer_thread.join()
+        for r in readers:
+            r.join()
+        self.assertEqual(errors, [])
+        self.assertTrue(algo.is_valid_mis())
+
+
+if __name__ == '__main__':
+    unittest.main()
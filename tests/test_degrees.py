@@ -0,0 +1,45 @@
+import unittest
+import networkx as nx
+
+from dynamic_mis import *
+
+
+class TestDegreeIndex(unittest.TestCase):
+
+    def test_between(self):
+        g = nx.star_graph(5)
+        g.add_edge(1, 2)
+        index = DegreeIndex(g.degree)
+        self.assertEqual(index[0], 5)
+        self.assertEqual(sorted(index.between(2, 2)), [1, 2])
+        self.assertEqual(sorted(index.between(1.5, 5)), [0, 1, 2])
+        self.assertEqual(index.between(2.5, 2.7), [])
+        # Wide ranges fall back to the buckets that exist
+        self.assertEqual(sorted(index.between(0, 10 ** 9)), list(range(6)))
+
+    def test_updates(self):
+        index = DegreeIndex([(1, 0), (2, 0)])
+        index.add(1)
+        index.add(1)
+        index.add(2)
+        index.update_node(3, 0)
+        self.assertEqual((index[1], index[2], index[3]), (2, 1, 0))
+        index.add(1, -1)
+        self.assertEqual(sorted(index.between(1, 1)), [1, 2])
+        index.remove(2)
+        self.assertNotIn(2, index)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.between(1, 1), [1])
+
+    def test_update_edge(self):
+        g = AdjacencyGraph([(0, 1)])
+        index = DegreeIndex(g.degree)
+        g.add_edge(1, 2)
+        index.update_edge(g, 1, 2, 1)
+        g.add_edge(2, 2)
+        index.update_edge(g, 2, 2, 1)
+        self.assertEqual(dict(index), dict(g.degree))
+        g.remove_edge(0, 1)
+        index.update_edge(g, 0, 1, -1)
+        self.assertEqual(dict(index), dict(g.degree))
+        self.assertEqual(sorted(index.between(0, 0)), [0])
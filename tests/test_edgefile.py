@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import *
+
+KONECT = '''% sym unweighted
+% 6 4 4
+a b 1 100
+b c 1 101
+c a 1 102
+a b -1 103
+d d 1 104
+'''
+
+
+class TestEdgeFile(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.text_file = os.path.join(self.dir.name, 'out.test')
+        with open(self.text_file, 'w') as f:
+            f.write(KONECT)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        edge_file = EdgeFile(convert_konect(self.text_file))
+        self.assertEqual(edge_file.labels(), ['a', 'b', 'c', 'd'])
+        # The removal a b -1 is skipped
+        self.assertEqual(edge_file.edge_list(), [(0, 1), (1, 2), (2, 0), (3, 3)])
+        self.assertEqual(edge_file.edges.dtype, np.dtype('<i4'))
+        self.assertEqual(edge_file.interner().id('c'), 2)
+
+    def test_graph_and_csr(self):
+        edge_file = load_edge_file(self.text_file)
+        graph = edge_file.to_graph(nx.Graph)
+        self.assertEqual(set(graph.nodes), {0, 1, 2, 3})
+        self.assertEqual(graph.number_of_edges(), 4)
+
+        csr = edge_file.csr()
+        graph.remove_edges_from(nx.selfloop_edges(graph))
+        for v in graph:
+            self.assertEqual(set(csr.indices[csr.indptr[v]:csr.indptr[v + 1]].tolist()), set(graph[v]))
+        self.assertEqual(luby_mis(graph), luby_mis(None, csr=csr))
+
+    def test_cache(self):
+        binary_file = load_edge_file(self.text_file).path
+        self.assertTrue(os.path.exists(binary_file))
+        mtime = os.path.getmtime(binary_file)
+        load_edge_file(self.text_file)
+        self.assertEqual(os.path.getmtime(binary_file), mtime)
+
+        # A newer text file is converted again
+        with open(self.text_file, 'a') as f:
+            f.write('e a 1 105\n')
+        os.utime(self.text_file, (mtime + 10, mtime + 10))
+        self.assertEqual(len(load_edge_file(self.text_file)), 5)
+
+    def test_empty_and_invalid(self):
+        with open(self.text_file, 'w') as f:
+            f.write('% empty\n')
+        edge_file = load_edge_file(self.text_file)
+        self.assertEqual((len(edge_file), edge_file.labels()), (0, []))
+        self.assertRaises(ValueError, EdgeFile, self.text_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+import networkx as nx
+
+from dynamic_mis import *
+
+GENERATORS = [
+    lambda seed: preferential_attachment(200, 3, seed),
+    lambda seed: power_law_churn(200, 400, 400, seed=seed),
+    lambda seed: hub_oscillation(500, 1000, hubs=2, rounds=50, seed=seed),
+    lambda seed: phase_oscillation(100, 200, cycles=3, seed=seed),
+]
+
+
+def _replay(updates, algo):
+    # Applies updates that must be valid on their own: no duplicate insertions and no missing removals
+    for op, u, v in updates:
+        if op == INSERT_EDGE:
+            assert not algo.graph().has_edge(u, v)
+            algo.insert_edge(u, v)
+        else:
+            algo.remove_edge(u, v)
+
+
+class TestGenerators(unittest.TestCase):
+
+    def test_reproducible_and_valid(self):
+        for generate in GENERATORS:
+            updates = list(generate(1))
+            self.assertEqual(updates, list(generate(1)))
+            self.assertNotEqual(updates, list(generate(2)))
+
+            nodes = {w for _, u, v in updates for w in (u, v)}
+            algo = SimpleMIS(nx.empty_graph(max(nodes) + 1))
+            _replay(updates, algo)
+            self.assertTrue(algo.is_valid_mis())
+
+    def test_preferential_attachment_degrees(self):
+        g = nx.Graph([e[1:] for e in preferential_attachment(1000, 2, seed=0)])
+        self.assertEqual(g.number_of_edges(), 2 * 1000 - 3 - 2 + 1)
+        self.assertGreater(max(d for _, d in g.degree), 40)
+
+    def test_hubs_cross_heavy_threshold(self):
+        updates = list(hub_oscillation(500, 1000, hubs=2, rounds=40, seed=0))
+        algo = ImprovedDynamicMIS(AdjacencyGraph(nx.empty_graph(500)))
+        flips = 0
+        heavy = set()
+        for op, u, v in updates:
+            getattr(algo, op)(u, v)
+            flips += len(heavy ^ algo._heavy_nodes)
+            heavy = set(algo._heavy_nodes)
+        self.assertGreaterEqual(flips, 40)
+        self.assertTrue(algo.is_valid_mis())
+
+    def test_phase_oscillation(self):
+        updates = list(phase_oscillation(100, 200, cycles=3, seed=0))
+        for cls in [ImprovedDynamicMIS, ImplicitMIS]:
+            algo = cls(AdjacencyGraph(nx.empty_graph(100)))
+            phases = []
+            for op, u, v in updates:
+                getattr(algo, op)(u, v)
+                if not phases or phases[-1] != algo._m_c:
+                    phases.append(algo._m_c)
+            # Every cycle ends two phases
+            self.assertEqual(phases[-7:], [128, 256, 128, 256, 128, 256, 128])
+            self.assertTrue(algo.is_valid_mis())
+
+    def test_write_konect(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, 'out.churn')
+            updates = list(power_law_churn(50, 100, 100, seed=0))
+            self.assertEqual(write_konect(updates, path), len(updates))
+            self.assertEqual([(op, int(u), int(v)) for op, u, v in konect_events(path)], updates)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import AdjacencyGraph
+
+
+class TestAdjacencyGraph(unittest.TestCase):
+
+    def test_matches_networkx(self):
+        reference = nx.gnp_random_graph(30, 0.2, seed=7)
+        g = AdjacencyGraph(reference)
+
+        self.assertEqual(g.number_of_nodes(), reference.number_of_nodes())
+        self.assertEqual(g.number_of_edges(), reference.number_of_edges())
+        for v in reference:
+            self.assertEqual(g.degree[v], reference.degree[v])
+            self.assertEqual(set(g[v]), set(reference[v]))
+        self.assertEqual({frozenset(e) for e in g.edges}, {frozenset(e) for e in reference.edges})
+
+    def test_random_updates(self):
+        reference = nx.Graph()
+        g = AdjacencyGraph()
+        rnd = np.random.RandomState(3)
+
+        for _ in range(2000):
+            u, v = (int(x) for x in rnd.randint(0, 25, size=2))
+            if u == v:
+                continue
+            if reference.has_edge(u, v):
+                reference.remove_edge(u, v)
+                g.remove_edge(v, u)
+            elif rnd.rand() < 0.05 and u in reference:
+                reference.remove_node(u)
+                g.remove_node(u)
+            else:
+                reference.add_edge(u, v)
+                g.add_edge(u, v)
+
+            self.assertEqual(g.has_edge(u, v), reference.has_edge(u, v))
+
+        self.assertEqual(set(g.nodes), set(reference.nodes))
+        self.assertEqual(g.number_of_edges(), reference.number_of_edges())
+        for v in reference:
+            self.assertEqual(sorted(g[v]), sorted(reference[v]))
+
+    def test_duplicate_edge(self):
+        g = AdjacencyGraph([(0, 1)])
+        g.add_edge(1, 0)
+        self.assertEqual(g.number_of_edges(), 1)
+        self.assertEqual(g.degree[0], 1)
+
+    def test_missing_elements(self):
+        g = AdjacencyGraph([(0, 2)])
+        self.assertNotIn(1, g)
+        self.assertNotIn(-1, g)
+        self.assertNotIn('a', g)
+        self.assertFalse(g.has_edge(0, 1))
+        for v in [1, -1, 3, 'a']:
+            self.assertRaises(KeyError, g.__getitem__, v)
+            self.assertRaises(KeyError, g.degree.__getitem__, v)
+        self.assertRaises(KeyError, g.remove_edge, 0, 1)
+        self.assertRaises(ValueError, g.add_node, -1)
+
+    def test_self_loop_degree(self):
+        reference = nx.Graph([(0, 0), (0, 1), (2, 2)])
+        g = AdjacencyGraph(reference)
+        self.assertEqual(dict(g.degree), dict(reference.degree))
+        self.assertEqual(g.copy().degree[0], 3)
+        g.remove_edge(0, 0)
+        self.assertEqual(g.degree[0], 1)
+        g.remove_node(2)
+        g.add_node(2)
+        self.assertEqual(g.degree(2), 0)
+
+    def test_copy_is_independent(self):
+        g = AdjacencyGraph([(0, 1), (1, 2)])
+        h = g.copy()
+        h.remove_edge(0, 1)
+        self.assertTrue(g.has_edge(0, 1))
+        self.assertEqual(h.degree[1], 1)
+        self.assertEqual(g.degree[1], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
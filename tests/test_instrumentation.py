@@ -0,0 +1,67 @@
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import *
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_quantiles(self):
+        h = LatencyHistogram()
+        values = np.random.RandomState(0).lognormal(8, 2, size=5000).astype(int).tolist()
+        for v in values:
+            h.record(v)
+
+        self.assertEqual(h.count, len(values))
+        self.assertEqual(h.max, max(values))
+        for q in [0.5, 0.99, 0.999]:
+            exact = sorted(values)[int(np.ceil(q * len(values))) - 1]
+            self.assertGreaterEqual(h.quantile(q), exact)
+            self.assertLessEqual(h.quantile(q), exact * 1.07 + 1)
+
+    def test_small_values_are_exact(self):
+        h = LatencyHistogram()
+        for v in range(32):
+            h.record(v)
+        self.assertEqual(h.quantile(0.5), 15)
+        self.assertEqual(h.quantile(1), 31)
+
+    def test_merge(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        a.record(10)
+        b.record(1000)
+        a.merge(b)
+        self.assertEqual((a.count, a.max, a.quantile(0.5)), (2, 1000, 10))
+
+
+class TestInstrumentedMIS(unittest.TestCase):
+
+    def test_records_operations(self):
+        g = nx.gnp_random_graph(30, 0.2, seed=1)
+        edges = list(g.edges)
+        algo = InstrumentedMIS(SimpleMIS(AdjacencyGraph(g)))
+        for u, v in edges[:10]:
+            algo.remove_edge(u, v)
+        algo.insert_node(30, [(30, 1)])
+        algo.remove_node(2)
+        algo.apply_updates([(INSERT_EDGE, u, v) for u, v in edges[:5]])
+        for v in range(5):
+            algo.is_in_mis(v)
+
+        self.assertTrue(algo.is_valid_mis())
+        report = algo.report()
+        self.assertEqual({op: s['count'] for op, s in report.items()},
+                         {'remove_edge': 10, 'insert_node': 1, 'remove_node': 1, 'apply_updates': 1, 'is_in_mis': 5})
+        self.assertEqual(algo.get_mis(), algo.algorithm().get_mis())
+
+    def test_shared_histograms(self):
+        histograms = dict()
+        for _ in range(2):
+            algo = InstrumentedMIS(SimpleMIS(nx.empty_graph(4)), histograms)
+            algo.insert_edge(0, 1)
+        self.assertEqual(histograms['insert_edge'].count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
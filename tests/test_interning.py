@@ -0,0 +1,86 @@
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import *
+
+
+def _labelled_graph():
+    g = nx.gnp_random_graph(20, 0.3, seed=42)
+    return nx.relabel_nodes(g, {v: 'node-{}'.format(v) for v in g})
+
+
+class TestNodeInterner(unittest.TestCase):
+
+    def test_dense_ids(self):
+        interner = NodeInterner(['a', 'b'])
+        self.assertEqual(interner.intern('a'), 0)
+        self.assertEqual(interner.intern_edge('c', 'b'), (2, 1))
+        self.assertEqual(len(interner), 3)
+        self.assertEqual(interner.label(2), 'c')
+        self.assertIn('c', interner)
+        self.assertIsNone(interner.get('d'))
+        self.assertRaises(KeyError, interner.id, 'd')
+
+
+class TestInternedMIS(unittest.TestCase):
+
+    def test_valid(self):
+        g = _labelled_graph()
+        for cls in [TrivialMIS, SimpleMIS, ImprovedDynamicMIS, ImplicitMIS]:
+            algo = InternedMIS(cls, g)
+            self.assertTrue(algo.is_valid_mis())
+            mis = algo.get_mis()
+            self.assertTrue(all(isinstance(v, str) for v in mis))
+            for v in g:
+                self.assertEqual(v in mis, algo.is_in_mis(v))
+
+    def test_labels_are_translated(self):
+        g = _labelled_graph()
+        algo = InternedMIS(SimpleMIS, g)
+        self.assertTrue(all(isinstance(v, int) for v in algo.algorithm().get_mis()))
+        self.assertFalse(algo.is_in_mis('unknown'))
+
+    def test_updates(self):
+        g = _labelled_graph()
+        edges = list(g.edges)
+        removal_order = np.random.RandomState(seed=42).permutation(len(edges))
+
+        for cls in [SimpleMIS, ImprovedDynamicMIS]:
+            algo = InternedMIS(cls, g)
+            for i in removal_order:
+                algo.remove_edge(*edges[i])
+                self.assertTrue(algo.is_valid_mis())
+
+            algo.remove_node('node-3')
+            self.assertFalse(algo.is_in_mis('node-3'))
+            algo.insert_node('new', [('new', 'node-1'), ('node-2', 'new'), ('new', 'missing')])
+            algo.insert_edge('new', 'node-4')
+            self.assertTrue(algo.is_valid_mis())
+            self.assertEqual(algo.graph().degree[algo.interner().id('new')], 3)
+
+    def test_apply_updates(self):
+        for cls in [SimpleMIS, ImprovedDynamicMIS, ImplicitMIS]:
+            algo = InternedMIS(cls, nx.path_graph(['a', 'b', 'c']))
+            algo.apply_updates([('remove_edge', 'a', 'b'), ('insert_edge', 'a', 'c'),
+                                ('insert_node', 'd', [('d', 'b'), ('x', 'd')]), ('remove_node', 'c')])
+            graph = algo.graph()
+            self.assertFalse(graph.has_edge(algo.interner().id('a'), algo.interner().id('b')))
+            self.assertEqual(graph.degree[algo.interner().id('d')], 1)
+            self.assertNotIn(algo.interner().id('c'), graph)
+            self.assertTrue(algo.is_valid_mis())
+            self.assertTrue(algo.is_in_mis('a'))
+
+    def test_unknown_label(self):
+        algo = InternedMIS(SimpleMIS, nx.path_graph(['a', 'b']))
+        self.assertRaises(KeyError, algo.insert_edge, 'a', 'x')
+        self.assertRaises(KeyError, algo.apply_updates, [('insert_edge', 'a', 'x')])
+        self.assertNotIn('x', algo.interner())
+
+    def test_from_nodes_and_edges(self):
+        algo = InternedMIS(SimpleMIS, nodes=['x', 'y', 'z'], edges=[('x', 'y'), ('y', 'z')])
+        self.assertEqual(algo.get_mis(), {'x', 'z'})
+
+
+if __name__ == '__main__':
+    unittest.main()
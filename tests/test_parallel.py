@@ -0,0 +1,62 @@
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import *
+from dynamic_mis import parallel
+
+
+class TestParallelLubyMIS(unittest.TestCase):
+
+    def test_same_as_luby(self):
+        for backend in [nx.Graph, AdjacencyGraph]:
+            g = backend(nx.barabasi_albert_graph(300, 3, seed=1))
+            for workers in [1, 2, 3]:
+                self.assertEqual(parallel_luby_mis(g, workers=workers, seed=4), luby_mis(g, seed=4))
+
+    def test_candidates_and_self_loops(self):
+        g = nx.gnp_random_graph(60, 0.1, seed=3)
+        g.add_edges_from([(0, 0), (5, 5)])
+        g.add_node(100)
+        odd = lambda v: v % 2 == 1
+        self.assertEqual(parallel_luby_mis(g, candidate_filter=odd, workers=2), luby_mis(g, candidate_filter=odd))
+        self.assertIn(100, parallel_luby_mis(g, workers=2))
+
+    def test_initializer(self):
+        g = AdjacencyGraph(nx.gnp_random_graph(80, 0.05, seed=5))
+        algo = ImprovedDynamicMIS(g, initializer=lambda *args, **kwargs: parallel_luby_mis(*args, workers=2, **kwargs))
+        self.assertTrue(algo.is_valid_mis())
+
+    def test_simple_mis_from_pool(self):
+        g = AdjacencyGraph(nx.gnp_random_graph(80, 0.05, seed=6))
+        algo = parallel_simple_mis(g, workers=2)
+        self.assertEqual(algo.get_mis(), luby_mis(g))
+        self.assertTrue(algo._valid_count())
+        for u, v in list(g.edges)[:20]:
+            algo.remove_edge(u, v)
+            self.assertTrue(algo.is_valid_mis())
+
+
+    def test_task_closes_blocks(self):
+        shared = parallel._SharedArrays(values=np.arange(10))
+        attached = []
+
+        class RecordingMemory(parallel.SharedMemory):
+
+            def __init__(self, *args, **kwargs):
+                super(RecordingMemory, self).__init__(*args, **kwargs)
+                attached.append(self)
+
+        original, parallel.SharedMemory = parallel.SharedMemory, RecordingMemory
+        try:
+            total = parallel._task(lambda arrays, bounds: int(arrays['values'][bounds[0]:bounds[1]].sum()),
+                                   shared.specs, (2, 5))
+        finally:
+            parallel.SharedMemory = original
+            shared.close()
+        self.assertEqual(total, 9)
+        self.assertEqual(len(attached), 1)
+        self.assertIsNone(attached[0].buf)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import os
+import tempfile
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import *
+
+
+def _edges(g):
+    return {tuple(sorted(e)) for e in g.edges}
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'snapshot.npz')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        g = nx.gnp_random_graph(60, 0.1, seed=1)
+        edges = list(g.edges)
+        for backend in [nx.Graph, AdjacencyGraph]:
+            for cls in [TrivialMIS, SimpleMIS, ImprovedIncrementalMIS, ImprovedDynamicMIS, ImplicitMIS]:
+                algo = cls(backend(g))
+                save_snapshot(algo, self.path, generation=7)
+                restored, generation = load_snapshot(self.path)
+                self.assertEqual(generation, 7)
+                self.assertIsInstance(restored, cls)
+                self.assertIsInstance(restored.graph(), backend)
+                self.assertEqual(_edges(restored.graph()), _edges(algo.graph()))
+                self.assertEqual(restored.get_mis(), algo.get_mis())
+                self.assertTrue(restored.is_valid_mis())
+
+                # The restored state is complete enough to keep updating
+                if cls is not ImprovedIncrementalMIS:
+                    for u, v in edges[:20]:
+                        restored.remove_edge(u, v)
+                        self.assertTrue(restored.is_valid_mis())
+
+    def test_labels_and_removed_nodes(self):
+        g = nx.relabel_nodes(nx.path_graph(5), {v: 'v{}'.format(v) for v in range(5)})
+        save_snapshot(SimpleMIS(g), self.path)
+        restored, _ = load_snapshot(self.path)
+        self.assertEqual(restored.get_mis(), {'v0', 'v2', 'v4'})
+        # Labels are stored without pickling
+        with np.load(self.path, allow_pickle=False) as data:
+            self.assertTrue(all(data[name].dtype != object for name in data.files))
+
+        algo = ImprovedDynamicMIS(AdjacencyGraph(nx.path_graph(6)))
+        algo.remove_node(2)
+        save_snapshot(algo, self.path)
+        restored, _ = load_snapshot(self.path)
+        self.assertFalse(restored.graph().has_node(2))
+        self.assertEqual(restored.graph().number_of_edges(), 3)
+        restored.insert_edge(1, 3)
+        self.assertTrue(restored.is_valid_mis())
+
+    def test_initializer_is_passed_again(self):
+        g = AdjacencyGraph(nx.gnp_random_graph(40, 0.1, seed=2))
+        save_snapshot(TrivialMIS(g, initializer=luby_mis), self.path)
+        restored, _ = load_snapshot(self.path, initializer=luby_mis)
+        self.assertIs(restored._compute, luby_mis)
+
+
+class TestUpdateLog(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self.dir.name, 'snapshot.npz')
+        self.log = os.path.join(self.dir.name, 'updates.log')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_records(self):
+        updates = [(INSERT_EDGE, 1, 2), (REMOVE_EDGE, 2, 1), (INSERT_NODE, 5, [(5, 1), (2, 5)]), (REMOVE_NODE, 3)]
+        log = UpdateLog(self.log, generation=3)
+        log.extend(updates[:2], batch=True)
+        for update in updates[2:]:
+            log.append(update)
+        log.close()
+        self.assertEqual(UpdateLog.generation_of(self.log), 3)
+        self.assertEqual(list(UpdateLog.read(self.log)), updates)
+        self.assertEqual(list(UpdateLog.read_entries(self.log)),
+                         [(True, updates[:2]), (False, updates[2:3]), (False, updates[3:])])
+
+        # A record cut off by a crash is ignored
+        with open(self.log, 'r+b') as f:
+            f.truncate(os.path.getsize(self.log) - 3)
+        self.assertEqual(list(UpdateLog.read(self.log)), updates[:3])
+
+    def test_recover(self):
+        g = nx.gnp_random_graph(50, 0.1, seed=3)
+        edges = list(g.edges)
+        order = np.random.RandomState(3).permutation(len(edges))
+        for cls in [SimpleMIS, ImprovedDynamicMIS]:
+            algo = LoggedMIS(cls(AdjacencyGraph(g)), self.snapshot, self.log)
+            for i in order[:20]:
+                algo.remove_edge(*edges[i])
+            algo.checkpoint()
+            for i in order[20:40]:
+                algo.remove_edge(*edges[i])
+            algo.insert_node(50, [(50, 0), (50, 1)])
+            algo.apply_updates([(INSERT_EDGE, 2, 50), (REMOVE_NODE, 4)])
+            algo.close()
+
+            recovered = recover(self.snapshot, self.log)
+            self.assertEqual(_edges(recovered.graph()), _edges(algo.graph()))
+            self.assertEqual(set(recovered.get_mis()), set(algo.get_mis()))
+            self.assertTrue(recovered.is_valid_mis())
+
+            # Recovery keeps logging to the same log
+            recovered.insert_edge(*edges[order[0]])
+            recovered.close()
+            again = recover(self.snapshot, self.log)
+            self.assertEqual(_edges(again.graph()), _edges(recovered.graph()))
+            again.close()
+            os.remove(self.log)
+
+    def test_same_mis_after_recovery(self):
+        # Updates are replayed on the same path they were applied, one by one or as a batch
+        for seed in range(10):
+            g = nx.gnp_random_graph(40, 0.15, seed=seed)
+            algo = LoggedMIS(ImprovedDynamicMIS(AdjacencyGraph(g)), self.snapshot, self.log)
+            rnd = np.random.RandomState(seed)
+            for i in range(60):
+                u, v = rnd.randint(40, size=2).tolist()
+                if u == v:
+                    continue
+                op = REMOVE_EDGE if algo.graph().has_edge(u, v) else INSERT_EDGE
+                if i % 4 == 0:
+                    algo.apply_updates([(op, u, v)])
+                else:
+                    getattr(algo, op)(u, v)
+            algo.close()
+            recovered = recover(self.snapshot, self.log)
+            self.assertEqual(set(recovered.get_mis()), set(algo.get_mis()))
+            recovered.close()
+            os.remove(self.log)
+
+    def test_rejected_update(self):
+        algo = LoggedMIS(SimpleMIS(AdjacencyGraph(nx.path_graph(4))), self.snapshot, self.log)
+        algo.remove_edge(0, 1)
+        self.assertRaises(AssertionError, algo.insert_edge, 0, 99)
+        algo.insert_edge(0, 2)
+        algo.close()
+        self.assertEqual(list(UpdateLog.read(self.log)), [(REMOVE_EDGE, 0, 1), (INSERT_EDGE, 0, 2)])
+        recovered = recover(self.snapshot, self.log)
+        self.assertEqual(_edges(recovered.graph()), {(0, 2), (1, 2), (2, 3)})
+        self.assertEqual(set(recovered.get_mis()), set(algo.get_mis()))
+        recovered.close()
+
+    def test_stale_log_is_ignored(self):
+        algo = LoggedMIS(SimpleMIS(AdjacencyGraph(nx.path_graph(4))), self.snapshot, self.log)
+        algo.remove_edge(0, 1)
+        algo.close()
+        # The snapshot was written but the crash happened before the log was reset
+        save_snapshot(algo.algorithm(), self.snapshot, generation=UpdateLog.generation_of(self.log) + 1)
+        recovered = recover(self.snapshot, self.log)
+        self.assertEqual(recovered.graph().number_of_edges(), 2)
+        self.assertEqual(os.path.getsize(self.log), 16)
+        recovered.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
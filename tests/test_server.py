@@ -0,0 +1,193 @@
+import asyncio
+import json
+import unittest
+import networkx as nx
+
+from dynamic_mis import *
+from dynamic_mis.client import MISClient, run_load
+from dynamic_mis.server import MISServer
+
+
+class TestMISServer(unittest.TestCase):
+
+    def _run(self, algorithm, scenario):
+        async def main():
+            server = MISServer(algorithm)
+            host, port = await server.start()
+            try:
+                return await scenario(server, host, port)
+            finally:
+                await server.close()
+        return asyncio.run(asyncio.wait_for(main(), 30))
+
+    def test_requests(self):
+        algorithm = SimpleMIS(AdjacencyGraph(nx.path_graph(4)))
+
+        async def scenario(server, host, port):
+            client = await MISClient.connect(host, port)
+            self.assertEqual(await client.get_mis(), {0, 2})
+            await client.insert_edge(0, 3)
+            await client.remove_edge(1, 2)
+            await client.insert_node(4, [(4, 0)])
+            await client.remove_node(2)
+            self.assertEqual(await client.get_mis(), set(algorithm.get_mis()))
+            self.assertEqual(await client.is_in_mis(0), algorithm.is_in_mis(0))
+            with self.assertRaises(RuntimeError):
+                await client.request('flip_edge', 0, 1)
+            stats = await client.stats()
+            self.assertEqual(stats['updates'], 4)
+            await client.close()
+
+        self._run(algorithm, scenario)
+        self.assertTrue(algorithm.is_valid_mis())
+
+    def test_coalescing(self):
+        graph = AdjacencyGraph(nx.empty_graph(100))
+        algorithm = ImprovedDynamicMIS(graph)
+
+        async def scenario(server, host, port):
+            clients = [await MISClient.connect(host, port) for _ in range(4)]
+            edges = [(i, i + 1) for i in range(99)]
+            # Pipelined requests from several connections are applied together
+            await asyncio.gather(*[clients[i % 4].insert_edge(u, v) for i, (u, v) in enumerate(edges)])
+            self.assertLess(server.batches, len(edges))
+            self.assertEqual(server.updates, len(edges))
+            # A query waits for the earlier updates of its connection
+            results = await asyncio.gather(clients[0].remove_edge(0, 1), clients[0].remove_edge(1, 2),
+                                           clients[0].is_in_mis(1))
+            self.assertTrue(results[2])
+            for client in clients:
+                await client.close()
+
+        self._run(algorithm, scenario)
+        self.assertEqual(graph.number_of_edges(), 97)
+        self.assertTrue(algorithm.is_valid_mis())
+
+    def test_invalid_update_in_batch(self):
+        graph = AdjacencyGraph(nx.empty_graph(10))
+        algorithm = SimpleMIS(graph)
+
+        async def scenario(server, host, port):
+            a = await MISClient.connect(host, port)
+            b = await MISClient.connect(host, port)
+            # Only the update with the unknown node fails, the others of the batch report success
+            results = await asyncio.gather(a.insert_edge(0, 1), b.insert_edge(2, 99), a.insert_edge(3, 4),
+                                           b.remove_node(5), b.insert_edge(5, 6), return_exceptions=True)
+            self.assertIsInstance(results[0], int)
+            self.assertIsInstance(results[1], RuntimeError)
+            self.assertIsInstance(results[2], int)
+            self.assertIsInstance(results[3], int)
+            # Node 5 was removed earlier in the same batch
+            self.assertIsInstance(results[4], RuntimeError)
+            await a.close()
+            await b.close()
+
+        self._run(algorithm, scenario)
+        self.assertEqual(sorted(graph.edges), [(0, 1), (3, 4)])
+        self.assertTrue(algorithm.is_valid_mis())
+
+    def test_malformed_args(self):
+        algorithm = SimpleMIS(AdjacencyGraph(nx.path_graph(3)))
+
+        async def scenario(server, host, port):
+            reader, writer = await asyncio.open_connection(host, port)
+            for request in [{'id': 1, 'op': 'insert_edge', 'args': 5},
+                            {'id': 2, 'op': 'insert_node', 'args': [7, 3]},
+                            {'id': 3, 'op': 'insert_edge', 'args': [0]},
+                            {'id': 4, 'op': 'insert_edge', 'args': [[0], 2]},
+                            {'id': 5, 'op': 'insert_edge', 'args': [0, 2]}]:
+                writer.write(json.dumps(request).encode() + b'\n')
+            responses = [json.loads(await reader.readline()) for _ in range(5)]
+            writer.close()
+            return responses
+
+        responses = self._run(algorithm, scenario)
+        self.assertEqual([r['error'] for r in responses[:2]], ['invalid request'] * 2)
+        self.assertTrue(all(r['error'].startswith('invalid update') for r in responses[2:4]))
+        self.assertTrue(responses[4]['ok'])
+        self.assertTrue(algorithm.graph().has_edge(0, 2))
+
+    def test_insert_node_checks(self):
+        graph = AdjacencyGraph(nx.path_graph(3))
+        algorithm = SimpleMIS(graph)
+
+        async def scenario(server, host, port):
+            client = await MISClient.connect(host, port)
+            for v, edges in [(7, [(7, 99)]), (1, [(1, 2)]), (8, [(0, 1)])]:
+                with self.assertRaises(RuntimeError):
+                    await client.insert_node(v, edges)
+            await client.insert_node(7, [(7, 0), (2, 7)])
+            await client.close()
+
+        self._run(algorithm, scenario)
+        self.assertEqual(sorted(graph[7]), [0, 2])
+        self.assertNotIn(8, graph)
+        self.assertTrue(algorithm.is_valid_mis())
+
+    def test_large_mis(self):
+        # The mis of 20000 isolated nodes is a response of more than 64 KiB
+        algorithm = SimpleMIS(AdjacencyGraph(nx.empty_graph(20000)))
+
+        async def scenario(server, host, port):
+            client = await MISClient.connect(host, port)
+            mis = await client.get_mis()
+            await client.close()
+            return mis
+
+        self.assertEqual(len(self._run(algorithm, scenario)), 20000)
+
+    def test_unreadable_response(self):
+        async def main():
+            async def handle(reader, writer):
+                await reader.readline()
+                writer.write(b'not json\n')
+                await writer.drain()
+
+            server = await asyncio.start_server(handle, '127.0.0.1', 0)
+            host, port = server.sockets[0].getsockname()[:2]
+            client = await MISClient.connect(host, port)
+            # The pending request fails instead of waiting forever, later ones fail right away
+            with self.assertRaises(ConnectionError):
+                await client.get_mis()
+            with self.assertRaises(ConnectionError):
+                await client.stats()
+            await client.close()
+            server.close()
+            await server.wait_closed()
+
+        asyncio.run(asyncio.wait_for(main(), 10))
+
+    def test_notifications(self):
+        algorithm = ImplicitMIS(AdjacencyGraph(nx.path_graph(3)))
+
+        async def scenario(server, host, port):
+            listener = await MISClient.connect(host, port)
+            await listener.subscribe()
+            client = await MISClient.connect(host, port)
+            mis = await client.get_mis()
+            self.assertEqual(mis, {0, 2})
+            version = await client.insert_edge(0, 2)
+            event = await listener.events.get()
+            self.assertEqual(event['version'], version)
+            mis = (mis | set(event['added'])) - set(event['removed'])
+            self.assertEqual(len(mis & {0, 2}), 1)
+            await listener.close()
+            await client.close()
+
+        self._run(algorithm, scenario)
+
+    def test_load(self):
+        algorithm = SimpleMIS(AdjacencyGraph(nx.gnm_random_graph(200, 400, seed=1)))
+
+        async def scenario(server, host, port):
+            return await run_load(host, port, connections=2, pipeline=4, duration=0.3, nodes=200)
+
+        result = self._run(algorithm, scenario)
+        self.assertGreater(result['ops'], 0)
+        self.assertEqual(set(result['latency']), {'update', 'query'})
+        self.assertGreaterEqual(result['batch_size'], 1)
+        self.assertTrue(algorithm.is_valid_mis())
+
+
+if __name__ == '__main__':
+    unittest.main()
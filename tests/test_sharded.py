@@ -0,0 +1,87 @@
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import *
+from tests.test_concurrency import random_updates
+
+
+class TestShardedMIS(unittest.TestCase):
+
+    def test_one_shard_is_greedy(self):
+        g = nx.barabasi_albert_graph(300, 3, seed=1)
+        with ShardedMIS(g, shards=1) as algo:
+            self.assertEqual(algo.get_mis(), TrivialMIS.compute(g))
+
+    def test_initial_mis(self):
+        for shards in [2, 3, 5]:
+            with self.subTest(shards=shards):
+                g = AdjacencyGraph(nx.gnp_random_graph(200, 0.05, seed=shards))
+                with ShardedMIS(g, shards=shards) as algo:
+                    self.assertTrue(algo.is_valid_mis())
+                    self.assertEqual(set(algo.get_mis()), {v for v in g.nodes if algo.is_in_mis(v)})
+
+    def test_workers(self):
+        workers = ShardWorkers(2)
+        with ShardedMIS(nx.path_graph(10), workers=workers) as algo:
+            self.assertEqual(algo.shards(), 2)
+            self.assertTrue(algo.is_valid_mis())
+            self.assertRaises(ValueError, ShardedMIS, nx.path_graph(3), workers=workers)
+        self.assertFalse(workers.close.alive)
+
+    def test_path_conflicts(self):
+        # Every edge of a path is a cut edge with two shards, all nodes join in the first round
+        with ShardedMIS(nx.path_graph(100), shards=2) as algo:
+            self.assertTrue(algo.is_valid_mis())
+            self.assertGreater(algo.rounds, 1)
+
+    def test_updates(self):
+        for shards in [1, 3]:
+            with self.subTest(shards=shards):
+                g = AdjacencyGraph(nx.gnp_random_graph(100, 0.05, seed=2))
+                rnd = np.random.RandomState(shards)
+                with ShardedMIS(g, shards=shards) as algo:
+                    for i in range(200):
+                        u, v = rnd.randint(100, size=2).tolist()
+                        if u == v:
+                            continue
+                        if g.has_edge(u, v):
+                            algo.remove_edge(u, v)
+                        else:
+                            algo.insert_edge(u, v)
+                        self.assertTrue(algo.is_valid_mis())
+
+                    for v in [3, 10, 42]:
+                        algo.remove_node(v)
+                        self.assertTrue(algo.is_valid_mis())
+                    algo.insert_node(100, [(100, w) for w in range(20)])
+                    self.assertTrue(algo.is_valid_mis())
+
+    def test_batches(self):
+        g = AdjacencyGraph()
+        g.add_nodes_from(range(150))
+        updates = random_updates(150, 3000, seed=4)
+        with ShardedMIS(g, shards=4) as algo:
+            for i in range(0, len(updates), 200):
+                algo.apply_updates(updates[i:i + 200])
+                self.assertTrue(algo.is_valid_mis())
+
+    def test_labels_and_feed(self):
+        g = nx.relabel_nodes(nx.gnp_random_graph(60, 0.1, seed=5), lambda v: 'n{}'.format(v))
+        with ShardedMIS(g, shards=3) as sharded:
+            algo = TrackedMIS(sharded)
+            mis = set(algo.get_mis())
+            for u, v in list(g.edges)[:30]:
+                delta = algo.remove_edge(u, v)
+                mis = (mis - delta.removed) | delta.added
+                self.assertEqual(mis, set(algo.get_mis()))
+            self.assertTrue(algo.is_valid_mis())
+
+    def test_priority(self):
+        self.assertEqual(node_priority('a'), node_priority('a'))
+        self.assertNotEqual(node_priority(1), node_priority('1'))
+        self.assertEqual([shard_of(v, 4) for v in range(5)], [0, 1, 2, 3, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import *
+
+KONECT = '''% asym positive
+a b 1 5
+b c 1 2
+a b -1 7
+c d 1 3
+c d 1 4
+c d -1 6
+x y -1 1
+e e 1 8
+'''
+
+
+def _random_stream(seed, n=40, events=600):
+    # Timestamps are shuffled, so the file is not in time order
+    rnd = np.random.RandomState(seed)
+    present = set()
+    lines = []
+    for t in range(events):
+        u, v = sorted(rnd.choice(n, size=2, replace=False).tolist())
+        weight = -1 if (u, v) in present and rnd.rand() < 0.5 else 1
+        present.discard((u, v)) if weight < 0 else present.add((u, v))
+        lines.append('{} {} {} {}\n'.format(u, v, weight, t))
+    rnd.shuffle(lines)
+    return ''.join(lines)
+
+
+class TestStream(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _write(self, content):
+        file = os.path.join(self.dir.name, 'out.stream')
+        with open(file, 'w') as f:
+            f.write(content)
+        return file
+
+    def test_events(self):
+        file = self._write(KONECT)
+        self.assertEqual(list(konect_events(file))[:3],
+                         [(INSERT_EDGE, 'a', 'b'), (INSERT_EDGE, 'b', 'c'), (REMOVE_EDGE, 'a', 'b')])
+        ordered = list(konect_events(file, sort=True))
+        self.assertEqual(ordered[:3], [(REMOVE_EDGE, 'x', 'y'), (INSERT_EDGE, 'b', 'c'), (INSERT_EDGE, 'c', 'd')])
+        # Small chunks force the merge of spilled runs
+        self.assertEqual(list(konect_events(file, sort=True, chunk_size=2)), ordered)
+
+    def test_replay_multigraph(self):
+        file = self._write(KONECT)
+        algo = SimpleMIS(nx.Graph())
+        counts = replay(algo, konect_events(file, sort=True))
+        self.assertEqual(set(algo.graph().edges), {('b', 'c'), ('c', 'd')})
+        self.assertEqual(counts, {'events': 8, 'skipped': 2, 'nodes': 4, 'inserted': 3, 'duplicates': 2, 'removed': 1})
+        self.assertTrue(algo.is_valid_mis())
+
+    def test_replay_matches_graph(self):
+        file = self._write(_random_stream(0))
+        expected = nx.Graph()
+        replay(TrivialMIS(expected), konect_events(file, sort=True, chunk_size=64))
+
+        for cls in [SimpleMIS, ImprovedDynamicMIS]:
+            for batch_size in [1, 16]:
+                algo = cls(AdjacencyGraph())
+                replay(algo, konect_events(file, NodeInterner([str(v) for v in range(40)]), sort=True, chunk_size=64),
+                       batch_size)
+                self.assertEqual({tuple(sorted((str(u), str(v)))) for u, v in algo.graph().edges},
+                                 {tuple(sorted(e)) for e in expected.edges})
+                self.assertTrue(algo.is_valid_mis())
+
+    def test_new_nodes_do_not_split_batches(self):
+        calls = []
+
+        class CountingMIS(SimpleMIS):
+
+            def _apply_edge_batch(self, inserted, removed):
+                calls.append(len(inserted) + len(removed))
+                SimpleMIS._apply_edge_batch(self, inserted, removed)
+
+        file = self._write(_random_stream(1, events=100))
+        algo = CountingMIS(nx.Graph())
+        counts = replay(algo, konect_events(file, sort=True), batch_size=1000)
+        self.assertEqual(len(calls), 1)
+        self.assertGreater(counts['nodes'], 1)
+        self.assertTrue(algo.is_valid_mis())
+
+    def test_limit(self):
+        file = self._write(KONECT)
+        counts = replay(SimpleMIS(nx.Graph()), konect_events(file), limit=2)
+        self.assertEqual(counts['events'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import networkx as nx
+import numpy as np
+
+from dynamic_mis import *
+
+
+def random_updates(graph, count, seed=0):
+    # Toggles random edges of a copy of graph
+    graph = graph.copy()
+    rnd = np.random.RandomState(seed)
+    updates = []
+    for u, v in rnd.randint(len(graph), size=(count, 2)).tolist():
+        if u == v:
+            continue
+        op = REMOVE_EDGE if graph.has_edge(u, v) else INSERT_EDGE
+        getattr(graph, op.replace('insert', 'add'))(u, v)
+        updates.append((op, u, v))
+    return updates
+
+
+class BrokenMIS(SimpleMIS):
+    # Forgets to update the mis when an edge is inserted
+
+    def insert_edge(self, u, v):
+        self._graph.add_edge(u, v)
+
+
+class TestFindViolations(unittest.TestCase):
+
+    def test_valid(self):
+        for graph in [nx.gnm_random_graph(100, 300, seed=1), AdjacencyGraph(nx.gnm_random_graph(100, 300, seed=1))]:
+            for cls in [SimpleMIS, ImprovedDynamicMIS, ImplicitMIS]:
+                with self.subTest(cls=cls.__name__, graph=type(graph).__name__):
+                    self.assertEqual(find_violations(cls(graph.copy())), set())
+
+    def test_violations(self):
+        algo = SimpleMIS(nx.path_graph(5))
+        self.assertEqual(set(algo.get_mis()), {0, 2, 4})
+        algo._mis.discard(2)
+        algo._mis.add(1)
+        algo._mis.add(3)
+        # 0 and 1, 3 and 4 are adjacent, 2 is not in the mis but dominated
+        self.assertEqual(find_violations(algo), {0, 1, 3, 4})
+        algo._mis.clear()
+        self.assertEqual(find_violations(algo), set(range(5)))
+
+
+class TestValidatedMIS(unittest.TestCase):
+
+    def test_levels(self):
+        graph = nx.gnm_random_graph(60, 150, seed=2)
+        updates = random_updates(graph, 300, seed=3)
+        for cls in [SimpleMIS, DegreeAwareMIS, ImprovedDynamicMIS, ImplicitMIS]:
+            for level in VALIDATION_LEVELS:
+                with self.subTest(cls=cls.__name__, level=level):
+                    algo = ValidatedMIS(cls(graph.copy()), level=level, interval=50)
+                    for op, u, v in updates[:200]:
+                        getattr(algo, op)(u, v)
+                    algo.apply_updates(updates[200:])
+                    algo.insert_node(100, [(100, 1), (100, 2)])
+                    algo.remove_node(1)
+                    self.assertTrue(algo.validate())
+                    self.assertTrue(algo.is_valid_mis())
+
+    def test_local_detects(self):
+        algo = ValidatedMIS(BrokenMIS(nx.path_graph(4)), level='local')
+        with self.assertRaises(InvalidMISError) as error:
+            algo.insert_edge(0, 2)
+        self.assertIn(0, error.exception.nodes)
+
+    def test_sampled(self):
+        algo = ValidatedMIS(BrokenMIS(nx.empty_graph(10)), level='local', sample=2)
+        algo.insert_edge(0, 1)
+        with self.assertRaises(InvalidMISError):
+            algo.insert_edge(2, 3)
+
+    def test_full_detects_periodically(self):
+        algo = ValidatedMIS(BrokenMIS(nx.empty_graph(10)), level='full', interval=3)
+        algo.insert_edge(0, 1)
+        algo.insert_edge(2, 3)
+        with self.assertRaises(InvalidMISError) as error:
+            algo.insert_edge(4, 5)
+        self.assertEqual(error.exception.nodes, set(range(6)))
+
+    def test_off(self):
+        algo = ValidatedMIS(BrokenMIS(nx.empty_graph(4)), level='off')
+        algo.insert_edge(0, 1)
+        self.assertRaises(InvalidMISError, algo.validate)
+        self.assertRaises(ValueError, ValidatedMIS, SimpleMIS(nx.Graph()), level='sampled')
+
+    def test_missing_endpoint(self):
+        algo = ValidatedMIS(ImprovedDynamicMIS(nx.path_graph(3)))
+        self.assertRaises(InvalidMISError, algo.insert_edge, 0, 7)
+        self.assertNotIn(7, algo.graph())
+
+    def test_interned(self):
+        graph = nx.relabel_nodes(nx.path_graph(4), {v: 'node-{}'.format(v) for v in range(4)})
+        for level in VALIDATION_LEVELS:
+            with self.subTest(level=level):
+                algo = ValidatedMIS(InternedMIS(SimpleMIS, graph), level=level, interval=1)
+                algo.insert_edge('node-0', 'node-2')
+                algo.apply_updates([(REMOVE_EDGE, 'node-1', 'node-2'), (INSERT_NODE, 'new', [('new', 'node-3')])])
+                algo.remove_node('node-0')
+                self.assertTrue(algo.validate())
+                self.assertTrue(algo.is_in_mis('new') or algo.is_in_mis('node-3'))
+                self.assertTrue(all(isinstance(v, str) for v in algo.get_mis()))
+
+        algo = ValidatedMIS(InternedMIS(BrokenMIS, graph), level='local')
+        with self.assertRaises(InvalidMISError):
+            algo.insert_edge('node-0', 'node-2')
+        algo = InternedMIS(BrokenMIS, graph)
+        algo.insert_edge('node-0', 'node-2')
+        self.assertFalse(algo.is_valid_at(['node-0']))
+        self.assertTrue(algo.is_valid_at(['node-3', 'missing']))
+
+    def test_detach(self):
+        inner = SimpleMIS(nx.path_graph(3))
+        algo = ValidatedMIS(inner)
+        self.assertIsInstance(inner._mis, TrackedSet)
+        self.assertIs(algo.detach(), inner)
+        self.assertIs(type(inner._mis), set)
+
+    def test_is_valid_at(self):
+        algo = ImprovedDynamicMIS(nx.star_graph(5))
+        self.assertTrue(algo.is_valid_at(algo.graph().nodes))
+        algo._light_count[3] += 1
+        self.assertFalse(algo.is_valid_at([3]))
+        self.assertTrue(algo.is_valid_at([1, 'missing']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import networkx as nx
+import numpy as np
+from functools import partial
+
+from dynamic_mis import *
+
+
+def _greedy_by_rank(graph, csr, seed):
+    # Sequential greedy scan in the same random order as luby_mis
+    rank = np.random.RandomState(seed).permutation(len(csr))
+    order = [csr.labels[i] for i in np.argsort(rank) if csr.present[i]]
+    return TrivialMIS.compute(graph, nodes=order)
+
+
+class TestCSRGraph(unittest.TestCase):
+
+    def test_networkx(self):
+        g = nx.gnp_random_graph(20, 0.3, seed=1)
+        csr = CSRGraph.from_graph(g)
+        for i, v in enumerate(csr.labels):
+            neighbors = csr.indices[csr.indptr[i]:csr.indptr[i + 1]]
+            self.assertEqual({csr.labels[j] for j in neighbors}, set(g[v]))
+
+    def test_adjacency_with_removed_nodes(self):
+        g = AdjacencyGraph(nx.gnp_random_graph(20, 0.3, seed=1))
+        g.remove_node(3)
+        csr = CSRGraph.from_graph(g)
+        self.assertFalse(csr.present[3])
+        self.assertEqual(csr.degrees()[3], 0)
+        for v in g:
+            self.assertEqual(set(csr.indices[csr.indptr[v]:csr.indptr[v + 1]].tolist()), set(g[v]))
+
+
+class TestLubyMIS(unittest.TestCase):
+
+    def test_valid(self):
+        for backend in [nx.Graph, AdjacencyGraph]:
+            g = backend(nx.gnp_random_graph(50, 0.1, seed=2))
+            algo = TrivialMIS(g, initializer=luby_mis)
+            self.assertTrue(algo.is_valid_mis())
+
+    def test_same_as_greedy_in_rank_order(self):
+        for seed in range(5):
+            g = nx.gnp_random_graph(100, 0.05, seed=seed)
+            csr = CSRGraph.from_graph(g)
+            self.assertEqual(luby_mis(g, seed=seed), _greedy_by_rank(g, csr, seed))
+
+    def test_candidates(self):
+        g = nx.gnp_random_graph(50, 0.1, seed=3)
+        nodes = set(range(0, 50, 2))
+        mis = luby_mis(g, candidate_filter=lambda v: v % 3 != 0, nodes=nodes)
+        self.assertTrue(all(v in nodes and v % 3 != 0 for v in mis))
+        self.assertEqual(mis, TrivialMIS.compute(g, candidate_filter=lambda v: v % 3 != 0, nodes=sorted(
+            nodes, key=lambda v: np.random.RandomState(0).permutation(50)[v])))
+
+    def test_empty_and_self_loop(self):
+        self.assertEqual(luby_mis(nx.Graph()), set())
+        g = nx.Graph([(0, 0), (0, 1)])
+        self.assertEqual(len(luby_mis(g)), 1)
+
+    def test_initializer(self):
+        for backend in [nx.Graph, AdjacencyGraph]:
+            g = backend(nx.gnp_random_graph(30, 0.2, seed=4))
+            for cls in [SimpleMIS, ImprovedDynamicMIS]:
+                algo = cls(g.copy(), initializer=partial(luby_mis, seed=1))
+                self.assertTrue(algo.is_valid_mis())
+                for u, v in list(algo.graph().edges)[:20]:
+                    algo.remove_edge(u, v)
+                    self.assertTrue(algo.is_valid_mis())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import networkx as nx
+
+from dynamic_mis import *
+
+
+class TestViews(unittest.TestCase):
+
+    def test_views_are_live(self):
+        for cls in [TrivialMIS, SimpleMIS, ImprovedDynamicMIS, ImplicitMIS]:
+            with self.subTest(cls=cls.__name__):
+                graph = nx.gnm_random_graph(50, 150, seed=0)
+                algo = cls(graph)
+                view = algo.get_mis()
+                frozen = view.snapshot()
+                self.assertIsInstance(frozen, frozenset)
+                self.assertEqual(view, frozen)
+
+                for u, v in list(graph.edges)[:40]:
+                    algo.remove_edge(u, v)
+                expected = {v for v in graph.nodes if algo.is_in_mis(v)}
+                self.assertEqual(set(view), expected)
+                self.assertEqual(len(view), len(expected))
+                self.assertTrue(all(v in view for v in expected))
+                self.assertNotIn('missing', view)
+                self.assertTrue(algo.is_valid_mis())
+
+    def test_read_only(self):
+        view = SimpleMIS(nx.path_graph(4)).get_mis()
+        self.assertFalse(hasattr(view, 'add'))
+        self.assertIsInstance(view | {10}, frozenset)
+        self.assertEqual(view & {0, 1}, {0})
+
+    def test_dynamic_sets_are_disjoint(self):
+        graph = nx.barabasi_albert_graph(300, 5, seed=1)
+        algo = ImprovedDynamicMIS(graph)
+        view = algo.get_mis()
+        self.assertEqual(len(view), len(set(view)))
+        self.assertEqual(MISView({1}, {2, 3}).snapshot(), {1, 2, 3})
+
+    def test_labelled_view(self):
+        algo = InternedMIS(SimpleMIS, nodes=['x', 'y', 'z'], edges=[('x', 'y'), ('y', 'z')])
+        view = algo.get_mis()
+        self.assertEqual(view, {'x', 'z'})
+        self.assertIn('x', view)
+        self.assertNotIn('w', view)
+        algo.remove_node('x')
+        self.assertEqual(view, {'z'})